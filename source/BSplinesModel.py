@@ -165,7 +165,7 @@ class BSplinesModel( LinearModel ):
         dind = {'order': int, 'Bspline': bspline.Bspline, 'eps': float }
         if ( Tools.setListOfAttributes( self, name, value, dlst ) or
              Tools.setSingleAttributes( self, name, value, dind ) ):
-            pass
+            self.clearDesign()
         else :
             super( BSplinesModel, self ).__setattr__( name, value )
 
@@ -458,7 +458,7 @@ class BaseFitter( object ):
 
 
     #  *****VECTOR**************************************************************
-    def getVector( self, ydata, index=None ):
+    def getVector( self, ydata, index=None, partial=None ):
         """
         Return the &beta;-vector.
 
@@ -471,16 +471,18 @@ class BaseFitter( object ):
             multiplied by weights and/or appended by normdata.
         index : list of int
             index of parameters to be fixed
+        partial : None or array_like
+            partials of the model, when already known
 
         """
         if self.model.isNullModel() :
             return numpy.asarray( 0 )
-        design = self.getDesign( index=index )
+        design = self.getDesign( index=index, partial=partial )
 
         return numpy.inner( design.transpose(), ydata )
 
     #  *****HESSIAN**************************************************************
-    def getHessian( self, params=None, weights=None, index=None ):
+    def getHessian( self, params=None, weights=None, index=None, partial=None ):
         """
         Calculates the hessian matrix for a given set of model parameters.
 
@@ -494,6 +496,8 @@ class BaseFitter( object ):
             weights to be used
         index : list of int
             index of parameters to be fixed
+        partial : None or array_like
+            partials of the model at params, when already known
 
         """
         if params is None : params = self.model.parameters
@@ -502,7 +506,7 @@ class BaseFitter( object ):
         if self.model.isNullModel() :
             return
 
-        design = self.getDesign( xdata=self.xdata, params=params, index=index )
+        design = self.getDesign( xdata=self.xdata, params=params, index=index, partial=partial )
 
         if hasattr( self, "normweight" ) :
             if weights is None :
@@ -606,7 +610,7 @@ class BaseFitter( object ):
 
 
     #  *****DESIGN**************************************************************
-    def getDesign( self, params=None, xdata=None, index=None ):
+    def getDesign( self, params=None, xdata=None, index=None, partial=None ):
         """
         Return the design matrix, D.
         The design matrix is also known as the Jacobian Matrix.
@@ -619,12 +623,14 @@ class BaseFitter( object ):
             parameters of the model
         index : list of int
             index of parameters to be fixed
+        partial : None or array_like
+            partials of the model at params and xdata, when already known
 
         """
         if params is None : params = self.model.parameters
         if xdata is None :  xdata = self.xdata
 
-        design = self.model.partial( xdata, params )
+        design = self.model.partial( xdata, params ) if partial is None else partial
         if hasattr( self, "normdfdp" ) :
             design = numpy.append( design, self.normdfdp, axis=0 )
 
@@ -43,6 +43,11 @@ class BaseModel( object ):
     The derivative of f to x (df/dx) is given by
     `model.derivative( x, p )`
 
+    For a stack of k parameter vectors, `model.resultBatch( x, pp )` and
+    `model.partialBatch( x, pp )` return the k results and the k partials.
+    Models that set the class attribute BATCHED calculate them in one go;
+    for the other models they are calculated one by one.
+
     BaseModel checks parameters for positivity and nonzero-ness, if such
     is indicated in the model itself.
 
@@ -74,6 +79,13 @@ class BaseModel( object ):
     Author :         Do Kester
 
     """
+    ## attributes and their types, see __setattr__
+    BASELISTATTRS = {"posIndex":int, "nonZero":int, "deltaP":float, "parNames":str}
+    BASESINGLEATTRS = {"npbase":int, "ndim":int, "tiny":float }
+
+    ## registry flag: True when the model is natively batched, i.e. its baseResult
+    ## accepts parameters of shape ( npbase, k, 1 ), see baseResultBatch
+    BATCHED = False
 
     #  *************************************************************************
     def __init__( self, nparams=0, ndim=1, copy=None, fixed=None, names=None,
@@ -122,10 +134,8 @@ class BaseModel( object ):
         Set attributes.
 
         """
-        keys = {"posIndex":int, "nonZero":int, "deltaP":float, "parNames":str}
-        key1 = {"npbase":int, "ndim":int, "tiny":float }
-        if ( Tools.setListOfAttributes( self, name, value, keys ) or
-             Tools.setSingleAttributes( self, name, value, key1 ) ) :
+        if ( Tools.setListOfAttributes( self, name, value, self.BASELISTATTRS ) or
+             Tools.setSingleAttributes( self, name, value, self.BASESINGLEATTRS ) ) :
             pass
         else :
             raise AttributeError(
@@ -147,6 +157,52 @@ class BaseModel( object ):
         self.checkParameter( param )
         return self.baseResult( xdata, param )
 
+    def resultBatch( self, xdata, params ):
+        """
+        Returns the results for a stack of parameter vectors.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        Returns
+        -------
+        array_like of shape ( k, len( xdata ) )
+
+        """
+        if not self.BATCHED :
+            return numpy.asarray( [BaseModel.result( self, xdata, par ) for par in params],
+                                  dtype=float ).reshape( len( params ), -1 )
+
+        self.checkParameterBatch( params )
+        return self.baseResultBatch( xdata, params )
+
+    def baseResultBatch( self, xdata, params ):
+        """
+        Returns the results for a stack of parameter vectors, by broadcasting.
+
+        The parameters are offered to baseResult as an array of shape
+        ( npbase, k, 1 ), so that params[i] broadcasts against xdata.
+        Natively batched models which do not broadcast like this,
+        override this method.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        """
+        res = self.baseResult( xdata, params.T[:,:,numpy.newaxis] )
+        shape = ( len( params ), Tools.length( xdata ) )
+        if numpy.shape( res ) != shape :
+            res = numpy.broadcast_to( res, shape ).copy()
+        return res
+
     #  *****PARTIAL*************************************************************
     def partial( self, xdata, param, parlist=None ):
         """
@@ -163,8 +219,67 @@ class BaseModel( object ):
 
         """
         self.checkParameter( param )
+        return self.cachedPartial( xdata, param, parlist=parlist )
+
+    def cachedPartial( self, xdata, param, parlist=None ):
+        """
+        Returns the partial derivatives as calculated by basePartial.
+
+        Linear models override this method to reuse their design matrix.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        param : array_like
+            values for the parameters.
+        parlist : None or array_like
+            indices of active parameters
+
+        """
         return self.basePartial( xdata, param, parlist=parlist )
 
+    def partialBatch( self, xdata, params ):
+        """
+        Returns the partial derivatives for a stack of parameter vectors.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        Returns
+        -------
+        array_like of shape ( k, len( xdata ), npbase )
+
+        """
+        if not self.BATCHED :
+            return numpy.asarray( [BaseModel.partial( self, xdata, par ) for par in params],
+                                  dtype=float ).reshape( len( params ), -1, self.npbase )
+
+        self.checkParameterBatch( params )
+        return self.basePartialBatch( xdata, params )
+
+    def basePartialBatch( self, xdata, params ):
+        """
+        Returns the partials for a stack of parameter vectors.
+
+        This fallback calculates them one by one.
+        Natively batched models may override it.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        """
+        return numpy.asarray( [self.cachedPartial( xdata, par ) for par in params],
+                              dtype=float ).reshape( len( params ), -1, self.npbase )
+
     def checkParameter( self, param ) :
         """
         Return parameters corrected for positivity and Non-zero.
@@ -209,6 +324,27 @@ class BaseModel( object ):
                 warnings.warn( msg )
                 param[k] = self.tiny
 
+    def checkParameterBatch( self, params ) :
+        """
+        Check a stack of parameter vectors for Non-zero and positivity.
+
+        Parameters
+        ----------
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        """
+        for k in self.nonZero :
+            zero = params[:,k] == 0
+            if numpy.any( zero ) :
+                msg = ( ( self.shortName() + ": " + self.baseParameterName( k ) +
+                            " ( =parameter[%d] ) equals zero."%k ) )
+                warnings.warn( msg )
+                params[zero,k] = self.tiny
+        for k in self.posIndex :
+            params[:,k] = numpy.abs( params[:,k] )
+        return params
+
     #  *****TOSTRING***********************************************************
     def __str__( self ):
         """ Returns a string representation of the model.  """
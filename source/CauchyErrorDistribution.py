@@ -130,7 +130,7 @@ class CauchyErrorDistribution( ScaledErrorDistribution ):
                 self.sumweight * ( 2 * math.log( scale ) + math.sqrt( 2.0 ) ) )
 
     #  *********LIKELIHOODS***************************************************
-    def logLikelihood( self, model, parlist ):
+    def logLikelihood( self, model, parlist, mock=None ):
         """
         Return the log( likelihood ) for a Cauchy distribution.
         Cauchy distr : f( x ) = s / ( pi * ( s^2 + x^2 ) )
@@ -143,15 +143,37 @@ class CauchyErrorDistribution( ScaledErrorDistribution ):
             model to calculate mock data
         parlist : array_like
             parameters of the problem
+        mock : None or array_like
+            result of the model for the parameters, when already known
 
         """
         self.ncalls += 1
         np = model.npchain
         scale = parlist[np]
-        res2 = numpy.square( self.getResiduals( model, parlist[:np] ) )
+        res2 = numpy.square( self.getResiduals( model, parlist[:np], mock=mock ) )
         return ( self.ndata * ( math.log( scale ) - self.LOGPI ) -
                  numpy.sum( numpy.log( res2 + scale * scale ) ) )
 
+    def batchLogL( self, model, parlists ):
+        """
+        Return the log( likelihood ) for a set of parlists.
+
+        Parameters
+        ----------
+        model : Model
+            model to calculate mock data
+        parlists : array_like of shape (k, npar+1)
+            k lists of all parameters of the problem
+
+        """
+        self.ncalls += len( parlists )
+        np = model.npchain
+        scale = parlists[:,np]
+        res2 = numpy.square( self.getResidualsBatch( model, parlists[:,:np] ) )
+        s2 = ( scale * scale )[:,numpy.newaxis]
+        return ( self.ndata * ( numpy.log( scale ) - self.LOGPI ) -
+                 numpy.sum( numpy.log( res2 + s2 ), axis=1 ) )
+
     def partialLogL( self, model, parlist, fitIndex ) :
         """
         Return the partial derivative of log( likelihood ) to the parameters
@@ -170,9 +192,9 @@ class CauchyErrorDistribution( ScaledErrorDistribution ):
         self.nparts += 1
         np = model.npchain
         scale = parlist[np]
-        res = self.getResiduals( model, parlist[:np] )
+        mock, dM = model.resultAndPartial( self.xdata, parlist[:np] )
+        res = self.getResiduals( model, parlist[:np], mock=mock )
         r2s = res * res + scale * scale
-        dM = model.partial( self.xdata, parlist[:np] )
 
         dL = numpy.zeros( len( fitIndex ), dtype=float )
         i = 0
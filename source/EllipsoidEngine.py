@@ -0,0 +1,424 @@
+import numpy as numpy
+import math
+
+from Engine import Engine
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+class EllipsoidEngine( Engine ):
+    """
+    Draw a new walker uniformly from ellipsoids around the walkers.
+
+    The walkers are enclosed, in unit space, by one or more ellipsoids,
+    which are enlarged (in volume) by a factor enlarge. A trial point is drawn
+    uniformly from the union of the ellipsoids; it is kept when its
+    logLikelihood > lowLhood.
+
+    The ellipsoids are shared by the copies of the engine. The Explorer
+    gives the copies of one iteration their own copy of them, and merges
+    the results afterwards (see mergeShared). They are refitted
+    to the present walkers every refit explorations: the walkers are
+    assigned to the nearest of the existing ellipsoids, which are then
+    recalculated. Every rebuild refits the ellipsoids are decomposed anew:
+    an ellipsoid is split in two (by 2-means clustering) when it reduces
+    the volume by more than half, up to maxellipsoids.
+
+    The engine is meant for static models, where all walkers have the
+    same parameters.
+
+    Attributes
+    ----------
+    enlarge : float (2.0)
+        factor to enlarge the volume of the ellipsoids with
+    refit : int (10)
+        number of explorations between refits
+    rebuild : int (10)
+        number of refits between decompositions
+    maxellipsoids : int (5)
+        maximum number of ellipsoids
+    bound : dict
+        the ellipsoids and the counters, shared by the copies
+
+    Author       Do Kester.
+
+    """
+    MAXDRAW = 1000          #  maximum number of draws for a point inside the unit box
+
+    #  *********CONSTRUCTORS***************************************************
+    def __init__( self, walkers, errdis, copy=None, seed=4213 ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        walkers : SampleList
+            walkers to be diffused
+        errdis : ErrorDistribution
+            error distribution to be used
+        copy : EllipsoidEngine
+            to be copied
+        seed : int
+            for random number generator
+
+        """
+        super( EllipsoidEngine, self ).__init__( walkers, errdis, copy=copy, seed=seed )
+        if copy is None :
+            self.enlarge = 2.0
+            self.refit = 10
+            self.rebuild = 10
+            self.maxellipsoids = 5
+            self.bound = {"ellipsoids" : None, "explores" : 0, "refits" : 0}
+        else :
+            self.enlarge = copy.enlarge
+            self.refit = copy.refit
+            self.rebuild = copy.rebuild
+            self.maxellipsoids = copy.maxellipsoids
+            self.bound = copy.bound
+
+    def copy( self ):
+        """ Return copy of this.  """
+        return EllipsoidEngine( self.walkers, self.errdis, copy=self )
+
+    def __str__( self ):
+        return str( "EllipsoidEngine" )
+
+    def getState( self ):
+        """ Return the state of the engine, including the shared ellipsoids and counters. """
+        state = super( EllipsoidEngine, self ).getState()
+        bound = self.bound
+        ellipsoids = [] if bound["ellipsoids"] is None else bound["ellipsoids"]
+        state["explores"] = numpy.asarray( bound["explores"] )
+        state["refits"] = numpy.asarray( bound["refits"] )
+        state["centers"] = numpy.asarray( [ell.center for ell in ellipsoids], dtype=float )
+        state["matrices"] = numpy.asarray( [ell.matrix for ell in ellipsoids], dtype=float )
+        state["inverses"] = numpy.asarray( [ell.inverse for ell in ellipsoids], dtype=float )
+        return state
+
+    def setState( self, state ):
+        """ Set the state of the engine, including the shared ellipsoids and counters. """
+        super( EllipsoidEngine, self ).setState( state )
+        ellipsoids = []
+        for center, matrix, inverse in zip( state["centers"], state["matrices"],
+                                            state["inverses"] ) :
+            ell = Ellipsoid.__new__( Ellipsoid )
+            ell.setShape( center, matrix, inverse )
+            ellipsoids += [ell]
+        ## keep the bound shared with the copies
+        self.bound.update( {"ellipsoids" : ellipsoids if len( ellipsoids ) > 0 else None,
+                            "explores" : int( state["explores"] ),
+                            "refits" : int( state["refits"] )} )
+
+    def getShared( self ):
+        """ Return the ellipsoids and counters, shared with the copies. """
+        return dict( self.bound )
+
+    def setShared( self, shared ):
+        """ Give the engine its own ellipsoids and counters, as made by getShared. """
+        self.bound = dict( shared )
+
+    def mergeShared( self, shared ):
+        """
+        Add the explores and refits of the copies to the counters and keep
+        the ellipsoids of the last copy that refitted them.
+        """
+        bound = self.bound
+        explores = bound["explores"]
+        refits = bound["refits"]
+        for sh in shared :
+            bound["explores"] += sh["explores"] - explores
+            bound["refits"] += sh["refits"] - refits
+            if sh["refits"] > refits :
+                bound["ellipsoids"] = sh["ellipsoids"]
+
+    #  *********EXECUTE***************************************************
+    def execute( self, walker, lowLhood, fitIndex=None ):
+        """
+        Execute the engine by drawing a new walker from the ellipsoids.
+
+        Parameters
+        ----------
+        walker : Sample
+            walker to diffuse
+        lowLhood : float
+            lower limit in logLikelihood
+        fitIndex : array_like
+            list of the/some parameters indices to be diffused
+
+        Returns
+        -------
+        int : the number of successfull moves
+
+        """
+        if fitIndex is None :
+            fitIndex = walker.fitIndex
+        model = walker.model
+        ellipsoids = self.getEllipsoids( model, fitIndex )
+
+        ptry = walker.parlist.copy()
+        kk = 0
+        while True :
+            kk += 1
+            utry = self.drawUnion( ellipsoids )
+            if utry is None :
+                self.reportFailed()
+                return 0
+
+            ptry[fitIndex] = self.unit2Domain( model, utry, kpar=fitIndex )
+            Ltry = self.errdis.logLikelihood( model, ptry )
+            if Ltry >= lowLhood:
+                self.reportSuccess( )
+                self.setSample( walker, model, ptry, Ltry )
+                return len( fitIndex )                  # an independent point
+            elif kk < self.maxtrials :
+                self.reportReject( )
+            else :
+                self.reportFailed()
+                return 0
+
+    #  *********ELLIPSOIDS***************************************************
+    def getEllipsoids( self, model, fitIndex ):
+        """
+        Return the ellipsoids, refitted when due.
+
+        Parameters
+        ----------
+        model : Model
+            the model of the walkers
+        fitIndex : array_like
+            list of the parameters indices
+        """
+        bound = self.bound
+        ellipsoids = bound["ellipsoids"]
+        due = bound["explores"] % self.refit == 0
+        bound["explores"] += 1
+        if ellipsoids is not None and not due and ellipsoids[0].ndim == len( fitIndex ) :
+            return ellipsoids
+
+        dval = numpy.asarray( [w.parlist[fitIndex] for w in self.walkers] )
+        points = self.domain2Unit( model, dval, kpar=fitIndex )
+
+        if ( ellipsoids is None or ellipsoids[0].ndim != len( fitIndex ) or
+                bound["refits"] % self.rebuild == 0 ) :
+            ellipsoids = self.decompose( points )
+        else :
+            ellipsoids = self.update( ellipsoids, points )
+        bound["refits"] += 1
+        bound["ellipsoids"] = ellipsoids
+        return ellipsoids
+
+    def decompose( self, points ):
+        """
+        Return a list of ellipsoids enclosing the points.
+
+        An ellipsoid is split into two when that halves the volume,
+        until there are maxellipsoids.
+
+        Parameters
+        ----------
+        points : array_like
+            points in unit space (n, ndim)
+        """
+        ellipsoids = [Ellipsoid( points, self.enlarge )]
+        clusters = [points]
+        k = 0
+        while k < len( clusters ) and len( ellipsoids ) < self.maxellipsoids :
+            pts = clusters[k]
+            split = self.split( pts )
+            if split is not None :
+                ell = [Ellipsoid( p, self.enlarge ) for p in split]
+                if numpy.logaddexp( ell[0].logVolume, ell[1].logVolume ) < ellipsoids[k].logVolume - math.log( 2 ) :
+                    ellipsoids[k:k+1] = ell
+                    clusters[k:k+1] = split
+                    continue
+            k += 1
+        return ellipsoids
+
+    def update( self, ellipsoids, points ):
+        """
+        Return the ellipsoids refitted to the points, keeping the decomposition.
+
+        Each point is assigned to the ellipsoid it is (relatively) nearest to.
+        An ellipsoid with too few points to be refitted is dropped; its points
+        are assigned to the nearest of the remaining ones. So all points are
+        enclosed by the new ellipsoids.
+
+        Parameters
+        ----------
+        ellipsoids : list of Ellipsoid
+            the present ellipsoids
+        points : array_like
+            points in unit space (n, ndim)
+        """
+        if len( ellipsoids ) == 1 :
+            return [Ellipsoid( points, self.enlarge )]
+        dist = numpy.asarray( [ell.distance( points ) for ell in ellipsoids] )
+        minpts = points.shape[1] + 1
+        alive = numpy.ones( len( ellipsoids ), dtype=bool )
+        while True :
+            near = numpy.argmin( numpy.where( alive[:,numpy.newaxis], dist, math.inf ), axis=0 )
+            counts = numpy.bincount( near, minlength=len( ellipsoids ) )
+            small = alive & ( counts < minpts )
+            if not numpy.any( small ) :
+                break
+            ## drop the smallest one and reassign its points
+            alive[numpy.argmin( numpy.where( small, counts, len( points ) + 1 ) )] = False
+            if not numpy.any( alive ) :
+                return [Ellipsoid( points, self.enlarge )]
+        return [Ellipsoid( points[near == k], self.enlarge ) for k in numpy.where( alive )[0]]
+
+    def split( self, points ):
+        """
+        Return the points split in 2 clusters, or None when too few points.
+
+        Parameters
+        ----------
+        points : array_like
+            points in unit space (n, ndim)
+        """
+        npt, ndim = points.shape
+        if npt < 4 * ( ndim + 1 ) :
+            return None
+
+        ## start at the point farthest from the center and the one farthest from that.
+        k0 = numpy.argmax( numpy.sum( ( points - numpy.mean( points, axis=0 ) ) ** 2, axis=1 ) )
+        k1 = numpy.argmax( numpy.sum( ( points - points[k0] ) ** 2, axis=1 ) )
+        centers = points[[k0, k1]]
+        for i in range( 10 ) :
+            dist = numpy.sum( ( points[:,numpy.newaxis,:] - centers ) ** 2, axis=2 )
+            label = numpy.argmin( dist, axis=1 )
+            if min( numpy.sum( label == 0 ), numpy.sum( label == 1 ) ) < ndim + 1 :
+                return None
+            newc = numpy.asarray( [numpy.mean( points[label == k], axis=0 ) for k in range( 2 )] )
+            if numpy.all( newc == centers ) :
+                break
+            centers = newc
+        return [points[label == 0], points[label == 1]]
+
+    def drawUnion( self, ellipsoids ):
+        """
+        Return a point drawn uniformly from the union of the ellipsoids,
+        within the unit box. None when it cannot be found.
+
+        Parameters
+        ----------
+        ellipsoids : list of Ellipsoid
+            the ellipsoids
+        """
+        logv = numpy.asarray( [ell.logVolume for ell in ellipsoids] )
+        prob = numpy.exp( logv - numpy.max( logv ) )
+        prob /= numpy.sum( prob )
+        for k in range( self.MAXDRAW ) :
+            ke = self.rng.choice( len( ellipsoids ), p=prob ) if len( ellipsoids ) > 1 else 0
+            u = ellipsoids[ke].sample( self.rng )
+            if numpy.any( u <= 0 ) or numpy.any( u >= 1 ) :
+                continue
+            if len( ellipsoids ) > 1 :
+                ## a point inside n ellipsoids is kept with probability 1/n
+                nin = sum( [ell.contains( u ) for ell in ellipsoids] )
+                if self.rng.rand() * nin > 1 :
+                    continue
+            return u
+        return None
+
+
+class Ellipsoid( object ):
+    """
+    Ellipsoid enclosing a set of points.
+
+    The ellipsoid has the shape of the covariance matrix of the points,
+    scaled such that it encloses all points and then enlarged in volume.
+
+    Attributes
+    ----------
+    center : array_like
+        center of the ellipsoid
+    ndim : int
+        dimensionality
+    logVolume : float
+        log of the volume (apart from the constant of a unit sphere)
+
+    Author       Do Kester.
+
+    """
+    def __init__( self, points, enlarge=1.0 ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        points : array_like
+            points (n, ndim) to be enclosed
+        enlarge : float
+            factor to enlarge the volume with
+        """
+        npt, ndim = points.shape
+        self.ndim = ndim
+        self.center = numpy.mean( points, axis=0 )
+        dp = points - self.center
+        cov = numpy.atleast_2d( numpy.cov( dp, rowvar=False ) ) if npt > 1 else numpy.zeros( ( ndim, ndim ) )
+        ## keep the ellipsoid non-degenerate
+        cov += numpy.diag( numpy.maximum( numpy.diag( cov ), 1e-10 ) * 1e-6 + 1e-12 )
+
+        inv = numpy.linalg.inv( cov )
+        fmax = max( numpy.max( numpy.einsum( "ij,jk,ik->i", dp, inv, dp ) ), 1e-10 )
+        scale = fmax * enlarge ** ( 2.0 / ndim )
+
+        self.setShape( self.center, cov * scale, inv / scale )
+
+    def setShape( self, center, matrix, inverse ):
+        """
+        Set the center and shape of the ellipsoid.
+
+        Parameters
+        ----------
+        center : array_like
+            center of the ellipsoid
+        matrix : array_like
+            (scaled) covariance matrix of the ellipsoid
+        inverse : array_like
+            inverse of the matrix
+        """
+        self.ndim = len( center )
+        self.center = numpy.asarray( center, dtype=float )
+        self.matrix = numpy.asarray( matrix, dtype=float )
+        self.inverse = numpy.asarray( inverse, dtype=float )
+        self.chol = numpy.linalg.cholesky( self.matrix )
+        self.logVolume = 0.5 * numpy.linalg.slogdet( self.matrix )[1]
+
+    def distance( self, points ):
+        """ Return the scaled (squared) distances of the points to the center. """
+        dp = points - self.center
+        return numpy.einsum( "ij,jk,ik->i", dp, self.inverse, dp )
+
+    def contains( self, point ):
+        """ Return True when the point is inside the ellipsoid. """
+        dp = point - self.center
+        return dp @ self.inverse @ dp <= 1.0
+
+    def sample( self, rng ):
+        """ Return a point drawn uniformly from the ellipsoid. """
+        z = rng.randn( self.ndim )
+        z *= rng.rand() ** ( 1.0 / self.ndim ) / math.sqrt( numpy.sum( z * z ) )
+        return self.center + self.chol @ z
@@ -1,6 +1,7 @@
 import numpy as numpy
 from astropy import units
 import math
+from collections import deque
 import Tools
 
 __author__ = "Do Kester"
@@ -48,6 +49,12 @@ class Engine( object ):
         maximum number of trials for various operations
     rng : numpy.random.RandomState
         random number generator
+    size : float (1.0)
+        scale of the steps, for engines that take steps of a size
+    target : None or float
+        acceptance rate to adapt the size to (None : no adaptation)
+    window : int (100)
+        number of explorations over which the acceptance rate is taken
 
     report : list of int (read only)
         reports number of succes, accepted, rejected, failed calls. Plus the total.
@@ -64,6 +71,9 @@ class Engine( object ):
     FAILED = 2              #  failed to move
     NCALLS = 3              #  number of calls
 
+    ADAPTRATE = 0.5         #  speed of the size adaptation, per window
+    MINSIZE = 0.0001        #  limits of the size
+    MAXSIZE = 10.0
 
     #  *********CONSTRUCTORS***************************************************
 
@@ -83,13 +93,20 @@ class Engine( object ):
         self.walkers = walkers
         self.errdis = errdis
         self.report = [0]*4
+        self._accepts = None
 
         if copy is None :
             self.maxtrials = 5
             self.rng = numpy.random.RandomState( seed )
+            self.size = 1.0
+            self.target = None
+            self.window = 100
         else :
             self.maxtrials = copy.maxtrials
             self.rng = copy.rng
+            self.size = copy.size
+            self.target = copy.target
+            self.window = copy.window
 
     def copy( self ):
         """ Return a copy of ths engine.  """
@@ -130,9 +147,6 @@ class Engine( object ):
             walker.logW = logW
         self.walkers[walker.id] = walker
 
-###### TBD:
-##  Has dval the length kpar ???
-
     def domain2Unit( self, model, dval, kpar=None ) :
         """
         Return value in [0,1] for the selected parameter.
@@ -141,25 +155,35 @@ class Engine( object ):
         ----------
         model : Model
             the model involved
-        dval : float
-            domain value for the selected parameter
-        kpar : None or array_like
+        dval : array_like
+            domain values of all parameters, [parameters, hyperparams].
+            A 2-d array (k, npar) converts k sets of values.
+        kpar : None or int or array_like
             selected parameter index, where kp is index in [parameters, hyperparams]
             None means all
+
+        Returns
+        -------
+        the unit values of the selected parameters
         """
         np = model.npchain
-        if kpar is None :
-            kpar = range( len( dval ) )
-        elif Tools.isInstance( kpar, int ) :
+        if Tools.isInstance( kpar, int ) :
             return ( model.domain2Unit( dval, kpar ) if kpar < np else
                      self.errdis.domain2Unit( dval, kpar - np ) )
 
-        uval = numpy.ndarray( len( kpar ), dtype=float )
-        for i,kp in enumerate( kpar ) :
-            if kp < np :
-                uval[i] = model.domain2Unit( dval[kp], kp )
-            else :
-                uval[i] = self.errdis.domain2Unit( dval[kp], kp - np )
+        dval = numpy.asarray( dval, dtype=float )
+        kpar = ( numpy.arange( dval.shape[-1] ) if kpar is None else
+                 numpy.asarray( kpar, dtype=int ) )
+
+        uval = numpy.empty( dval.shape[:-1] + ( len( kpar ), ), dtype=float )
+        qm = kpar < np
+        if numpy.all( qm ) :
+            return model.domain2Unit( dval[...,kpar], kpar=kpar )
+        uval[...,qm] = model.domain2Unit( dval[...,kpar[qm]], kpar=kpar[qm] )
+        for i in numpy.flatnonzero( ~qm ) :
+            ks = kpar[i] - np
+            uval[...,i] = numpy.reshape( [self.errdis.domain2Unit( d, ks )
+                            for d in numpy.ravel( dval[...,kpar[i]] )], dval.shape[:-1] )
         return uval
 
     def unit2Domain( self, model, uval, kpar=None ) :
@@ -171,26 +195,115 @@ class Engine( object ):
         model : Model
             the model involved
         uval : array_like
-            unit value for the selected parameter
-        kpar : None or array_like
+            unit values for the selected parameters, one for each kpar.
+            A 2-d array (k, len( kpar ) ) converts k sets of values.
+        kpar : None or int or array_like
             selected parameter indices, where kp is index in [parameters, hyperparams]
             None means all.
+
+        Returns
+        -------
+        the domain values of the selected parameters
         """
         np = model.npchain
-        if kpar is None :
-            kpar = range( len( uval ) )
-        elif Tools.isInstance( kpar, int ) :
+        if Tools.isInstance( kpar, int ) :
             return ( model.unit2Domain( uval, kpar ) if kpar < np else
                      self.errdis.unit2Domain( uval, kpar - np ) )
 
-        dval = numpy.ndarray( len( kpar ), dtype=float )
-        for i,kp in enumerate( kpar ) :
-            if kp < np :
-                dval[i] = model.unit2Domain( uval[kp], kp )
-            else :
-                dval[i] = self.errdis.unit2Domain( uval[kp], kp - np )
+        uval = numpy.asarray( uval, dtype=float )
+        kpar = ( numpy.arange( uval.shape[-1] ) if kpar is None else
+                 numpy.asarray( kpar, dtype=int ) )
+
+        qm = kpar < np
+        if numpy.all( qm ) :
+            return model.unit2Domain( uval, kpar=kpar )
+        dval = numpy.empty_like( uval )
+        dval[...,qm] = model.unit2Domain( uval[...,qm], kpar=kpar[qm] )
+        for i in numpy.flatnonzero( ~qm ) :
+            ks = kpar[i] - np
+            dval[...,i] = numpy.reshape( [self.errdis.unit2Domain( u, ks )
+                            for u in numpy.ravel( uval[...,i] )], uval.shape[:-1] )
         return dval
 
+    def adaptSize( self, moves, trials ):
+        """
+        Adapt the size of the steps towards the target acceptance rate.
+
+        The acceptance rate is taken over the last window explorations.
+        The size is multiplied by exp( ADAPTRATE * ( rate - target ) / target / window ),
+        such that it changes smoothly, by about a factor exp( ADAPTRATE ) per
+        window at most. It is kept within [MINSIZE, MAXSIZE].
+
+        Parameters
+        ----------
+        moves : int
+            number of accepted moves in the last exploration
+        trials : int
+            number of trials in the last exploration
+        """
+        if self.target is None or trials == 0 :
+            return
+        if self._accepts is None or self._accepts.maxlen != self.window :
+            self._accepts = deque( maxlen=self.window )
+        self._accepts.append( ( moves, trials ) )
+
+        rate = sum( a[0] for a in self._accepts ) / sum( a[1] for a in self._accepts )
+        size = self.size * math.exp( self.ADAPTRATE * ( rate - self.target ) /
+                                     ( self.target * self.window ) )
+        self.size = min( max( size, self.MINSIZE ), self.MAXSIZE )
+
+    def getState( self ):
+        """
+        Return the state of the engine as a dictionary of arrays.
+
+        The random number generator is not included.
+        """
+        accepts = [] if self._accepts is None else list( self._accepts )
+        return {"report" : numpy.asarray( self.report, dtype=int ),
+                "size" : numpy.asarray( self.size ),
+                "accepts" : numpy.asarray( accepts, dtype=float ).reshape( -1, 2 )}
+
+    def setState( self, state ):
+        """
+        Set the state of the engine from a dictionary as made by getState.
+
+        Parameters
+        ----------
+        state : dict of {str : array_like}
+            the state of the engine
+        """
+        self.report = [int( r ) for r in state["report"]]
+        self.size = float( state["size"] )
+        self._accepts = deque( [tuple( a ) for a in state["accepts"]], maxlen=self.window )
+
+    def getShared( self ):
+        """
+        Return the state that the engine shares with its copies; None if there is none.
+        """
+        return None
+
+    def setShared( self, shared ):
+        """
+        Give the engine its own copy of a shared state, as made by getShared.
+
+        Parameters
+        ----------
+        shared : object
+            the shared state
+        """
+        pass
+
+    def mergeShared( self, shared ):
+        """
+        Merge the shared states of copies that started from the state of this engine.
+
+        Parameters
+        ----------
+        shared : list
+            the shared states of the copies, as made by getShared, in order
+        """
+        pass
+
     def reportCall( self ):
         """ Store a call to engine  """
         self.report[self.NCALLS] += 1
@@ -204,9 +317,9 @@ class Engine( object ):
     def reportFailed( self ):
         self.report[self.FAILED] += 1
 
-    def printReport( self ) :
+    def printReport( self, end="\n" ) :
         print( " %10d %10d %10d %10d" % (self.report[0], self.report[1],
-                                         self.report[2], self.report[3] ) )
+                                         self.report[2], self.report[3] ), end=end )
 
     def calculateUnitRange( self ):
         """
@@ -66,9 +66,19 @@ class ErrorDistribution( object ):
         list of values for the hyperparameters
     nphypar : int
         number of hyper parameters in this error distribution
+    partcache : dict of {key : tuple}
+        results of the model components per walker (key), for updateLogL.
+        It is not pickled.
     """
 
     PARNAMES = ["hypar"]
+    MAXBATCH = 1048576              # max number of floats in a batched result matrix
+
+    ## attributes and their types, see __setattr__
+    NONEATTRS = ["weights", "hyperpar", "fixed"]
+    LISTATTRS = {"xdata": float, "data": float, "weights": float, "hyperpar": HyperParameter}
+    SINGLEATTRS = {"deltaP": float, "sumweight" : float, "ncalls": int, "nparts": int,
+                   "fixed": dict, "partcache": dict }
 
     #  *********CONSTRUCTORS***************************************************
     def __init__( self, xdata, data, weights=None, fixed=None, copy=None ):
@@ -93,6 +103,7 @@ class ErrorDistribution( object ):
         super( ErrorDistribution, self ).__init__()
         self.ncalls = 0
         self.nparts = 0
+        self.partcache = {}
         if copy is None :
             self.xdata = xdata
             self.data = data
@@ -112,19 +123,24 @@ class ErrorDistribution( object ):
         """ Return copy of this.  """
         return ErrorDistribution( copy=self )
 
+    def __getstate__( self ):
+        """ Pickle without the partcache. """
+        state = self.__dict__.copy()
+        state["partcache"] = {}
+        return state
+
     def __setattr__( self, name, value ):
         """
         Set attributes.
 
+        A value of exactly the type of a single attribute (like ncalls += 1)
+        is set without further checks.
         """
-        key0 = ["weights", "hyperpar", "fixed"]
-        keys = {"xdata": float, "data": float, "weights": float,
-                "hyperpar": HyperParameter}
-        key1 = {"deltaP": float, "sumweight" : float, "ncalls": int, "nparts": int,
-                "fixed": dict }
-        if ( Tools.setNoneAttributes( self, name, value, key0 ) or
-             Tools.setListOfAttributes( self, name, value, keys ) or
-             Tools.setSingleAttributes( self, name, value, key1 ) ) :
+        if type( value ) is self.SINGLEATTRS.get( name ) :
+            object.__setattr__( self, name, value )
+        elif ( Tools.setNoneAttributes( self, name, value, self.NONEATTRS ) or
+             Tools.setListOfAttributes( self, name, value, self.LISTATTRS ) or
+             Tools.setSingleAttributes( self, name, value, self.SINGLEATTRS ) ) :
             pass
         else :
             raise AttributeError(
@@ -285,7 +301,7 @@ class ErrorDistribution( object ):
 
     #  *********LIKELIHOODS***************************************************
 
-    def logLikelihood( self, model, parlist ):
+    def logLikelihood( self, model, parlist, mock=None ):
         """
         Return the log( likelihood ).
 
@@ -295,9 +311,71 @@ class ErrorDistribution( object ):
             to be fitted
         parlist : array_like
             parameters of the problem
+        mock : None or array_like
+            result of the model for the parameters, when already known
         """
         pass
 
+    def logLikelihoodBatch( self, model, parlists ):
+        """
+        Return the log( likelihood ) for a set of parlists.
+
+        The parlists are processed in chunks such that the matrix of results
+        does not exceed MAXBATCH floats.
+
+        Parameters
+        ----------
+        model : Model
+            to be fitted
+        parlists : array_like of shape (k, npar+nhyp)
+            k lists of all parameters of the problem
+
+        Returns
+        -------
+        array_like of length k : the log( likelihood ) for each parlist
+        """
+        parlists = Tools.toArray( parlists, ndim=2, dtype=float )
+        nlist = len( parlists )
+        logL = numpy.zeros( nlist, dtype=float )
+        nrow = max( 1, self.MAXBATCH // max( 1, self.ndata ) )
+        for k in range( 0, nlist, nrow ) :
+            logL[k:k+nrow] = self.batchLogL( model, parlists[k:k+nrow] )
+        return logL
+
+    def batchLogL( self, model, parlists ):
+        """
+        Return the log( likelihood ) for a (small) set of parlists.
+
+        This default calls logLikelihood for each of the parlists.
+        Distributions override it with a vectorised version.
+
+        Parameters
+        ----------
+        model : Model
+            to be fitted
+        parlists : array_like of shape (k, npar+nhyp)
+            k lists of all parameters of the problem
+        """
+        return numpy.fromiter( ( self.logLikelihood( model, pl ) for pl in parlists ),
+                               float, len( parlists ) )
+
+    def getResultBatch( self, model, params ):
+        """
+        Return the results of the model for a set of parameters.
+
+        Parameters
+        ----------
+        model : Model
+            to be fitted
+        params : array_like of shape (k, npar)
+            k lists of model parameters
+
+        Returns
+        -------
+        array_like of shape (k, ndata)
+        """
+        return model.resultBatch( self.xdata, params )
+
     def partialLogL( self, model, parlist, fitIndex ) :
         """
         Return the partial derivative of log( likelihood ) to the parameters.
@@ -314,10 +392,15 @@ class ErrorDistribution( object ):
         """
         return self.numPartialLogL( model, parlist, fitIndex )
 
-    def numPartialLogL( self, model, parlist, fitIndex ) :
+    def numPartialLogL( self, model, parlist, fitIndex, onesided=False ) :
         """
         Return d log( likelihood ) / dp, numerically calculated.
 
+        All perturbed parameter lists are evaluated together in one call to
+        logLikelihoodBatch. Central differences need 2 lists per parameter;
+        one-sided (forward) differences need 1 per parameter plus the
+        unperturbed one.
+
         Parameters
         ----------
         model : Model
@@ -326,29 +409,67 @@ class ErrorDistribution( object ):
             parameters of the problem
         fitIndex : array_like
             indices of parameters to be fitted
+        onesided : bool
+            use one-sided differences. Default: central differences.
 
         """
-        dL = numpy.zeros( len( fitIndex ), dtype=float )
-        p = parlist.copy( )
-        i = 0
-        for k in fitIndex :
-            p[k] = parlist[k] - self.deltaP
-            lm = self.logLikelihood( model, p )
-            p[k] = parlist[k] + self.deltaP
-            lp = self.logLikelihood( model, p )
-            dL[i] = 0.5 * ( lp - lm ) / self.deltaP
-            i += 1
-            p[k]= parlist[k]
-        return dL
-
-
-    def updateLogL( self, model, parlist, parval=None ):
+        self.nparts += 1
+        fitIndex = numpy.asarray( fitIndex, dtype=int )
+        nf = len( fitIndex )
+        rows = numpy.arange( nf )
+        if onesided :
+            plist = numpy.tile( numpy.asarray( parlist, dtype=float ), ( nf + 1, 1 ) )
+            plist[rows,fitIndex] += self.deltaP
+            logL = self.logLikelihoodBatch( model, plist )
+            return ( logL[:nf] - logL[nf] ) / self.deltaP
+
+        plist = numpy.tile( numpy.asarray( parlist, dtype=float ), ( 2 * nf, 1 ) )
+        plist[rows,fitIndex] -= self.deltaP
+        plist[rows+nf,fitIndex] += self.deltaP
+        logL = self.logLikelihoodBatch( model, plist )
+        return 0.5 * ( logL[nf:] - logL[:nf] ) / self.deltaP
+
+
+    def updateLogL( self, model, parlist, parval=None, key=None ):
         """"
         Return a update of the log( likelihood ) given a change in a few parameter.
 
-        This method provides the opportunity to optimize the logL calculation.
-        Providing this one, automatically provides the previous one.
-        For now it just refers to logLikelihood() itself.
+        The results of the components of the model are kept per key. When the
+        parameters before the change (parlist with parval inserted) are those
+        of the previous call with the same key, or of the one before it, only
+        the components that contain the changed parameters are recalculated.
+        The other components are reused; a change in the hyperparameters
+        needs no model calculation at all.
+
+        Without parval or key it just refers to logLikelihood() itself.
+
+        Parameters
+        ----------
+        model : Model
+            to be fitted
+        parlist : array_like
+            parameters of the problem
+        parval : dict of {int : float}
+            int index of a parameter
+            float (old) value of the parameter
+        key : None or int
+            identifies the walker the parameters belong to.
+        """
+        if parval is None or key is None :
+            return self.logLikelihood( model, parlist )
+
+        mock = self.updateResult( model, parlist[:model.npchain], parval, key )
+        return self.logLikelihood( model, parlist, mock=mock )
+
+    def updateResult( self, model, param, parval, key ):
+        """
+        Return the result of the model, recalculating only the changed components.
+
+        One state (model, parameters, component results) is kept per key in
+        partcache: the one the changes start from. When a change starts from
+        other parameters (after an accepted change) it is calculated anew.
+        Each walker has its own key, so threads exploring different walkers
+        do not interfere.
 
         Parameters
         ----------
@@ -359,8 +480,21 @@ class ErrorDistribution( object ):
         parval : dict of {int : float}
             int index of a parameter
             float (old) value of the parameter
+        key : int
+            identifies the walker the parameters belong to.
         """
-        return self.logLikelihood( model, parlist )
+        oldpar = numpy.array( param, dtype=float )
+        for k,v in parval.items() :
+            if k < len( oldpar ) :
+                oldpar[k] = v
+
+        state = self.partcache.get( key )
+        if state is None or state[0] is not model or not numpy.array_equal( state[1], oldpar ) :
+            state = ( model, oldpar, model.resultParts( self.xdata, oldpar ) )
+            self.partcache[key] = state
+
+        parts = model.resultParts( self.xdata, param, parts=state[2], kpar=parval.keys() )
+        return model.combineParts( parts )
 
     def setResult( self ):
         pass
@@ -54,6 +54,9 @@ class ExpModel( NonLinearModel ):
     Category:    mathematics/Fitting
 
     """
+    ## baseResult broadcasts over a stack of parameters
+    BATCHED = True
+
     def __init__( self, copy=None, **kwargs ):
         """
         Exponential model.
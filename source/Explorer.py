@@ -1,6 +1,10 @@
 import numpy as numpy
+import multiprocessing
+import time
 from threading import Thread
 
+from Engine import Engine
+
 __author__ = "Do Kester"
 __year__ = 2017
 __license__ = "GPL3"
@@ -34,7 +38,26 @@ class Explorer( object ):
     Explorer is a helper class of NestedSampler, which contains and runs the
     diffusion engines.
 
-    It uses Threads to parallelise the diffusion engines.
+    It uses Threads to parallelise the diffusion engines. Alternatively it
+    uses a pool of long-lived worker processes, each of which holds a copy of
+    the model, the data and the engines. Only the parameters of the walkers
+    and the low likelihood level are exchanged with the workers.
+
+    All walkers of one iteration are explored from the same start: a snapshot
+    of the ensemble and the state of the engines, as they are when the
+    exploration begins. Each walker gets its own copies of them and its own
+    random number generator, seeded in the order of the walkers. The results
+    are put back in that order, after all walkers are explored. So, for a
+    fixed seed, the outcome depends neither on the scheduling of the threads
+    or processes nor on the backend.
+
+    By default (schedule "fixed") all engines are applied in a random order
+    in each round. With schedule "calls" or "time" the engines are selected
+    at random with probabilities (the allocation) that follow their yield:
+    the accepted moves per trial (logL call), or per second. The yields are
+    averaged over the recent explorations with a decay of DECAY. A fraction
+    MINSHARE of the selections is divided equally over all engines, such that
+    each engine keeps being applied.
 
     Attributes
     ----------
@@ -54,10 +77,24 @@ class Explorer( object ):
         present low likelihood level
     generation : int
         counting explorer calls
+    backend : "thread" or "process"
+        explore the walkers in threads or in worker processes
+    workers : None or int
+        number of worker processes (None : number of cpus)
+    pool : None or multiprocessing.Pool
+        pool of worker processes (only for backend "process")
+    schedule : "fixed" or "calls" or "time"
+        how the engines are selected
+    allocation : array_like
+        probabilities to select the engines
+    moves, trials, seconds : array_like
+        decayed sums of accepted moves, trials and time spent per engine
 
     Author       Do Kester.
 
     """
+    MINSHARE = 0.2
+    DECAY = 0.99
 
     def __init__( self, ns ):
         """
@@ -76,6 +113,25 @@ class Explorer( object ):
         self.verbose = ns.verbose
         self.engines[0].calculateUnitRange( )
 
+        if ns.schedule not in ["fixed", "calls", "time"] :
+            raise ValueError( "Unknown schedule : %s" % ns.schedule )
+        self.schedule = ns.schedule
+        ne = len( self.engines )
+        self.allocation = numpy.full( ne, 1.0 / ne )
+        self.moves = numpy.zeros( ne, dtype=float )
+        self.trials = numpy.zeros( ne, dtype=float )
+        self.seconds = numpy.zeros( ne, dtype=float )
+        self.elapsed = numpy.zeros( ne, dtype=float )
+
+        self.backend = "thread" if ns.backend is None else ns.backend
+        self.workers = ns.workers
+        self.pool = None
+        if self.backend == "process" :
+            self.pool = multiprocessing.Pool( processes=self.workers,
+                    initializer=_startWorker,
+                    initargs=( self.walkers, self.engines, self.rate,
+                               self.maxtrials, self.verbose, self.schedule ) )
+
     def explore( self, worst, lowLhood, fitindex ):
         """
         Explore the likelihood function, using threads.
@@ -91,24 +147,167 @@ class Explorer( object ):
 
         """
         self.lowLhood = lowLhood
-        explorerThreads = []
-        for kw in worst :
-            exThread = ExplorerThread( "explorer_%d"%kw, kw, self, fitindex )
-            exThread.start( )
-            explorerThreads += [exThread]
+        reports = numpy.asarray( [eng.report for eng in self.engines], dtype=float )
+        self.elapsed[:] = 0.0
+        seeds = [self.rng.randint( 100000 ) for kw in worst]
+        if self.pool is not None :
+            shared = self.processExplore( worst, seeds, lowLhood, fitindex )
+        else :
+            shared = self.threadExplore( worst, seeds, lowLhood, fitindex )
 
-        for thread in explorerThreads :
-            thread.join( )
-            for k,e in enumerate( self.engines ) :
-                nc = 0
-                for i in range( 3 ) :
-                    nc += thread.engines[k].report[i]
-                    e.report[i] += thread.engines[k].report[i]
-                e.report[3] += nc
+        for k,eng in enumerate( self.engines ) :
+            eng.mergeShared( [sh[k] for sh in shared] )
+
+        delta = numpy.asarray( [eng.report for eng in self.engines], dtype=float ) - reports
+        for eng,dr in zip( self.engines, delta ) :
+            eng.adaptSize( dr[Engine.SUCCESS], dr[Engine.NCALLS] )
+
+        if self.schedule != "fixed" :
+            self.updateAllocation( delta )
 
         # recalculate  TBC
         self.engines[0].calculateUnitRange( )
 
+    def getState( self ):
+        """
+        Return the state of the allocation of the engines as a dictionary of arrays.
+        """
+        return {"allocation" : numpy.array( self.allocation, dtype=float ),
+                "moves" : self.moves.copy(),
+                "trials" : self.trials.copy(),
+                "seconds" : self.seconds.copy()}
+
+    def setState( self, state ):
+        """
+        Set the state of the allocation from a dictionary as made by getState.
+
+        Parameters
+        ----------
+        state : dict of {str : array_like}
+            the state of the allocation
+        """
+        for key in ["allocation", "moves", "trials", "seconds"] :
+            setattr( self, key, numpy.array( state[key], dtype=float ) )
+
+    def updateAllocation( self, delta ):
+        """
+        Update the allocation of the engines with the results of an exploration.
+
+        Parameters
+        ----------
+        delta : array_like
+            changes in the reports of the engines during the exploration
+        """
+        self.moves = self.DECAY * self.moves + delta[:,Engine.SUCCESS]
+        self.trials = self.DECAY * self.trials + delta[:,Engine.NCALLS]
+        self.seconds = self.DECAY * self.seconds + self.elapsed
+
+        yields = ( self.moves + 1 ) / ( self.trials + 2 )
+        if self.schedule == "time" :
+            used = self.seconds > 0
+            if not numpy.any( used ) :
+                return
+            yields[used] *= self.trials[used] / self.seconds[used]
+            yields[~used] = numpy.max( yields[used] )
+
+        ne = len( self.engines )
+        self.allocation = ( self.MINSHARE / ne +
+                            ( 1 - self.MINSHARE ) * yields / numpy.sum( yields ) )
+
+    def threadExplore( self, worst, seeds, lowLhood, fitindex ):
+        """
+        Explore the walkers, each in its own thread.
+
+        When more than one walker is explored, each thread explores a snapshot
+        of the ensemble. The new walkers are put back in the order of worst.
+
+        Returns
+        -------
+        list of the shared states of the engines of each thread
+        """
+        explorerThreads = []
+        for kw, seed in zip( worst, seeds ) :
+            walkers = self.walkers if len( worst ) == 1 else self.walkers.snapshot()
+            explorerThreads += [ExplorerThread( "explorer_%d"%kw, kw, self, fitindex,
+                                                seed=seed, walkers=walkers )]
+        for thread in explorerThreads :
+            thread.start( )
+
+        shared = []
+        for kw, thread in zip( worst, explorerThreads ) :
+            thread.join( )
+            if thread.walkers is not self.walkers :
+                sample = thread.walkers[kw]
+                walker = self.walkers[kw]
+                walker.model = sample.model
+                walker.parlist = sample.parlist
+                walker.logL = sample.logL
+                self.walkers[kw] = walker               # update the logL index
+            self.addReports( [eng.report for eng in thread.engines] )
+            self.elapsed += thread.elapsed
+            shared += [[eng.getShared() for eng in thread.engines]]
+        return shared
+
+    def processExplore( self, worst, seeds, lowLhood, fitindex ):
+        """
+        Explore the walkers in the worker processes.
+
+        The workers get the present parameters and logLs of the ensemble and
+        the state of the engines; they return the new parameters and logL of
+        the explored walker, together with the engine reports, the shared
+        states of the engines and the number of calls.
+
+        Returns
+        -------
+        list of the shared states of the engines of each task
+        """
+        parlists = numpy.asarray( [w.parlist for w in self.walkers] )
+        logLs = numpy.asarray( [w.logL for w in self.walkers] )
+        sizes = [eng.size for eng in self.engines]
+        states = [eng.getShared() for eng in self.engines]
+        tasks = [( kw, seed, lowLhood, fitindex, parlists, logLs, self.allocation,
+                   sizes, states ) for kw, seed in zip( worst, seeds )]
+
+        errdis = self.engines[0].errdis
+        shared = []
+        for ( kw, parlist, logL, reports, ncalls, nparts, elapsed,
+              engstates ) in self.pool.map( _exploreWorker, tasks ) :
+            walker = self.walkers[kw]
+            walker.parlist = parlist
+            walker.logL = logL
+            self.walkers[kw] = walker                   # update the logL index
+            self.addReports( reports )
+            self.elapsed += elapsed
+            errdis.ncalls += ncalls
+            errdis.nparts += nparts
+            shared += [engstates]
+        return shared
+
+    def addReports( self, reports ):
+        """
+        Add the reports of the (copied) engines to those of the Explorer.
+
+        Parameters
+        ----------
+        reports : list of [int]
+            reports of the engines, in the same order as self.engines
+        """
+        for e,rep in zip( self.engines, reports ) :
+            nc = 0
+            for i in range( 3 ) :
+                nc += rep[i]
+                e.report[i] += rep[i]
+            e.report[3] += nc
+
+    def close( self ):
+        """
+        Stop the worker processes, if any.
+        """
+        if self.pool is not None :
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
 class ExplorerThread( Thread ):
     """
     One thread for the Explorer. It updates one walker.
@@ -118,31 +317,44 @@ class ExplorerThread( Thread ):
     id : int
         identity for thread
     walkers : SampleList
-        list of walkers
+        list of walkers to be explored (default: those of the explorer)
     rng : numpy.random.RandomState
         random number generator
     engines : [Engine]
-        copy of the list of Engines of Explorer
+        copy of the list of Engines of Explorer, working on walkers, with
+        their own shared states
     errdis : ErrorDistribution
         to be used (=self.engines[0].errdis)
+    elapsed : array_like
+        time spent in each of the engines
     """
 
-    def __init__( self, name, id, explorer, fitindex ):
+    def __init__( self, name, id, explorer, fitindex, seed=None, walkers=None ):
         super( ExplorerThread, self ).__init__( name=name )
         self.id = id
         self.explorer = explorer
         self.fitindex = fitindex
+        self.walkers = explorer.walkers if walkers is None else walkers
         self.engines = [eng.copy() for eng in explorer.engines]
-        seed = explorer.rng.randint( 100000 )
+        if seed is None :
+            seed = explorer.rng.randint( 100000 )
         self.rng = numpy.random.RandomState( seed )
+        # the engines draw from the rng of this thread and work on their own
+        # walkers and shared states; it makes the results independent of the
+        # scheduling of the threads.
+        for eng in self.engines :
+            eng.rng = self.rng
+            eng.walkers = self.walkers
+            eng.setShared( eng.getShared() )
         self.errdis = self.engines[0].errdis
         self.verbose = explorer.verbose
+        self.elapsed = numpy.zeros( len( self.engines ), dtype=float )
 
     def run( self ):
         self.explore( self.id, self.fitindex )
 
     def explore( self, walkerId, fitindex ):
-        walker = self.explorer.walkers[walkerId]
+        walker = self.walkers[walkerId]
         oldlogL = walker.logL
 
         maxmoves = len( fitindex ) / self.explorer.rate
@@ -153,9 +365,12 @@ class ExplorerThread( Thread ):
         trials = 0
         while moves < maxmoves and trials < maxtrials :
             i = 0
-            for engine in self.rng.permutation( self.engines ) :
+            for k in self.selectEngines( ) :
+                engine = self.engines[k]
 
+                tstart = time.perf_counter()
                 moves += engine.execute( walker, lowLhood, fitindex )
+                self.elapsed[k] += time.perf_counter() - tstart
 
                 if self.verbose >= 4:
                     print( "%4d -%12.12s %4d %8.1f %8.1f ==> %3d  %8.1f"%
@@ -170,9 +385,82 @@ class ExplorerThread( Thread ):
 
         return
 
+    def selectEngines( self ):
+        """
+        Return the indices of the engines to be applied in one round.
+
+        For schedule "fixed" all engines in random order; otherwise as many
+        engines, drawn according to the allocation of the explorer.
+        """
+        ne = len( self.engines )
+        if self.explorer.schedule == "fixed" :
+            return self.rng.permutation( ne )
+        return self.rng.choice( ne, ne, p=self.explorer.allocation )
+
     def logLcheck( self, walker ) :
         wlogL = self.errdis.logLikelihood( walker.model, walker.parlist )
         if wlogL != walker.logL :
             raise ValueError( "Inconsistency between stored logL %f and calculated logL %f" %
                                 ( walker.logL, wlogL ) )
 
+
+
+#  *********WORKER PROCESSES***************************************************
+## The explorer as it lives in a worker process; set by _startWorker.
+_workerExplorer = None
+
+def _startWorker( walkers, engines, rate, maxtrials, verbose, schedule ):
+    """
+    Initialize a worker process with its own copy of the walkers and engines.
+    """
+    global _workerExplorer
+    explorer = Explorer.__new__( Explorer )
+    explorer.walkers = walkers
+    explorer.engines = engines
+    explorer.rng = engines[0].rng
+    explorer.rate = rate
+    explorer.maxtrials = maxtrials
+    explorer.verbose = verbose
+    explorer.schedule = schedule
+    explorer.backend = "thread"
+    explorer.pool = None
+    _workerExplorer = explorer
+
+def _exploreWorker( task ):
+    """
+    Explore one walker in a worker process.
+
+    Parameters
+    ----------
+    task : tuple
+        ( walker index, seed, lowLhood, fitindex, parlists, logLs, allocation, sizes,
+          shared ) where parlists and logLs hold the present state of the ensemble,
+        and sizes and shared the present sizes and shared states of the engines.
+
+    Returns
+    -------
+    tuple : ( walker index, parlist, logL, engine reports, ncalls, nparts, elapsed,
+              shared states of the engines )
+    """
+    kw, seed, lowLhood, fitindex, parlists, logLs, allocation, sizes, shared = task
+    explorer = _workerExplorer
+    explorer.allocation = allocation
+    for eng, size, sh in zip( explorer.engines, sizes, shared ) :
+        eng.size = size
+        eng.setShared( sh )
+    for walker, parlist, logL in zip( explorer.walkers, parlists, logLs ) :
+        walker.parlist[:] = parlist
+        walker.logL = logL
+    explorer.lowLhood = lowLhood
+
+    errdis = explorer.engines[0].errdis
+    ncalls = errdis.ncalls
+    nparts = errdis.nparts
+
+    thread = ExplorerThread( "explorer_%d"%kw, kw, explorer, fitindex, seed=seed )
+    thread.explore( kw, fitindex )
+
+    walker = explorer.walkers[kw]
+    return ( kw, walker.parlist, walker.logL, [eng.report for eng in thread.engines],
+             errdis.ncalls - ncalls, errdis.nparts - nparts, thread.elapsed,
+             [eng.getShared() for eng in thread.engines] )
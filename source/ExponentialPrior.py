@@ -107,6 +107,7 @@ class ExponentialPrior( Prior ):
                 raise ValueError( "Fraction of zeroes must be between [0,1]" )
             object.__setattr__( self, name, float( value ) )
             object.__setattr__( self, "_shift", 1.0 - value )
+            Prior.changes += 1
         elif name == "_uval" :
             object.__setattr__( self, name, float( value ) )
         else :
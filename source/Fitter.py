@@ -131,7 +131,9 @@ class Fitter( BaseFitter ):
             self.chiSquared( ydata, weights )
             return numpy.asarray( 0 )
 
-        hessian = self.getHessian( weights=weights, index=fitIndex )
+        ## the design matrix is needed for both the hessian and the vector
+        design = self.model.partial( self.xdata, self.model.parameters )
+        hessian = self.getHessian( weights=weights, index=fitIndex, partial=design )
         ydatacopy = ydata.copy( )
         # subtract influence of fixed parameters on the data
         if fitIndex is not None :
@@ -144,7 +146,7 @@ class Fitter( BaseFitter ):
         if hasattr( self, "normdfdp" ) :
             ydatacopy = numpy.append( ydatacopy, self.normdata * self.normweight )
 
-        vector = self.getVector( ydatacopy, index=fitIndex )
+        vector = self.getVector( ydatacopy, index=fitIndex, partial=design )
 #        print( fmt( hessian ) )
         params = numpy.linalg.solve( hessian, vector )
 
@@ -63,6 +63,9 @@ class FixedModel( BaseModel ):
     Author :         Do Kester
 
     """
+    ## attributes and their types, see __setattr__
+    FIXEDLISTATTRS = {"mlist":int}
+    FIXEDSINGLEATTRS = {"npmax":int, "_npb":int, "fixed":dict }
 
     #  *************************************************************************
     def __init__( self, nparams=0, ndim=1, copy=None, fixed=None,
@@ -136,10 +139,8 @@ class FixedModel( BaseModel ):
         Set attributes.
 
         """
-        key1 = {"npmax":int, "_npb":int, "fixed":dict }
-        keys = {"mlist":int}
-        if ( Tools.setListOfAttributes( self, name, value, keys ) or
-             Tools.setSingleAttributes( self, name, value, key1 ) ) :
+        if ( Tools.setListOfAttributes( self, name, value, self.FIXEDLISTATTRS ) or
+             Tools.setSingleAttributes( self, name, value, self.FIXEDSINGLEATTRS ) ) :
             pass
         elif name == "fixed" :
             raise AttributeError( "Attribute fixed can only be set in the constructor" )
@@ -222,6 +223,23 @@ class FixedModel( BaseModel ):
         expparam = self.expand( xdata, param )
         return super().result( xdata, expparam )
 
+    def resultBatch( self, xdata, params ):
+        """
+        Returns the results for a stack of parameter vectors.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        """
+        if self.fixed is None :
+            return super().resultBatch( xdata, params )
+        return numpy.asarray( [FixedModel.result( self, xdata, par ) for par in params],
+                              dtype=float ).reshape( len( params ), -1 )
+
     def expand( self, xdata, param ) :
         """
         Returns a complete list of parameters, where the fixed parameters
@@ -292,6 +310,23 @@ class FixedModel( BaseModel ):
             nb += ne
         return partial
 
+    def partialBatch( self, xdata, params ):
+        """
+        Returns the partial derivatives for a stack of parameter vectors.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        """
+        if self.fixed is None :
+            return super().partialBatch( xdata, params )
+        return numpy.asarray( [FixedModel.partial( self, xdata, par ) for par in params],
+                              dtype=float ).reshape( len( params ), -1, params.shape[1] )
+
     def numPartial( self, xdata, params, parlist=None ) :
         """
         Returns numerical partial derivatives of the model to params.
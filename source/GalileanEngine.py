@@ -52,6 +52,8 @@ class GalileanEngine( Engine ):
         average number of steps to be taken
     size : float (0.5)
         average normalized stepsize
+    target : None or float (0.5)
+        acceptance rate to adapt the size to. See Engine.adaptSize.
     maxtrials : int
         maximum number of trials for various operations
     rng : numpy.random.RandomState
@@ -80,7 +82,9 @@ class GalileanEngine( Engine ):
         """
         super( GalileanEngine, self ).__init__( walkers, errdis, copy=copy, seed=seed  )
         self.nstep = 3
-        self.size = 0.5
+        if copy is None :
+            self.size = 0.5
+            self.target = 0.5
 
         self.plotter = DummyPlotter( )
 
@@ -95,6 +99,17 @@ class GalileanEngine( Engine ):
         """ Return the name of this engine.  """
         return str( "GalileanEngine" )
 
+    def getState( self ):
+        """ Return the state of the engine, including nstep. """
+        state = super( GalileanEngine, self ).getState()
+        state["nstep"] = numpy.asarray( self.nstep )
+        return state
+
+    def setState( self, state ):
+        """ Set the state of the engine, including nstep. """
+        super( GalileanEngine, self ).setState( state )
+        self.nstep = int( state["nstep"] )
+
     #  *********EXECUTE***************************************************
     def execute( self, walker, lowLhood, fitIndex=None ):
         """
@@ -182,7 +197,7 @@ class GalileanEngine( Engine ):
 
         self.setSample( walker, model, parlist, Lhood )
 
-        if trial >= maxtrial:
+        if trial >= maxtrial and self.target is None :
             self.size = self.size * 0.9 + 0.00001
 
         self.plotter.stop()
@@ -103,7 +103,7 @@ class GaussErrorDistribution( ScaledErrorDistribution ):
 
 
     #  *********LIKELIHOODS***************************************************
-    def logLikelihood( self, model, parlist ) :
+    def logLikelihood( self, model, parlist, mock=None ) :
         """
         Return the log( likelihood ) for a Gaussian distribution.
 
@@ -113,16 +113,38 @@ class GaussErrorDistribution( ScaledErrorDistribution ):
             to be fitted
         parlist : array_like
             list of all parameters in the problem
+        mock : None or array_like
+            result of the model for the parameters, when already known
 
         """
         np = model.npchain
         scale = parlist[np]
-        res = self.getResiduals( model, parlist[:np] )
+        res = self.getResiduals( model, parlist[:np], mock=mock )
         chisq = self.getChisq( res, scale )
         self.ncalls += 1
         return ( - self.sumweight * ( 0.5 * self.LOG2PI + math.log( scale ) ) -
                        0.5 * chisq )
 
+    def batchLogL( self, model, parlists ) :
+        """
+        Return the log( likelihood ) for a set of parlists.
+
+        Parameters
+        ----------
+        model : Model
+            to be fitted
+        parlists : array_like of shape (k, npar+1)
+            k lists of all parameters in the problem
+
+        """
+        np = model.npchain
+        scale = parlists[:,np]
+        res = self.getResidualsBatch( model, parlists[:,:np] )
+        chisq = self.getChisq( res, scale )
+        self.ncalls += len( parlists )
+        return ( - self.sumweight * ( 0.5 * self.LOG2PI + numpy.log( scale ) ) -
+                       0.5 * chisq )
+
     def getScale( self, model ) :
         """
         Return the noise scale.
@@ -147,15 +169,15 @@ class GaussErrorDistribution( ScaledErrorDistribution ):
         Parameters
         ----------
         residual : array_like
-            the residuals
-        scale : float
+            the residuals; a 2-d array of shape (k, ndata) yields k chisqs
+        scale : float or array_like of length k
             hyperparameter of the problem; here it is the noise scale
 
         """
         res2 = numpy.square( residual )
         if self.weights is not None :
             res2 = res2 * self.weights
-        return numpy.sum( res2  ) / ( scale * scale )
+        return numpy.sum( res2, axis=-1 ) / ( scale * scale )
 
     def partialLogL( self, model, parlist, fitIndex ) :
         """
@@ -177,12 +199,12 @@ class GaussErrorDistribution( ScaledErrorDistribution ):
         param = parlist[:np]
         scale = parlist[np]
         s2 = scale * scale
-        res = self.getResiduals( model, param )
+        mock, dM = model.resultAndPartial( self.xdata, param )
+        res = self.getResiduals( model, param, mock=mock )
         if self.weights is not None :
             resw = res * self.weights
         else :
             resw = res
-        dM = model.partial( self.xdata, param )
 
         dL = numpy.zeros( len( fitIndex ), dtype=float )
         i = 0
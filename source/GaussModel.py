@@ -58,6 +58,8 @@ class GaussModel( NonLinearModel ):
 
 
     """
+    ## baseResult broadcasts over a stack of parameters
+    BATCHED = True
 
     def __init__( self, copy=None, **kwargs ):
         """
@@ -136,6 +138,25 @@ class GaussModel( NonLinearModel ):
 
         return partial
 
+    def basePartialBatch( self, xdata, params ):
+        """
+        Returns the partials for a stack of parameter vectors.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the partials
+        params : array_like of shape ( k, 3 )
+            k vectors of parameters.
+
+        """
+        a = params[:,0:1]
+        s = 1 / params[:,2:3]
+        x = ( xdata - params[:,1:2] ) * s
+        e = numpy.exp( -0.5 * x * x )
+        ae = a * e * x * s
+        return numpy.stack( ( e, ae, ae * x ), axis=-1 )
+
     def baseDerivative( self, xdata, params ) :
         """
         Return the derivative df/dx at each xdata (=x).
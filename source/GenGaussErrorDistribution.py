@@ -141,7 +141,7 @@ class GenGaussErrorDistribution( ScaledErrorDistribution ):
         return hypar[0] * math.sqrt( special.gamma( 3.0 / p ) / special.gamma( 1.0 / p ) )
 
     #  *********LIKELIHOODS***************************************************
-    def logLikelihood( self, model, parlist ) :
+    def logLikelihood( self, model, parlist, mock=None ) :
         """
         Return the log( likelihood ) for a Gaussian distribution.
 
@@ -151,6 +151,8 @@ class GenGaussErrorDistribution( ScaledErrorDistribution ):
             model to calculate mock data
         parlist : array_like
             parameters of the problem
+        mock : None or array_like
+            result of the model for the parameters, when already known
 
         """
         self.ncalls += 1
@@ -158,12 +160,33 @@ class GenGaussErrorDistribution( ScaledErrorDistribution ):
         scale = parlist[np]
         power = parlist[np+1]
 
-        res = self.getResiduals( model, parlist[:np] )
+        res = self.getResiduals( model, parlist[:np], mock=mock )
         chisq = self.getChisq( res, scale, power )
         norm = math.log( power / ( 2 * scale ) ) - special.gammaln( 1.0 / power )
 #        print( "GG  ", chisq, norm, self.sumweight )
         return self.sumweight * norm - chisq
 
+    def batchLogL( self, model, parlists ) :
+        """
+        Return the log( likelihood ) for a set of parlists.
+
+        Parameters
+        ----------
+        model : Model
+            model to calculate mock data
+        parlists : array_like of shape (k, npar+2)
+            k lists of all parameters of the problem
+
+        """
+        self.ncalls += len( parlists )
+        np = model.npchain
+        scale = parlists[:,np]
+        power = parlists[:,np+1]
+        res = self.getResidualsBatch( model, parlists[:,:np] )
+        chisq = self.getChisq( res, scale[:,numpy.newaxis], power[:,numpy.newaxis] )
+        norm = numpy.log( power / ( 2 * scale ) ) - special.gammaln( 1.0 / power )
+        return self.sumweight * norm - chisq
+
     def getChisq( self, residual, scale, power ):
         """
         Return chisq.
@@ -173,16 +196,16 @@ class GenGaussErrorDistribution( ScaledErrorDistribution ):
         Parameters
         ----------
         residual : array_like
-            the residuals
-        scale : float
+            the residuals; a 2-d array of shape (k, ndata) yields k chisqs
+        scale : float or array_like of shape (k, 1)
             noise scale
-        power : float
+        power : float or array_like of shape (k, 1)
             power of distribution
         """
         ares = numpy.power( numpy.abs( residual / scale ), power )
         if self.weights is not None :
             ares = ares * self.weights
-        return numpy.sum( ares )
+        return numpy.sum( ares, axis=-1 )
 
     def getScale( self, model ) :
         """
@@ -216,7 +239,8 @@ class GenGaussErrorDistribution( ScaledErrorDistribution ):
         np = model.npchain
         scale = parlist[np]
         power = parlist[np+1]
-        res = self.getResiduals( model, parlist[:np] )
+        mock, dM = model.resultAndPartial( self.xdata, parlist[:np] )
+        res = self.getResiduals( model, parlist[:np], mock=mock )
 
         ars = numpy.abs( res / scale )
         rsp = numpy.power( ars, power )
@@ -224,7 +248,6 @@ class GenGaussErrorDistribution( ScaledErrorDistribution ):
             rsp = rsp * self.weights
 
         dLdm = power * rsp / res
-        dM = model.partial( self.xdata, parlist[:np] )
 
         dL = numpy.zeros( len( fitIndex ), dtype=float )
         i = 0
@@ -110,7 +110,7 @@ class GibbsEngine( Engine ):
                 kk += 1
                 param[c] = self.unit2Domain( model, ptry, kpar=c )
 
-                Ltry = self.errdis.updateLogL( model, param, parval={c : save} )
+                Ltry = self.errdis.updateLogL( model, param, parval={c : save}, key=walker.id )
 
                 if Ltry >= lowLhood:
                     self.reportSuccess( )
@@ -101,7 +101,7 @@ class HarmonicModel( LinearModel ):
         """
         dind = {'order': int, 'period': float }
         if Tools.setSingleAttributes( self, name, value, dind ):
-            pass
+            self.clearDesign()
         else :
             super( HarmonicModel, self ).__setattr__( name, value )
 
@@ -117,7 +117,7 @@ class LaplaceErrorDistribution( ScaledErrorDistribution ):
         return scale * math.sqrt( 2.0 )
 
     #  *********LIKELIHOODS***************************************************
-    def logLikelihood( self, model, parlist ) :
+    def logLikelihood( self, model, parlist, mock=None ) :
         """
         Return the log( likelihood ) for a Gaussian distribution.
 
@@ -127,15 +127,36 @@ class LaplaceErrorDistribution( ScaledErrorDistribution ):
             model to calculate mock data
         parlist : array_like
             parameters of the problem
+        mock : None or array_like
+            result of the model for the parameters, when already known
 
         """
         self.ncalls += 1
         np = model.npchain
         scale = parlist[np]
-        res = self.getResiduals( model, parlist[:np] )
+        res = self.getResiduals( model, parlist[:np], mock=mock )
         sumres = self.getSumRes( res, scale )
         return - self.sumweight * ( self.LOG2 + math.log( scale ) ) - sumres
 
+    def batchLogL( self, model, parlists ) :
+        """
+        Return the log( likelihood ) for a set of parlists.
+
+        Parameters
+        ----------
+        model : Model
+            model to calculate mock data
+        parlists : array_like of shape (k, npar+1)
+            k lists of all parameters of the problem
+
+        """
+        self.ncalls += len( parlists )
+        np = model.npchain
+        scale = parlists[:,np]
+        res = self.getResidualsBatch( model, parlists[:,:np] )
+        sumres = self.getSumRes( res, scale )
+        return - self.sumweight * ( self.LOG2 + numpy.log( scale ) ) - sumres
+
     def getScale( self, model ) :
         """
         Return the noise scale
@@ -159,14 +180,14 @@ class LaplaceErrorDistribution( ScaledErrorDistribution ):
         Parameters
         ----------
         residual : array_like
-            the residuals
-        scale : float
+            the residuals; a 2-d array of shape (k, ndata) yields k sums
+        scale : float or array_like of length k
             the noise scale
 
         """
         if self.weights is not None :
             residual = residual * self.weights
-        return numpy.sum( numpy.abs( residual ) ) / scale
+        return numpy.sum( numpy.abs( residual ), axis=-1 ) / scale
 
     def partialLogL( self, model, parlist, fitIndex ) :
         """
@@ -186,9 +207,9 @@ class LaplaceErrorDistribution( ScaledErrorDistribution ):
         np = model.npchain
         scale = parlist[np]
 
-        dM = model.partial( self.xdata, parlist[:np] )
+        mock, dM = model.resultAndPartial( self.xdata, parlist[:np] )
         dL = numpy.zeros( len( fitIndex ), dtype=float )
-        res = self.getResiduals( model, parlist[:np] )
+        res = self.getResiduals( model, parlist[:np], mock=mock )
         wgt = numpy.ones_like( res, dtype=float ) if self.weights is None else self.weights
         wgt = numpy.copysign( wgt, res )
 
@@ -229,16 +229,17 @@ class LevenbergMarquardtFitter( IterativeFitter ):
     #  *************************************************************************
     def trialfit( self, params, fi, data, weights, verbose, maxiter ):
 
-        hessian = self.getHessian( params=params, weights=weights, index=fi )
+        yfit, partial = self.model.resultAndPartial( self.xdata, params )
+        hessian = self.getHessian( params=params, weights=weights, index=fi, partial=partial )
 
-        residu = data - self.model.result( self.xdata, params )
+        residu = data - yfit
         if weights is not None :
             residu *= weights
         if hasattr( self, "normdfdp" ) :
             nres = ( self.normdata - numpy.inner( self.normdfdp, params ) ) * self.normweight
             residu = numpy.append( residu, nres )
 
-        vector = self.getVector( residu, index=fi )
+        vector = self.getVector( residu, index=fi, partial=partial )
 
         nfit = len( fi )
         fitpar = params[fi]
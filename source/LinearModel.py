@@ -43,8 +43,14 @@ class LinearModel( Model ):
     The ``baseResult`` follows from that one.
     It is implemented here.
 
+    As the partials do not depend on the parameters, the design matrix
+    for the latest xdata is kept and reused. See designMatrix().
+
 
     """
+    ## natively batched through the design matrix
+    BATCHED = True
+
     def __init__( self, nparams, ndim=1, copy=None, **kwargs ):
         """
         class for all linear models.
@@ -66,7 +72,8 @@ class LinearModel( Model ):
         Returns the base result of linear models.
 
         for linear models the result is the inner product of parameters
-        and partial derivatives.
+        and partial derivatives, i.e. the product of the design matrix
+        and the parameters.
 
         Parameters
         ----------
@@ -76,24 +83,107 @@ class LinearModel( Model ):
             values for the parameters.
 
         """
-        parlist = numpy.arange( self.npmax )
-        part = self.basePartial( xdata, params, parlist=parlist  )
+        design = self.designMatrix( xdata, params )
 
-#        print( "LM  ", params )
-#        print( "LM  ", part )
-#        print( "LM  ", parlist )
-#        try :
-#            return numpy.inner( params, part )
-#        except ValueError :
-#            print( "LinearModel: ValueError" )
-#            pass
+        if isinstance( params, numpy.ndarray ) and params.dtype == float :
+            return numpy.dot( design, params )
 
-        res = numpy.zeros( part.shape[0], dtype=float )
-        for k in parlist :
-            res += params[k] * part[:,k]
+        ## lists, or fixed parameters replaced by the results of a model
+        res = numpy.zeros( design.shape[0], dtype=float )
+        for k in range( self.npmax ) :
+            res += params[k] * design[:,k]
+        return res
 
+    def baseResultBatch( self, xdata, params ):
+        """
+        Returns the results for a stack of parameter vectors.
 
-#        for k,p in enumerate( params ) :
-#            res += p * part[:,k]
-        return res
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters.
+
+        """
+        return numpy.dot( params, self.designMatrix( xdata, None ).T )
+
+    def basePartialBatch( self, xdata, params ):
+        """
+        Returns the partials for a stack of parameter vectors.
+
+        As they do not depend on the parameters, it is a read-only view
+        on the design matrix.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the partials
+        params : array_like of shape ( k, npbase )
+            k vectors of parameters (ignored).
+
+        """
+        design = self.designMatrix( xdata, None )
+        return numpy.broadcast_to( design, ( len( params ), ) + design.shape )
+
+    def cachedPartial( self, xdata, params, parlist=None ):
+        """
+        Returns the partials, taken from the (cached) design matrix.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the partials
+        params : array_like
+            values for the parameters (ignored).
+        parlist : array_like
+            list of indices of active parameters (or None for all)
+
+        """
+        design = self.designMatrix( xdata, params )
+        if parlist is None :
+            return design
+        return design[:,parlist]
+
+    def designMatrix( self, xdata, params ):
+        """
+        Returns the design matrix: the partials to all npmax parameters.
+
+        The partials of linear models do not depend on the parameters.
+        The design matrix for the latest xdata is kept and reused as long
+        as the xdata have the same values. It is read-only.
+        It is cleared when the structure of the model (knots, degree etc.)
+        is set anew. Call clearDesign() after changing it in place.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the partials
+        params : array_like
+            values for the parameters (ignored).
+
+        """
+        entry = self.__dict__.get( "_design" )
+        if ( entry is not None and entry[0].shape == numpy.shape( xdata ) and
+             numpy.array_equal( entry[0], xdata ) ) :
+            return entry[1]
+
+        parlist = None if self.npbase == self.npmax else numpy.arange( self.npmax )
+        design = self.basePartial( xdata, params, parlist=parlist )
+        if design.ndim == 2 :
+            design.flags.writeable = False
+            object.__setattr__( self, "_design",
+                                ( numpy.array( xdata, dtype=float ), design ) )
+        return design
+
+    def clearDesign( self ):
+        """
+        Remove the kept design matrix and the cached results of the model
+        and of the chain it is part of.
+        """
+        object.__setattr__( self, "_design", None )
+        for model in [self, self.__dict__.get( "_head" )] :
+            cache = None if model is None else model.__dict__.get( "cache" )
+            if cache is not None :
+                cache.clear()
 
@@ -71,6 +71,9 @@ class LorentzModel( NonLinearModel ):
     >>> print( lorentz( numpy.arange(  41 , dtype=float ) / 5 ) )
 
     """
+    ## baseResult broadcasts over a stack of parameters
+    BATCHED = True
+
     def __init__( self, copy=None, **kwargs ):
         """
         Lorentzian model.
@@ -260,10 +260,11 @@ class _Chisq( object ):
             d\chi^2/dp = -2 \sum( D_i - F_i ) dF_i/dp
         """
         param = self._outer.insertParameters( par, index=self._index )
-        res = numpy.subtract( self._outer.model.result( self._outer.xdata, param ), self._data )
+        yfit, partial = self._outer.model.resultAndPartial( self._outer.xdata, param )
+        res = numpy.subtract( yfit, self._data )
         if self._weights is not None:
             res = numpy.multiply( res, self._weights )
-        desmat = self._outer.getDesign( params=param, index=self._index )
+        desmat = self._outer.getDesign( params=param, index=self._index, partial=partial )
 
         return 2 * numpy.inner( desmat.transpose(), res )
 
@@ -8,7 +8,9 @@ from BaseModel import BaseModel
 from FixedModel import FixedModel
 from Prior import Prior
 from UniformPrior import UniformPrior
+from PriorBank import PriorBank
 from NoiseScale import NoiseScale
+from ResultCache import ResultCache
 
 #  * This file is part of the BayesicFitting package.
 #  *
@@ -89,9 +91,17 @@ class Model( FixedModel ):
         unit of the y-values
     npchain : int (read only)
         number of parameters needed in the total chain of models
+    cache : None or ResultCache
+        when present, results and partials are kept for reuse. See ResultCache.
 
     """
 
+    ## float arrays that are set without further checks, when of proper length
+    MODELFLOATATTRS = ['parameters', 'stdevs']
+
+    ## number of values that resultBatch calculates together
+    BATCHSIZE = 65536
+
     NOP = 0
     ADD = 1
     SUB = 2
@@ -124,6 +134,7 @@ class Model( FixedModel ):
 
         self._next = None
         self._head = self
+        self._plan = None
         if params is None :
             params = numpy.zeros( nparams, dtype=float )
         else :
@@ -134,10 +145,12 @@ class Model( FixedModel ):
         self._npchain = nparams
         self.stdevs = None
         self.priors = None
+        self._bank = None
         # xUnit is by default a (list[ndim] of) scalars, unitless
         self.xUnit = units.Unit( 1.0 ) if ndim == 1 else [units.Unit( 1.0 )]*ndim
         self.yUnit = units.Unit( 1.0 )                  # scalar
         self._operation = self.NOP
+        self.cache = None
 
         if copy is None : return
 
@@ -167,10 +180,18 @@ class Model( FixedModel ):
             value of the attribute
 
         """
-        lnon = ['parameters', 'stdevs', 'priors', '_next']
+        if ( name in self.MODELFLOATATTRS and type( value ) is numpy.ndarray and
+             value.dtype == float and value.ndim == 1 and ( name == 'stdevs' or
+             len( value ) == getattr( self.__dict__.get( '_head' ), '_npchain', -1 ) ) ) :
+            object.__setattr__( self, name, value )             # fast path
+            return
+
+        lnon = ['parameters', 'stdevs', 'priors', '_next', '_bank', 'cache', '_plan']
         dlst = {'parameters':float, 'stdevs':float, 'priors':Prior }
         dind = {'_npchain':int, '_operation':int,
-                '_head':Model, '_next':Model, 'yUnit': units.core.UnitBase }
+                '_head':Model, '_next':Model, '_bank':tuple, 'cache':ResultCache,
+                '_plan':tuple,
+                'yUnit': units.core.UnitBase }
         if self.ndim == 1 : dind.update( {'xUnit':units.core.UnitBase} )
         else : dlst.update( {'xUnit':units.core.UnitBase} )
 
@@ -392,6 +413,13 @@ class Model( FixedModel ):
         # Erase the model's attributes; not needed anymore
         model.parameters = None
         model.priors = None
+        if self.cache is not None :
+            self.cache.clear()
+        ## the chain has changed: compile anew
+        last = self._head
+        while last is not None :
+            last._plan = None
+            last = last._next
 
         return
 
@@ -454,32 +482,115 @@ class Model( FixedModel ):
         if param is None :
             param = self.parameters
 
+        if self.cache is not None :
+            entry = self.cache.get( xdata, param )
+            if entry is not None :
+                return entry[1]
+
+        xd = Tools.toArray( xdata )
         res = None
-        xdata = Tools.toArray( xdata )
-        return self._recursiveResult( xdata, param, res )
+        own = False             # whether res is a new array, ours to overwrite
+        for ( model, start, stop, operation ) in self.compileChain() :
+            nextres = super( Model, model ).result( xd, param[start:stop] )
+            newres = model.operate( res, nextres, inplace=own )
+            own = own or ( res is not None and newres is not res and newres is not nextres )
+            res = newres
+
+        if self.cache is not None :
+            res = self.cache.put( xdata, param, res )[0]
+        return res
 
-    def _recursiveResult( self, xdata, param, res ) :
+    def resultBatch( self, xdata, params ):
+        """
+        Return the results of the model for a stack of parameter vectors.
 
-        np = self.npbase
-        res = self.operate( res, super().result( xdata, param[:np] ) )
-        model = self._next
-        if model is None :
-            return res
+        Components that are natively batched (see BaseModel.BATCHED) are
+        calculated for all vectors at once; the others one by one.
 
-        res = model._recursiveResult( xdata, param[np:], res )
+        Parameters
+        ----------
+        xdata : array_like
+            input data
+        params : array_like of shape ( k, npchain )
+            k vectors of parameters for the model
+
+        Returns
+        -------
+        array_like of shape ( k, len( xdata ) )
+
+        """
+        params = numpy.asarray( params, dtype=float )
+        xdata = Tools.toArray( xdata )
+        nx = Tools.length( xdata )
+        nrow = max( 1, self.BATCHSIZE // max( nx, 1 ) )
+        if len( params ) <= nrow :
+            return self._resultBatch( xdata, params )
+
+        ## in chunks that fit in the cache
+        res = numpy.empty( ( len( params ), nx ), dtype=float )
+        for k in range( 0, len( params ), nrow ) :
+            res[k:k+nrow,:] = self._resultBatch( xdata, params[k:k+nrow,:] )
         return res
 
-    def operate( self, result, next ):
+    def _resultBatch( self, xdata, params ):
+        res = None
+        own = False             # whether res is a new array, ours to overwrite
+        for ( model, start, stop, operation ) in self.compileChain() :
+            nextres = super( Model, model ).resultBatch( xdata, params[:,start:stop] )
+            newres = model.operate( res, nextres, inplace=own )
+            own = own or ( res is not None and newres is not res and newres is not nextres )
+            res = newres
+        return res
+
+    def compileChain( self ):
+        """
+        Return the evaluation plan of the chain, starting at this model.
+
+        The plan is a tuple with for each component in the chain a tuple of
+        ( model, start, stop, operation ), where param[start:stop] are the
+        parameters of the component. It is made once and kept until the
+        chain is changed.
+        """
+        if self._plan is None :
+            plan = []
+            model = self
+            np = 0
+            while model is not None :
+                plan += [( model, np, np + model.npbase, model._operation )]
+                np += model.npbase
+                model = model._next
+            self._plan = tuple( plan )
+        return self._plan
+
+    def operate( self, result, next, inplace=False ):
+        """
+        Return the result of the chain so far, operated on by next.
+
+        Parameters
+        ----------
+        result : None or array_like
+            result of the chain so far
+        next : array_like
+            result of this model
+        inplace : bool
+            if True, result may be overwritten (when shape and type allow).
+        """
         if result is None or self._operation == self.NOP: # first one
-            result = next
-        elif self._operation == self.ADD:                 # NOP & ADD
-            result = numpy.add( result, next )
+            return next
+
+        out = None
+        if ( inplace and isinstance( result, numpy.ndarray ) and result.dtype == float and
+             ( numpy.ndim( next ) == 0 or numpy.shape( next ) == result.shape ) ) :
+            out = result
+
+        if self._operation == self.ADD:                 # NOP & ADD
+            result = numpy.add( result, next, out=out )
         elif self._operation == self.SUB:
-            result = numpy.subtract( result, next )
+            result = numpy.subtract( result, next, out=out )
         elif self._operation == self.MUL:
-            result = numpy.multiply( result, next )
+            result = numpy.multiply( result, next, out=out )
         elif self._operation == self.DIV:
-            result = numpy.divide( result, next )
+            result = numpy.divide( result, next, out=out )
         #       case FUN:
         #           result = super.result( new ModelInput( result ), par );
         #           break;
@@ -488,6 +599,64 @@ class Model( FixedModel ):
         #             break;
         return result
 
+    def hasProducts( self ):
+        """ Return True when the chain contains a multiplication or division. """
+        for step in self.compileChain()[1:] :
+            if step[3] >= self.MUL :
+                return True
+        return False
+
+    #  *****RESULT PARTS********************************************************
+    def resultParts( self, xdata, param, parts=None, kpar=None ):
+        """
+        Return a list of the results of the components of the chain.
+
+        When parts from an earlier call are given, only the components that
+        contain one of the parameters in kpar are recalculated; the other
+        parts are reused.
+
+        Parameters
+        ----------
+        xdata : array_like
+            input data
+        param : array_like
+            parameters for the (compound) model
+        parts : None or list of array_like
+            results of the components for parameters that differ from
+            param only at kpar
+        kpar : None or iterable of int
+            indices of the changed parameters (None means all)
+
+        """
+        xdata = Tools.toArray( xdata )
+        newparts = []
+        for ( model, start, stop, operation ) in self.compileChain() :
+            if ( parts is None or kpar is None or
+                 any( start <= k < stop for k in kpar ) ) :
+                newparts += [super( Model, model ).result( xdata, param[start:stop] )]
+            else :
+                newparts += [parts[len( newparts )]]
+        return newparts
+
+    def combineParts( self, parts ):
+        """
+        Return the result of the chain from the results of its components.
+
+        The outcome is identical to result().
+
+        Parameters
+        ----------
+        parts : list of array_like
+            as obtained from resultParts
+        """
+        res = None
+        own = False             # the parts themselves are never overwritten
+        for part, step in zip( parts, self.compileChain() ) :
+            newres = step[0].operate( res, part, inplace=own )
+            own = own or ( res is not None and newres is not res and newres is not part )
+            res = newres
+        return res
+
     #  *****DERIVATIVE*********************************************************
     def derivative( self, xdata, param, useNum=False ):
         """
@@ -569,58 +738,130 @@ class Model( FixedModel ):
             if true, numeric partials are used.
 
         """
-        result = None
-        partial = None
+        return self.resultAndPartial( xdata, param, useNum=useNum )[1]
+
+    def resultAndPartial( self, xdata, param=None, useNum=False ):
+        """
+        Return the result and the partial derivatives of the model at the inputs.
+
+        The chain is walked once: the result of each component is calculated
+        once and the partials are filled into one array of shape
+        ( len( xdata ), npchain ).
+        With a cache, a result that is already known is not calculated again,
+        unless the chain contains multiplications or divisions.
+
+        Parameters
+        ----------
+        xdata : array_like
+            an input vector or array
+        param : array_like
+            parameters for the model. Default parameters from the Model
+        useNum : bool
+            if true, numeric partials are used.
+
+        Returns
+        -------
+        tuple of ( result, partial )
+
+        """
+        if param is None :
+            param = self.parameters
+
+        known = None
+        usecache = self.cache is not None and not useNum
+        if usecache :
+            entry = self.cache.get( xdata, param )
+            if entry is not None and entry[2] is not None :
+                return entry[1:]
+            ## a known result is reused, unless the chain multiplies or divides
+            if entry is not None and not self.hasProducts() :
+                known = entry[1]
+            key = xdata
+
         xdata = Tools.toArray( xdata )
-        partial = self._recursivePartial( xdata, param, result, partial, useNum=useNum )
-        return partial
+        partial = numpy.zeros( ( Tools.length( xdata ), self.npchain ), dtype=float )
+
+        res = None
+        own = False             # whether res is a new array, ours to overwrite
+        for ( model, np, stop, operation ) in self.compileChain() :
+            par = param[np:stop]
+            if known is None :
+                nextres = super( Model, model ).result( xdata, par )
+            nextpartial = partial[:,np:stop]                # a view: filled in place
+            if stop > np :              #  the base model has no parameters: skip
+                if useNum :
+                    nextpartial[:,:] = super( Model, model ).numPartial( xdata, par )
+                else :
+                    nextpartial[:,:] = super( Model, model ).partial( xdata, par )
+
+            if operation == self.SUB :
+                numpy.negative( nextpartial, out=nextpartial )
 
-    def _recursivePartial( self, xdata, param, result, partial, useNum=False ):
+            elif operation == self.MUL :
+                partial[:,:np] *= nextres[:,numpy.newaxis]
+                nextpartial *= res[:,numpy.newaxis]
+
+            elif operation == self.DIV :
+                partial[:,:np] /= nextres[:,numpy.newaxis]
+                nextpartial *= ( - res / ( nextres * nextres ) )[:,numpy.newaxis]
+
+            if known is None :
+                newres = model.operate( res, nextres, inplace=own )
+                own = own or ( res is not None and newres is not res and newres is not nextres )
+                res = newres
+
+        if known is not None :
+            res = known
+        if usecache :
+            return self.cache.put( key, param, res, partial )
+        return ( res, partial )
+
+    def partialBatch( self, xdata, params ):
         """
-        Workhorse for partial.
+        Return the partial derivatives of the model for a stack of parameter vectors.
 
-        Implements the optional concatenation of models via recursion
+        Parameters
+        ----------
+        xdata : array_like
+            input data
+        params : array_like of shape ( k, npchain )
+            k vectors of parameters for the model
+
+        Returns
+        -------
+        array_like of shape ( k, len( xdata ), npchain )
 
         """
-        np = self.npbase
-        par = param[:np]
-        nextres = None
-        if np > 0:                #  the base model has no parameters: skip
-            if useNum:
-                nextpartial = super().numPartial( xdata, par )
-            else:
-                nextpartial = super().partial( xdata, par )
+        params = numpy.asarray( params, dtype=float )
+        xdata = Tools.toArray( xdata )
+        partial = numpy.zeros( ( len( params ), Tools.length( xdata ), self.npchain ),
+                               dtype=float )
+        products = self.hasProducts()
 
-        else :
-            inlen = Tools.length( xdata )
-            nextpartial = numpy.ndarray( (inlen,0), dtype=float )
+        res = None
+        for ( model, np, stop, operation ) in self.compileChain() :
+            par = params[:,np:stop]
+            if products :
+                nextres = super( Model, model ).resultBatch( xdata, par )
+            nextpartial = partial[:,:,np:stop]              # a view: filled in place
+            if stop > np :              #  the base model has no parameters: skip
+                nextpartial[...] = super( Model, model ).partialBatch( xdata, par )
 
-        if self._operation == self.SUB :
-            nextpartial = numpy.negative( nextpartial )
+            if operation == self.SUB :
+                numpy.negative( nextpartial, out=nextpartial )
 
-        elif self._operation == self.MUL :
-            nextres = super().result( xdata, par )
-            partial = numpy.multiply( partial.transpose(), nextres ).transpose()
-            nextpartial = numpy.multiply( nextpartial.transpose(), result ).transpose()
+            elif operation == self.MUL :
+                partial[:,:,:np] *= nextres[:,:,numpy.newaxis]
+                nextpartial *= res[:,:,numpy.newaxis]
 
-        elif self._operation == self.DIV :
-            nextres = super().result( xdata, par )
-            partial = numpy.divide( partial.transpose(), nextres ).transpose()
-            invres = - result / ( nextres * nextres )
-            nextpartial = numpy.multiply( nextpartial.transpose(), invres ).transpose()
+            elif operation == self.DIV :
+                partial[:,:,:np] /= nextres[:,:,numpy.newaxis]
+                nextpartial *= ( - res / ( nextres * nextres ) )[:,:,numpy.newaxis]
 
-        partial = ( nextpartial if partial is None
-                    else numpy.append( partial, nextpartial, axis=1 ) )
+            if products :
+                res = model.operate( res, nextres )
 
-        model = self._next
-        if model is None:
-            return partial
-        if nextres is None:
-            nextres = super().result( xdata, par )
-        result = self.operate( result, nextres )
-        #  append the partials of the _next model
-        return model._recursivePartial( xdata, param[np:], result, partial,
-                    useNum )
+        return partial
 
     #  *****TOSTRING***********************************************************
     def __str__( self ):
@@ -938,6 +1179,19 @@ class Model( FixedModel ):
         return False
 
     #  ****** UNIT <--> DOMAIN ********************************************
+    def getPriorBank( self ):
+        """
+        Return a PriorBank for the priors of the model.
+
+        The bank is kept and renewed when the priors have changed.
+        """
+        key = ( Prior.changes, tuple( map( id, self.priors ) ) )
+        bank = self._bank
+        if bank is None or bank[0] != key :
+            bank = ( key, PriorBank( self.priors ) )
+            self._bank = bank
+        return bank[1]
+
     def unit2Domain( self, uvalue, kpar=None ):
         """
         Convert a value in [0,1] to one inside the limits of the parameter.
@@ -945,22 +1199,16 @@ class Model( FixedModel ):
         Parameters
         ----------
         uvalue : (list of) float
-            value in [0,1]
-        kpar : int
-            index of the parameter
+            value in [0,1]. A 2-d array (k, npar) converts k sets of values.
+        kpar : None or int or array_like of int
+            index of the parameter(s) the (last axis of) uvalue belongs to.
+            None means all.
 
         """
-        if kpar is not None :
+        if Tools.isInstance( kpar, int ) :
             return self.getPrior( kpar ).unit2Domain( uvalue )
 
-        pgen = Tools.makeNext( self.priors, 0 )
-        dv = numpy.fromiter( ( next( pgen ).unit2Domain( uv ) for uv in uvalue ), float )
-        try :
-            pgen.close()
-        except :
-            pass
-
-        return dv
+        return self.getPriorBank().unit2Domain( uvalue, kpar=self.checkIndex( kpar ) )
 
     def domain2Unit( self, dvalue, kpar=None ):
         """
@@ -969,21 +1217,31 @@ class Model( FixedModel ):
         Parameters
         ----------
         dvalue : (list of) float
-            value of parameter
-        kpar : int
-            index of the parameter
+            value of parameter. A 2-d array (k, npar) converts k sets of values.
+        kpar : None or int or array_like of int
+            index of the parameter(s) the (last axis of) dvalue belongs to.
+            None means all.
 
         """
-        if kpar is not None :
+        if Tools.isInstance( kpar, int ) :
             return self.getPrior( kpar ).domain2Unit( dvalue )
 
-        pgen = Tools.makeNext( self.priors, 0 )
-        uv = numpy.fromiter( ( next( pgen ).domain2Unit( dv ) for dv in dvalue ), float )
-        try :
-            pgen.close()
-        except :
-            pass
-        return uv
+        return self.getPriorBank().domain2Unit( dvalue, kpar=self.checkIndex( kpar ) )
+
+    def checkIndex( self, kpar ):
+        """
+        Return kpar when all its indices have a prior, as in getPrior.
+
+        Raises
+        ------
+        IndexError when an index is larger than the number of parameters.
+        """
+        if kpar is not None and len( kpar ) > 0 :
+            kmax = numpy.max( kpar )
+            if kmax >= len( self.priors ) and len( self.priors ) >= self.getNumberOfParameters() :
+                raise IndexError( "The (compound) model does not have " + str( kmax + 1 ) +
+                                  " parameters." )
+        return kpar
 
     def partialDomain2Unit( self, dvalue ):
         """
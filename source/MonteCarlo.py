@@ -123,18 +123,36 @@ class MonteCarlo( object ):
         """
         if xdata is None :
             xdata = self.xdata
-        ninp = Tools.length( xdata )
-        sm1 = numpy.zeros( ninp )
-        sm2 = numpy.zeros( ninp )
-
-        for k in range( self.mcycles ) :
-            model = self.randomVariant( xdata )
-            sm1 += model
-            sm2 += numpy.square( model )
-        sm1 /= self.mcycles
-        sm2 /= self.mcycles
+        ## all random variants in one batch
+        models = self.model.resultBatch( xdata, self.randomParameters( self.mcycles ) )
+        sm1 = numpy.mean( models, axis=0 )
+        sm2 = numpy.mean( numpy.square( models ), axis=0 )
         return numpy.sqrt( sm2  - sm1 * sm1 )
 
+    def randomParameters( self, nvar ):
+        """
+        Return nvar random variants of the parameters.
+        Taking into account the stdev of the parameters and their covariance.
+
+        Parameters
+        ----------
+        nvar : int
+            number of variants
+
+        Returns
+        -------
+        array_like of shape ( nvar, npchain )
+        """
+        nfit = self.model.npchain if self.index is None else len( self.index )
+        err = self._random.standard_normal( ( nvar, nfit ) )
+        err = numpy.inner( self._eigenvalues * err, self._eigenvectors )
+        par = numpy.tile( self.model.parameters, ( nvar, 1 ) )
+        if self.index is None :
+            par += err
+        else :
+            par[:,self.index] += err
+        return par
+
     def randomVariant( self, xdata ):
         """
         Return a random variant of the model result.
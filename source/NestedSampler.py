@@ -22,6 +22,8 @@ from StartEngine import StartEngine
 from GibbsEngine import GibbsEngine
 from GalileanEngine import GalileanEngine
 from StepEngine import StepEngine
+from EllipsoidEngine import EllipsoidEngine
+from SliceEngine import SliceEngine
 #from FrogEngine import FrogEngine
 #from BirthEngine import BirthEngine
 #from DeathEngine import DeathEngine
@@ -150,6 +152,19 @@ class NestedSampler( object ):
         stopping criterion
     verbose : int
         level of blabbering
+    workers : None or int
+        number of worker processes (None : number of cpus)
+    backend : "thread" or "process"
+        explore the walkers in threads or in worker processes
+    schedule : "fixed" or "calls" or "time"
+        "fixed" : apply all engines in each round of the exploration (default)
+        "calls" : select engines in proportion to their accepted moves per logL call
+        "time"  : select engines in proportion to their accepted moves per second
+        See Explorer.
+    allocation : None or array_like
+        the final selection probabilities of the engines (after sample)
+    explorer : None or Explorer
+        the Explorer of the walkers (during sample)
 
     walkers : SampleList
         ensemble of Samples that explore the likelihood space
@@ -159,8 +174,13 @@ class NestedSampler( object ):
         Engine that move the walkers around within the given constraint: logL > lowLogL
     initialEngine : Engine
         Engine that distributes the walkers over the available space
-    restart : StopStart (TBW)
+    restart : None or StopStart
         write intermediate results to (optionally) start from.
+    sampleFile : None or SampleFile
+        store the samples on disk iso in memory. The resulting samples are
+        a MappedSampleList on the file.
+    monitor : None or ProgressMonitor
+        report the progress at regular intervals.
 
 
     Author       Do Kester.
@@ -170,7 +190,8 @@ class NestedSampler( object ):
     #  *********CONSTRUCTORS***************************************************
     def __init__( self, xdata, model, ydata, weights=None, distribution=None,
                 keep=None, ensemble=100, discard=1, seed=80409, rate=1.0,
-                limits=None, engines=None, maxsize=None, verbose=1 ) :
+                limits=None, engines=None, maxsize=None, verbose=1,
+                workers=None, backend="thread", schedule="fixed" ) :
         """
         Create a new class, providing inputs and model.
 
@@ -217,6 +238,8 @@ class NestedSampler( object ):
             "galilean"  : GalileanEngine
             "gibbs" 	: GibbsEngine 	move one parameter at a time
             "step"  	: StepEngine    move all parameters in arbitrary direction
+            "ellipsoid" : EllipsoidEngine draw from ellipsoids around the walkers
+            "slice"     : SliceEngine   slice sampling, one parameter at a time
 
             For Dynamic models only
             "birth" : BirthEngine   increase the parameter list of a walker by one
@@ -234,6 +257,15 @@ class NestedSampler( object ):
             1 : basic information
             2 : more about every 100th iteration
             3 : more about every iteration
+        workers : None or int
+            number of worker processes for backend "process".
+            None : the number of cpus
+        backend : "thread" or "process"
+            "thread"  : explore the walkers in threads (default)
+            "process" : explore the walkers in a pool of worker processes,
+                        each holding a copy of model, data and engines.
+        schedule : "fixed" or "calls" or "time"
+            how the engines are selected in the exploration. See Explorer.
 
         """
         self.xdata = xdata
@@ -251,7 +283,19 @@ class NestedSampler( object ):
         self.maxsize = maxsize
         self.verbose = verbose
         self.rate = rate
-        self.restart = None                     ## TBD
+        self.restart = None
+        self.sampleFile = None
+        self.monitor = None
+        self.allocation = None
+        self.explorer = None
+
+        if backend not in ["thread", "process"] :
+            raise ValueError( "Unknown backend : %s" % backend )
+        self.backend = backend
+        self.workers = workers
+        if schedule not in ["fixed", "calls", "time"] :
+            raise ValueError( "Unknown schedule : %s" % schedule )
+        self.schedule = schedule
 
         self.minimumIterations = 1000
         self.end = 2.0
@@ -322,6 +366,11 @@ class NestedSampler( object ):
             keep = self.keep
         fitlist = self.makeFitlist( keep=keep )
 
+        if self.sampleFile is not None :
+            if self.restart is not None :
+                raise ValueError( "A restart cannot be combined with a sampleFile" )
+            self.samples = self.sampleFile
+
         self.initWalkers( fitlist=fitlist )
         for eng in self.engines :
             eng.walkers = self.walkers
@@ -351,57 +400,81 @@ class NestedSampler( object ):
         if self.verbose >= 2:
             print( "Iteration   logZ        H     LowL     npar    parameters" )
 
-        explorer = Explorer( self )
-
         self.logZ = -sys.float_info.max
         self.info = 0
 
         logWidth = math.log( 1.0 - math.exp( (-1.0 * self.discard ) / self.ensemble) )
 
-        if self.optionalRestart() :
+        restored = self.optionalRestart()
+        if restored :
             logWidth -= self.iteration * ( 1.0 * self.discard ) / self.ensemble
 
-        while self.iteration < self.getMaxIter( ):
-
-            #  find worst walker(s) in ensemble
-            worst = self.findWorst()
-            worstLogW = logWidth + self.walkers[worst[-1]].logL
-
-            # Keep posterior samples
-            self.storeSamples( worst, worstLogW - math.log( self.discard ) )
-
-            # Update Evidence Z and Information H
-            logZnew = numpy.logaddexp( self.logZ, worstLogW )
-
-            self.info = ( math.exp( worstLogW - logZnew ) * self.lowLhood +
-                    math.exp( self.logZ - logZnew ) * ( self.info + self.logZ ) - logZnew )
-            self.logZ = logZnew
-
-            if self.verbose >= 3 or ( self.verbose >= 2 and self.iteration % 100 == 0 ):
-                kw = worst[0]
-                pl = self.walkers[kw].parlist[self.walkers[kw].fitIndex]
-                np = len( pl )
-                print( "%8d %8.1f %8.1f %8.1f %6d "%( self.iteration, self.logZ, self.info,
-                        self.lowLhood, np ), fmt( pl ) )
-
-                self.plotResult( worst[0], self.iteration )
-
-            self.samples.weed( self.maxsize )                # remove overflow in samplelist
-
-            self.copyWalker( worst )
-
-            # Explore the copied walker(s)
-            explorer.explore( worst, self.lowLhood, fitlist )
-
-            # Shrink the interval
-            logWidth -= ( 1.0 * self.discard ) / self.ensemble
-            self.iteration += 1
-
-            self.optionalSave( )
-
-
-        # End of Sampling
-        self.addEnsembleToSamples( logWidth )
+        self.explorer = explorer = Explorer( self )
+        if restored :
+            self.restart.restoreExplorer( explorer )
+        try :
+            self.walkers.makeIndex()
+            if self.monitor is not None :
+                self.monitor.start( self )
+
+            while self.iteration < self.getMaxIter( ):
+
+                #  find worst walker(s) in ensemble
+                worst = self.findWorst()
+                worstLogW = logWidth + self.walkers[worst[-1]].logL
+
+                # Keep posterior samples
+                self.storeSamples( worst, worstLogW - math.log( self.discard ) )
+
+                # Update Evidence Z and Information H
+                logZnew = numpy.logaddexp( self.logZ, worstLogW )
+
+                self.info = ( math.exp( worstLogW - logZnew ) * self.lowLhood +
+                        math.exp( self.logZ - logZnew ) * ( self.info + self.logZ ) - logZnew )
+                self.logZ = logZnew
+
+                if self.verbose >= 3 or ( self.verbose >= 2 and self.iteration % 100 == 0 ):
+                    kw = worst[0]
+                    pl = self.walkers[kw].parlist[self.walkers[kw].fitIndex]
+                    np = len( pl )
+                    print( "%8d %8.1f %8.1f %8.1f %6d "%( self.iteration, self.logZ, self.info,
+                            self.lowLhood, np ), fmt( pl ) )
+
+                    self.plotResult( worst[0], self.iteration )
+
+                if self.sampleFile is None :
+                    self.samples.weed( self.maxsize )            # remove overflow in samplelist
+
+                self.copyWalker( worst )
+
+                # Explore the copied walker(s)
+                explorer.explore( worst, self.lowLhood, fitlist )
+
+                # Shrink the interval
+                logWidth -= ( 1.0 * self.discard ) / self.ensemble
+                self.iteration += 1
+
+                self.optionalSave( )
+                self.optionalReport( )
+
+            # End of Sampling
+            self.addEnsembleToSamples( logWidth )
+        finally :
+            ## also stop the worker processes and the monitor, and write the
+            ## buffered samples when the loop is interrupted
+            explorer.close()
+            self.explorer = None
+            self.distribution.partcache.clear()
+            if self.sampleFile is not None :
+                self.sampleFile.close()
+            if self.monitor is not None :
+                self.monitor.stop( self )
+
+        self.allocation = explorer.allocation
+        self.walkers.removeIndex()
+        if self.sampleFile is not None :
+            self.samples = self.sampleFile.getSampleList( self.model, fitIndex=fitlist,
+                                                          ndata=len( self.ydata ) )
 
         # Calculate weighted average and stdevs for the parameters;
         self.samples.LogZ = self.logZ
@@ -423,21 +496,25 @@ class NestedSampler( object ):
 
 #  ===================================================================================
     def optionalRestart( self ):
+        """
+        Restore the state of a previous run when the restart asks for it.
 
+        Returns True when the state is restored.
+        """
         if self.restart is not None and self.restart.wantRestore( ):
-            self.walkers, self.samples = self.restart.restore( self.walkers, self.samples )
-            self.logZ = self.walkers.logZ
-            self.info = self.walkers.info
-            self.iteration = self.walkers.iteration
+            self.restart.restore( self )
             return True
         return False
 
     def optionalSave( self ):
-        if self.restart is not None and self.restart.wantSave( ) and self.iteration % 100 == 0:
-            self.walkers.logZ = self.logZ
-            self.walkers.info = self.info
-            self.walkers.iteration = self.iteration
-            self.restart.save( self.walkers, self.samples )
+        """ Save the state of the sampler when the restart asks for it. """
+        if self.restart is not None and self.restart.wantSave( self.iteration ):
+            self.restart.save( self )
+
+    def optionalReport( self ):
+        """ Report the progress when the monitor asks for it. """
+        if self.monitor is not None and self.monitor.wantReport( self.iteration ):
+            self.monitor.report( self )
 
     def storeSamples( self, worst, worstLogW ):
         for kw in worst :
@@ -449,17 +526,11 @@ class NestedSampler( object ):
         Find discard bad points in ensemble. In order worse to better.
         lowLhood is the "best" in the bad points.
 
+        The walkers keep an index ordered by logL, which makes this an
+        O( discard * log( ensemble ) ) operation.
         """
-        worst = []
-        for k in range( self.discard ) :
-            self.lowLhood = sys.float_info.max
-            for i in range( self.ensemble ):
-                if self.walkers[i].logL < self.lowLhood :
-                    if i in worst :
-                        continue
-                    bad = i
-                    self.lowLhood = self.walkers[i].logL
-            worst += [bad]
+        worst = self.walkers.getWorst( self.discard )
+        self.lowLhood = self.walkers[worst[-1]].logL
         return worst
 
     def copyWalker( self, worst ):
@@ -478,22 +549,10 @@ class NestedSampler( object ):
 
     def addEnsembleToSamples( self, logWidth ):
         """
-        Add the ensemble walkers to the samples
+        Add the ensemble walkers to the samples, in order worse to better.
         """
-        done = [False] * self.ensemble
-
-        for nest in range( self.ensemble ):
-            # skip walkers already done
-            worst = 0
-            while done[worst] : worst += 1
-
-            #  find worst walker in ensemble not yet handled
+        for worst in self.walkers.getWorst( self.ensemble ) :
             self.lowLhood = self.walkers[worst].logL
-            for i in range( worst+1, self.ensemble ) :
-                logl = self.walkers[i].logL
-                if logl < self.lowLhood and not done[i]:
-                    worst = i
-                    self.lowLhood = logl
 
             worstLogW = logWidth + self.lowLhood
             self.walkers[worst].logW = worstLogW
@@ -507,8 +566,6 @@ class NestedSampler( object ):
             # Keep posterior sample
             self.samples.add( self.walkers, worst )
 
-            done[worst] = True
-
 
     #  *********INTERNALS***************************************************
     def __setattr__( self, name, value ) :
@@ -620,6 +677,10 @@ class NestedSampler( object ):
                 engine = GibbsEngine( self.walkers, self.distribution, seed=self.seed )
             elif name == "step" :
                 engine = StepEngine( self.walkers, self.distribution, seed=self.seed )
+            elif name == "ellipsoid" :
+                engine = EllipsoidEngine( self.walkers, self.distribution, seed=self.seed )
+            elif name == "slice" :
+                engine = SliceEngine( self.walkers, self.distribution, seed=self.seed )
 #            elif name == "cross" :
 #                engine = CrossEngine( self.walkers, self.distribution, seed=self.seed )
 #            elif name == "frog" :
@@ -647,11 +708,15 @@ class NestedSampler( object ):
                         seed=self.seed )
         else :
             # decorate with proper information
+            self.initialEngine.walkers = self.walkers
             self.initialEngine.members = self.walkers
             self.initialEngine.errdis = self.distribution
 
-        for walker in self.walkers :
-            self.initialEngine.execute( walker, 0, fitIndex=fitlist )
+        if isinstance( self.initialEngine, StartEngine ) :
+            self.initialEngine.executeAll( 0, fitIndex=fitlist )
+        else :
+            for walker in self.walkers :
+                self.initialEngine.execute( walker, 0, fitIndex=fitlist )
 
     def plotData( self ):
         if self.plotter is None:
@@ -671,11 +736,15 @@ class NestedSampler( object ):
     def report( self ):
 
 #        print( "Rate        %f" % self.rate )
-        print( "Engines              success     reject     failed      calls" )
+        share = self.schedule != "fixed" and self.allocation is not None
+        print( "Engines              success     reject     failed      calls" +
+               ( "      share" if share else "" ) )
 
-        for engine in self.engines :
+        for k,engine in enumerate( self.engines ) :
             print( "%-16.16s " % engine, end="" )
-            engine.printReport()
+            engine.printReport( end=( "" if share else "\n" ) )
+            if share :
+                print( " %10.3f" % self.allocation[k] )
         print( "Calls to LogL     %10d" % self.distribution.ncalls, end="" )
         if self.distribution.nparts > 0 :
             print( "   to dLogL %10d" % self.distribution.nparts )
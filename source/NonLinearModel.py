@@ -65,8 +65,9 @@ class NonLinearModel( Model ):
         Set attributes: _linear
 
         """
-        dic = {'_linear':set}
-        if not Tools.setSingleAttributes( self, name, value, dic ) :
+        if name == '_linear' and isinstance( value, set ) :
+            object.__setattr__( self, name, value )
+        else :
             super( NonLinearModel, self ).__setattr__( name, value )
 
     def setMixedModel( self, lindex ):
@@ -0,0 +1,265 @@
+import numpy as numpy
+import math
+import multiprocessing
+
+from NestedSampler import NestedSampler
+from SampleList import SampleList
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+class ParallelNestedSampler( object ):
+    """
+    ParallelNestedSampler runs a number of independent NestedSamplers, each
+    with its own seed, in worker processes and merges their samples into
+    one SampleList.
+
+    The runs are merged as proposed by Skilling: the samples of all runs are
+    ordered by logL, as if they were produced by one run with an ensemble
+    equal to the sum of the ensembles. A dead sample shrinks the prior
+    mass by a factor exp( -1 / nlive ), where nlive is the number of live
+    walkers over all runs at that level. The walkers of a run that are left
+    at its end, leave one by one: the prior mass shrinks by ( nlive - 1 ) / nlive.
+    From the new weights the evidence and the information are calculated.
+
+    As the runs are independent, the spread in their evidences provides a
+    check on the precision of the evidence.
+
+    Example
+    -------
+    >>> pns = ParallelNestedSampler( x, model, y, nruns=4 )
+    >>> yfit = pns.sample()
+    >>> print( pns.logZ, pns.logZprecision, pns.logZspread )
+
+    Attributes
+    ----------
+    nruns : int (4)
+        number of NestedSamplers
+    seed : int (80409)
+        the run k has seed + k
+    workers : None or int
+        number of worker processes. None : the number of cpus.
+        1 : the runs are done one after another in this process.
+    kwargs : dict
+        further keyword arguments for the NestedSamplers
+    samples : SampleList
+        the merged samples
+    runs : list of dict
+        per run the logZ, info, ensemble, ncalls and iteration
+    logZ : float
+        the log evidence of the merged run
+    info : float
+        the information H of the merged run
+    ensemble : int
+        sum of the ensembles of the runs
+
+    Author       Do Kester.
+
+    """
+    #  *********CONSTRUCTORS***************************************************
+    def __init__( self, xdata, model, ydata, weights=None, nruns=4, seed=80409,
+                  workers=None, verbose=1, **kwargs ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        xdata : array_like
+            array of independent input values
+        model : Model
+            the model function to be fitted
+        ydata : array_like
+            array of dependent (to be fitted) data
+        weights : array_like (None)
+            weights pertaining to ydata
+        nruns : int
+            number of NestedSamplers
+        seed : int
+            seed of the first NestedSampler
+        workers : None or int
+            number of worker processes
+        verbose : int
+            0 : silent
+            1 : report at the end
+        kwargs : dict
+            keyword arguments for the NestedSamplers, except verbose and seed.
+            A maxsize is applied to the merged samples.
+
+        """
+        if nruns < 1 :
+            raise ValueError( "Number of runs must be positive" )
+        self.xdata = xdata
+        self.model = model
+        self.ydata = ydata
+        self.weights = weights
+        self.nruns = nruns
+        self.seed = seed
+        self.workers = workers
+        self.verbose = verbose
+        self.maxsize = kwargs.pop( "maxsize", None )
+        self.discard = kwargs.get( "discard", 1 )
+        self.kwargs = kwargs
+
+        self.samples = None
+        self.runs = []
+        self.logZ = 0.0
+        self.info = 0.0
+        self.ensemble = 0
+
+    #  *******SAMPLE************************************************************
+    def sample( self, keep=None ):
+        """
+        Run the NestedSamplers, merge the samples and return the weighted
+        average result of the Model.
+
+        Parameters
+        ----------
+        keep : None or dict of {int:float}
+            Dictionary of indices (int) to be kept at a fixed value (float)
+
+        """
+        tasks = [( self.xdata, self.model, self.ydata, self.weights, self.seed + k,
+                   keep, self.kwargs ) for k in range( self.nruns )]
+
+        if self.workers == 1 :
+            results = [_sampleWorker( task ) for task in tasks]
+        else :
+            with multiprocessing.Pool( processes=self.workers ) as pool :
+                results = pool.map( _sampleWorker, tasks )
+
+        self.runs = [res[1] for res in results]
+        self.samples = self.merge( [res[0] for res in results],
+                                   [run["ensemble"] for run in self.runs] )
+        self.samples.weed( self.maxsize )
+        self.samples.normalize()
+
+        self.model.parameters = self.samples.parameters
+        self.model.stdevs = self.samples.stdevs
+
+        if self.verbose >= 1 :
+            self.report()
+
+        return self.samples.average( self.xdata )
+
+    def merge( self, samplelists, ensembles ):
+        """
+        Merge the samples of independent runs into one SampleList.
+
+        The lists must contain all samples of a NestedSampler, in the order
+        they were produced: the dead ones followed by the final ensemble.
+        They should not have been weeded.
+
+        Parameters
+        ----------
+        samplelists : list of SampleList
+            the samples of the runs
+        ensembles : list of int
+            the ensemble of each run
+
+        Returns
+        -------
+        SampleList : with the merged samples, their logZ and info.
+        """
+        logL = numpy.concatenate( [sl.getLogLikelihoodEvolution() for sl in samplelists] )
+        final = numpy.concatenate( [numpy.arange( len( sl ) ) >= len( sl ) - ens
+                                    for sl, ens in zip( samplelists, ensembles )] )
+        lists = numpy.concatenate( [numpy.full( len( sl ), k, dtype=int )
+                                    for k, sl in enumerate( samplelists )] )
+        items = numpy.concatenate( [numpy.arange( len( sl ) ) for sl in samplelists] )
+
+        order = numpy.argsort( logL, kind="stable" )
+        logL = logL[order]
+        final = final[order]
+
+        ## number of live walkers when the sample leaves the (merged) ensemble
+        self.ensemble = int( numpy.sum( ensembles ) )
+        nlive = self.ensemble - ( numpy.cumsum( final ) - final )
+
+        with numpy.errstate( divide="ignore" ) :
+            logShrink = numpy.where( final, numpy.log( ( nlive - 1.0 ) / nlive ), -1.0 / nlive )
+        logX = numpy.append( 0.0, numpy.cumsum( logShrink[:-1] ) )
+        logW = logL + logX + numpy.log( -numpy.expm1( logShrink ) )
+
+        model = samplelists[0][0].model
+        merged = SampleList( model, 0, None, ndata=samplelists[0].ndata )
+        for k, lw in zip( order, logW ) :
+            merged.add( samplelists[lists[k]], items[k] )
+            merged[-1].logW = lw
+
+        self.logZ = numpy.logaddexp.reduce( logW )
+        self.info = numpy.sum( numpy.exp( logW - self.logZ ) * logL ) - self.logZ
+        merged.logZ = self.logZ
+        merged.info = self.info
+        return merged
+
+    #  *********INTERNALS***************************************************
+    def __getattr__( self, name ) :
+        if name == "evidence" :
+            return self.logZ / math.log( 10.0 )
+        if name == "logZprecision" :
+            return math.sqrt( self.info * self.discard / self.ensemble )
+        if name == "precision" :
+            return self.logZprecision / math.log( 10.0 )
+        if name == "logZspread" :
+            logZs = [run["logZ"] for run in self.runs]
+            return numpy.std( logZs, ddof=1 ) / math.sqrt( len( logZs ) ) if len( logZs ) > 1 else 0.0
+        if name == "information" :
+            return self.info
+        if name == "parameters" :
+            return self.samples.getParameters()
+        elif name == "stdevs" or name == "standardDeviations" :
+            self.samples.getParameters()
+            return self.samples.stdevs
+
+        raise AttributeError( str( self ) + " object has no attribute " + name )
+
+    def report( self ):
+        print( "Run          seed       logZ       info      calls" )
+        for k, run in enumerate( self.runs ) :
+            print( "%3d %12d %10.3f %10.3f %10d" % ( k, self.seed + k, run["logZ"],
+                   run["info"], run["ncalls"] ) )
+        print( "Samples  %10d" % len( self.samples ) )
+        print( "Evidence    %10.3f +- %10.3f" % ( self.evidence, self.precision ) )
+        print( "Spread      %10.3f" % ( self.logZspread / math.log( 10.0 ) ) )
+
+
+def _sampleWorker( task ):
+    """
+    Do one NestedSampler run, in a worker process.
+
+    Parameters
+    ----------
+    task : tuple
+        ( xdata, model, ydata, weights, seed, keep, kwargs )
+
+    Returns
+    -------
+    tuple : ( SampleList, dict with logZ, info, ensemble, ncalls and iteration )
+    """
+    xdata, model, ydata, weights, seed, keep, kwargs = task
+    ns = NestedSampler( xdata, model, ydata, weights=weights, seed=seed, verbose=0, **kwargs )
+    ns.sample( keep=keep )
+    run = {"logZ" : float( ns.logZ ), "info" : float( ns.info ), "ensemble" : ns.ensemble,
+           "ncalls" : ns.distribution.ncalls, "iteration" : ns.iteration}
+    return ( ns.samples, run )
@@ -100,7 +100,7 @@ class PoissonErrorDistribution( ErrorDistribution ):
 
 
     #  *********LIKELIHOODS***************************************************
-    def logLikelihood( self, model, param ):
+    def logLikelihood( self, model, param, mock=None ):
         """
         Return the log( likelihood ) for a Poisson distribution.
 
@@ -110,10 +110,13 @@ class PoissonErrorDistribution( ErrorDistribution ):
             model to calculate mock data
         param : array_like
             parameters of the model
+        mock : None or array_like
+            result of the model for the parameters, when already known
 
         """
         self.ncalls += 1
-        mock = model.result( self.xdata, param )
+        if mock is None :
+            mock = model.result( self.xdata, param )
         if numpy.any( numpy.less_equal( mock, 0 ) ) :
             return -math.inf
 
@@ -126,6 +129,26 @@ class PoissonErrorDistribution( ErrorDistribution ):
 
         return logl
 
+    def batchLogL( self, model, params ):
+        """
+        Return the log( likelihood ) for a set of parameters.
+
+        Parameters
+        ----------
+        model : Model
+            model to calculate mock data
+        params : array_like of shape (k, npar)
+            k lists of parameters of the model
+        """
+        self.ncalls += len( params )
+        mock = self.getResultBatch( model, params[:,:model.npchain] )
+        lfdata = logFactorial( self.data )
+        bad = numpy.any( numpy.less_equal( mock, 0 ), axis=1 )
+        mock[bad,:] = 1.0
+        logl = numpy.sum( self.data * numpy.log( mock ) - mock - lfdata, axis=1 )
+        logl[numpy.logical_or( bad, numpy.isnan( logl ) )] = -math.inf
+        return logl
+
     def partialLogL( self, model, param, fitIndex ):
         """
         Return the partial derivative of log( likelihood ) to the parameters.
@@ -140,8 +163,7 @@ class PoissonErrorDistribution( ErrorDistribution ):
             indices of the params to be fitted
         """
         self.nparts += 1
-        mock = model.result( self.xdata, param )
-        dM = model.partial( self.xdata, param )
+        mock, dM = model.resultAndPartial( self.xdata, param )
         dL = numpy.zeros( len( fitIndex ), dtype=float )
 
         i = 0
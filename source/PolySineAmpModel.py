@@ -105,7 +105,9 @@ class PolySineAmpModel( LinearModel ):
 
     def __setattr__( self, name, value ) :
         dind = {"frequency": float, "order": int, "_pm": PolynomialModel}
-        if not Tools.setSingleAttributes( self, name, value, dind ) :
+        if Tools.setSingleAttributes( self, name, value, dind ) :
+            self.clearDesign()
+        else :
             super( PolySineAmpModel, self ).__setattr__( name, value )
 
     def basePartial( self, xdata, params, parlist=None ):
@@ -90,7 +90,7 @@ class PolySurfaceModel( LinearModel ):
         dind = {"degree": int}
 
         if Tools.setSingleAttributes( self, name, value, dind ) :
-            pass                                            # success
+            self.clearDesign()
         else :
             super( PolySurfaceModel, self ).__setattr__( name, value )
 
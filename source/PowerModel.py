@@ -78,7 +78,9 @@ class PowerModel( LinearModel ):
 
     def __setattr__( self, name, value ) :
         dind = {"exponent": float}
-        if not Tools.setSingleAttributes( self, name, value, dind ) :
+        if Tools.setSingleAttributes( self, name, value, dind ) :
+            self.clearDesign()
+        else :
             super( PowerModel, self ).__setattr__( name, value )
 
 
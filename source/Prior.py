@@ -56,7 +56,11 @@ class Prior( object ):
     _highDomain : float
         upper limit of the Priors possible values
 
+    The class attribute `changes` counts the changes in all Priors; it tells
+    a PriorBank that it needs to be renewed.
+
     """
+    changes = 0
 
     #*********CONSTRUCTORS***************************************************
     def __init__( self, limits=None, prior=None ):
@@ -131,6 +135,7 @@ class Prior( object ):
 
         if name in keys :
             object.__setattr__( self, name, float( value ) )
+            Prior.changes += 1
         else :
             raise AttributeError( repr( self ) + " object has no attribute " + name )
 
@@ -0,0 +1,261 @@
+import numpy as numpy
+import math
+from scipy import special
+
+from UniformPrior import UniformPrior
+from JeffreysPrior import JeffreysPrior
+from GaussPrior import GaussPrior
+from LaplacePrior import LaplacePrior
+from CauchyPrior import CauchyPrior
+from ExponentialPrior import ExponentialPrior
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+
+class PriorBank( object ):
+    """
+    PriorBank converts the values of many parameters at once between the
+    domain and the unit interval [0,1].
+
+    The parameters are grouped by the type of their prior: Uniform, Jeffreys,
+    Gauss, Laplace, Cauchy and Exponential. The constants of the priors
+    (limits, scales) are collected in arrays, such that a group is converted
+    in one array operation. Priors of other types (or ExponentialPriors with
+    a fraction of zeros) are converted one by one.
+
+    The values can be a 1-d array of parameters or a 2-d array (k, npar) of
+    k sets of parameters.
+
+    A PriorBank is a snapshot of the priors. When the priors change, a new
+    bank must be made; Model.getPriorBank takes care of that.
+
+    Attributes
+    ----------
+    priors : list of Prior
+        the priors of the parameters. The last one is used for all further
+        parameters.
+    group : array of int
+        the group each parameter belongs to
+
+    Author       Do Kester.
+
+    """
+    OTHER = 0
+    UNIFORM = 1
+    JEFFREYS = 2
+    GAUSS = 3
+    LAPLACE = 4
+    CAUCHY = 5
+    EXPONENTIAL = 6
+
+    def __init__( self, priors ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        priors : list of Prior
+            the priors of the parameters
+
+        """
+        self.priors = list( priors )
+        npr = len( self.priors )
+        self.group = numpy.zeros( npr, dtype=int )
+        self.low = numpy.full( npr, math.nan )
+        self.high = numpy.full( npr, math.nan )
+        self.range = numpy.full( npr, math.nan )
+        self.scale = numpy.full( npr, math.nan )
+
+        for k, prior in enumerate( self.priors ) :
+            ptype = type( prior )
+            if ptype is UniformPrior :
+                self.group[k] = self.UNIFORM
+                self.low[k] = prior.lowLimit
+                self.high[k] = prior.highLimit
+                self.range[k] = prior._range
+            elif ptype is JeffreysPrior :
+                self.group[k] = self.JEFFREYS
+                self.low[k] = prior._logLo
+                self.range[k] = prior._norm
+            elif ptype is GaussPrior :
+                self.group[k] = self.GAUSS
+                self.scale[k] = prior.scale
+            elif ptype is LaplacePrior :
+                self.group[k] = self.LAPLACE
+                self.scale[k] = prior.scale
+            elif ptype is CauchyPrior :
+                self.group[k] = self.CAUCHY
+                self.scale[k] = prior.scale
+            elif ptype is ExponentialPrior and prior.zeroFraction == 0 and prior._uval == 0 :
+                self.group[k] = self.EXPONENTIAL
+                self.scale[k] = prior.scale
+
+        self.groups = numpy.unique( self.group )
+
+    def getIndex( self, kpar, npar ):
+        """
+        Return kpar as an array of indices into the priors.
+
+        Parameters
+        ----------
+        kpar : None or array_like of int
+            indices of the parameters. None means all npar.
+        npar : int
+            number of values
+        """
+        if kpar is None :
+            kpar = numpy.arange( npar )
+        else :
+            kpar = numpy.asarray( kpar, dtype=int )
+        return numpy.minimum( kpar, len( self.priors ) - 1 )
+
+    def unit2Domain( self, uval, kpar=None ):
+        """
+        Return the domain values for the unit values.
+
+        Parameters
+        ----------
+        uval : array_like
+            unit values: 1-d (npar) or 2-d (k, npar)
+        kpar : None or array_like of int
+            indices of the parameters the (last axis of) uval belongs to.
+            None means all.
+        """
+        return self.convert( uval, kpar, self.UNIT2DOMAIN )
+
+    def domain2Unit( self, dval, kpar=None ):
+        """
+        Return the unit values for the domain values.
+
+        Parameters
+        ----------
+        dval : array_like
+            domain values: 1-d (npar) or 2-d (k, npar)
+        kpar : None or array_like of int
+            indices of the parameters the (last axis of) dval belongs to.
+            None means all.
+        """
+        return self.convert( dval, kpar, self.DOMAIN2UNIT )
+
+    def convert( self, values, kpar, methods ):
+        """
+        Convert the values per group with the method from methods.
+        """
+        values = numpy.asarray( values, dtype=float )
+        kpar = self.getIndex( kpar, values.shape[-1] )
+        result = numpy.empty_like( values )
+        group = self.group[kpar]
+        for g in self.groups :
+            cols = numpy.flatnonzero( group == g )
+            if len( cols ) == 0 :
+                continue
+            if len( cols ) == len( kpar ) :
+                result[...] = methods[g]( self, values, kpar )
+            else :
+                result[...,cols] = methods[g]( self, values[...,cols], kpar[cols] )
+        return result
+
+    #  *********GROUPS***************************************************
+    def otherU2D( self, uval, kpar ):
+        dval = numpy.empty_like( uval )
+        for i, kp in enumerate( kpar ) :
+            prior = self.priors[kp]
+            dval[...,i] = numpy.reshape( [prior.unit2Domain( u ) for u in numpy.ravel( uval[...,i] )],
+                                         uval.shape[:-1] )
+        return dval
+
+    def otherD2U( self, dval, kpar ):
+        uval = numpy.empty_like( dval )
+        for i, kp in enumerate( kpar ) :
+            prior = self.priors[kp]
+            uval[...,i] = numpy.reshape( [prior.domain2Unit( d ) for d in numpy.ravel( dval[...,i] )],
+                                         dval.shape[:-1] )
+        return uval
+
+    def uniformU2D( self, uval, kpar ):
+        if numpy.any( numpy.isinf( self.range[kpar] ) ) :
+            raise AttributeError( "Limits are needed for UniformPrior" )
+        return uval * self.range[kpar] + self.low[kpar]
+
+    def uniformD2U( self, dval, kpar ):
+        if numpy.any( numpy.isinf( self.range[kpar] ) ) :
+            raise AttributeError( "Limits are needed for UniformPrior" )
+        low = self.low[kpar]
+        out = numpy.logical_or( dval < low, dval > self.high[kpar] )
+        return numpy.where( out, 0, ( dval - low ) / self.range[kpar] )
+
+    def jeffreysU2D( self, uval, kpar ):
+        dval = numpy.exp( uval * self.range[kpar] + self.low[kpar] )
+        if numpy.any( numpy.isnan( dval ) ) :
+            raise AttributeError( "Limits are needed for JeffreysPrior" )
+        return dval
+
+    def jeffreysD2U( self, dval, kpar ):
+        if numpy.any( dval <= 0 ) :
+            raise ValueError( "math domain error" )
+        uval = ( numpy.log( dval ) - self.low[kpar] ) / self.range[kpar]
+        if numpy.any( numpy.isnan( uval ) ) :
+            raise AttributeError( "Limits are needed for JeffreysPrior" )
+        return uval
+
+    def gaussU2D( self, uval, kpar ):
+        return special.erfinv( 2 * uval - 1 ) * self.scale[kpar]
+
+    def gaussD2U( self, dval, kpar ):
+        return 0.5 * ( special.erf( dval / self.scale[kpar] ) + 1 )
+
+    def laplaceU2D( self, uval, kpar ):
+        scale = self.scale[kpar]
+        with numpy.errstate( divide="ignore", invalid="ignore" ) :
+            return numpy.where( uval > 0.5, numpy.log( 2 * ( 1 - uval ) ) * -scale,
+                                numpy.log( 2 * uval ) * scale )
+
+    def laplaceD2U( self, dval, kpar ):
+        scale = self.scale[kpar]
+        with numpy.errstate( over="ignore" ) :
+            return numpy.where( dval < 0, 0.5 * numpy.exp( dval / scale ),
+                                1.0 - 0.5 * numpy.exp( -dval / scale ) )
+
+    def cauchyU2D( self, uval, kpar ):
+        return numpy.tan( ( uval - 0.5 ) * math.pi ) * self.scale[kpar]
+
+    def cauchyD2U( self, dval, kpar ):
+        return numpy.arctan( dval / self.scale[kpar] ) / math.pi + 0.5
+
+    def exponentialU2D( self, uval, kpar ):
+        uv = 1 - uval
+        with numpy.errstate( divide="ignore", invalid="ignore" ) :
+            dval = -numpy.log( uv ) * self.scale[kpar]
+        return numpy.where( uv > 1, 0.0, numpy.where( uv == 0, math.inf, dval ) )
+
+    def exponentialD2U( self, dval, kpar ):
+        return numpy.where( dval == 0, 0.0, 1 - numpy.exp( -dval / self.scale[kpar] ) )
+
+    UNIT2DOMAIN = {OTHER : otherU2D, UNIFORM : uniformU2D, JEFFREYS : jeffreysU2D,
+                   GAUSS : gaussU2D, LAPLACE : laplaceU2D, CAUCHY : cauchyU2D,
+                   EXPONENTIAL : exponentialU2D}
+    DOMAIN2UNIT = {OTHER : otherD2U, UNIFORM : uniformD2U, JEFFREYS : jeffreysD2U,
+                   GAUSS : gaussD2U, LAPLACE : laplaceD2U, CAUCHY : cauchyD2U,
+                   EXPONENTIAL : exponentialD2U}
+
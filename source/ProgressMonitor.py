@@ -0,0 +1,223 @@
+import json
+import time
+import queue as queues
+from threading import Thread
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+class ProgressMonitor( object ):
+    """
+    ProgressMonitor reports the progress of a NestedSampler at regular intervals.
+
+    Every interval iterations (and at the end) it makes a record (dict) with
+
+        iteration   the present iteration
+        logZ        the present evidence
+        info        the present information H
+        lowLhood    the present low likelihood level
+        remaining   estimated number of remaining iterations (from getMaxIter)
+        ncalls      number of calls to logL so far
+        callrate    number of calls to logL per second since the previous record
+        engines     per engine the [success, reject, failed] since the previous record
+        walltime    seconds since the start of the sampling
+        final       True for the record at the end of the sampling
+
+    The record is passed to a callback function, put on a queue and/or
+    written as a line of JSON to a file. The file is written by a separate
+    thread, so that the sampler is not kept waiting.
+
+    Example
+    -------
+    >>> ns = NestedSampler( x, model, y )
+    >>> ns.monitor = ProgressMonitor( interval=500, filename="progress.jsonl" )
+    >>> ns.sample()
+
+    Attributes
+    ----------
+    interval : int (100)
+        number of iterations between records
+    callback : None or callable
+        called as callback( record ), in the thread of the sampler
+    filename : None or str
+        name of a file to append the records to, as JSON lines
+    queue : None or queue.Queue (or alike)
+        the records are put on the queue without waiting. When the queue is
+        full, the record is dropped.
+    dropped : int
+        number of records dropped because the queue was full
+
+    Author       Do Kester.
+
+    """
+    #  *********CONSTRUCTORS***************************************************
+    def __init__( self, interval=100, callback=None, filename=None, queue=None ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        interval : int
+            number of iterations between records
+        callback : None or callable
+            called with the record as argument
+        filename : None or str
+            name of a file to append the records to, as JSON lines
+        queue : None or queue.Queue
+            to put the records on
+
+        """
+        if interval < 1 :
+            raise ValueError( "Report interval must be positive" )
+        self.interval = interval
+        self.callback = callback
+        self.filename = filename
+        self.queue = queue
+        self.dropped = 0
+        self._writer = None
+        self._lines = None
+
+    def __str__( self ) :
+        return str( "ProgressMonitor every %d iterations" % self.interval )
+
+    #  *********REPORTING***************************************************
+    def start( self, sampler ):
+        """
+        Start the monitoring of a sampler.
+
+        Parameters
+        ----------
+        sampler : NestedSampler
+            the sampler to be monitored
+        """
+        self._t0 = self._tlast = time.time()
+        self._ncalls = sampler.distribution.ncalls
+        self._reports = [list( eng.report[:3] ) for eng in sampler.engines]
+
+        if self.filename is not None and self._writer is None :
+            self._lines = queues.Queue()
+            self._writer = Thread( target=self.writeLines, args=( self._lines, ),
+                                   name="monitor", daemon=True )
+            self._writer.start()
+
+    def wantReport( self, iteration ):
+        """
+        Return True when a record is due at this iteration.
+
+        Parameters
+        ----------
+        iteration : int
+            the present iteration of the sampler
+        """
+        return iteration % self.interval == 0
+
+    def report( self, sampler, final=False ):
+        """
+        Make a record of the state of the sampler and pass it on.
+
+        Parameters
+        ----------
+        sampler : NestedSampler
+            the sampler to be monitored
+        final : bool
+            whether it is the last record
+        """
+        record = self.makeRecord( sampler, final=final )
+
+        if self.callback is not None :
+            self.callback( record )
+        if self.queue is not None :
+            try :
+                self.queue.put_nowait( record )
+            except queues.Full :
+                self.dropped += 1
+        if self._lines is not None :
+            self._lines.put( record )
+
+    def makeRecord( self, sampler, final=False ):
+        """
+        Return a record (dict) of the state of the sampler.
+
+        Parameters
+        ----------
+        sampler : NestedSampler
+            the sampler to be monitored
+        final : bool
+            whether it is the last record
+        """
+        now = time.time()
+        ncalls = sampler.distribution.ncalls
+        engines = {}
+        for k,eng in enumerate( sampler.engines ) :
+            rep = list( eng.report[:3] )
+            engines[str( eng )] = [int( r - p ) for r,p in zip( rep, self._reports[k] )]
+            self._reports[k] = rep
+
+        dt = now - self._tlast
+        record = {"iteration" : int( sampler.iteration ),
+                  "logZ" : float( sampler.logZ ),
+                  "info" : float( sampler.info ),
+                  "lowLhood" : float( sampler.lowLhood ),
+                  "remaining" : max( 0, int( sampler.getMaxIter() - sampler.iteration ) ),
+                  "ncalls" : int( ncalls ),
+                  "callrate" : ( ncalls - self._ncalls ) / dt if dt > 0 else 0.0,
+                  "engines" : engines,
+                  "walltime" : now - self._t0,
+                  "final" : final }
+
+        self._tlast = now
+        self._ncalls = ncalls
+        return record
+
+    def stop( self, sampler ):
+        """
+        Make the final record and close the file, if any.
+
+        Parameters
+        ----------
+        sampler : NestedSampler
+            the sampler to be monitored
+        """
+        self.report( sampler, final=True )
+        if self._writer is not None :
+            self._lines.put( None )
+            self._writer.join()
+            self._writer = None
+            self._lines = None
+
+    def writeLines( self, lines ):
+        """
+        Append the records from the lines queue to the file, until a None arrives.
+
+        It runs in its own thread.
+        """
+        with open( self.filename, "a" ) as fp :
+            while True :
+                record = lines.get()
+                if record is None :
+                    break
+                fp.write( json.dumps( record ) + "\n" )
+                if lines.empty() :
+                    fp.flush()
+
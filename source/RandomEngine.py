@@ -111,7 +111,7 @@ class RandomEngine( Engine ):
                 uval = self.rng.uniform( um[c], ux[c], 1 )
                 param[c] = self.unit2Domain( model, uval, c )
 
-                Ltry = self.errdis.updateLogL( model, param, parval={c : save} )
+                Ltry = self.errdis.updateLogL( model, param, parval={c : save}, key=walker.id )
                 if Ltry >= lowLhood:
                     self.reportSuccess( )
                     self.setSample( walker, model, param, Ltry )
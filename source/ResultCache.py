@@ -0,0 +1,173 @@
+import numpy as numpy
+import threading
+from collections import OrderedDict
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+class ResultCache( object ):
+    """
+    ResultCache keeps the most recent results (and partials) of a Model.
+
+    Fitters often evaluate a model repeatedly at the same parameters:
+    for the residuals, for chisq and for the partials. When the model has a
+    cache, these evaluations are done only once.
+
+    An entry is keyed on the identity of the xdata and the bytes of the
+    parameters. The entry keeps a reference to the xdata, so its identity
+    cannot be reused by another array. The xdata should not be changed in
+    place while the cache is in use; call clear() when it is. Linear models
+    clear the cache themselves when their structure (period, knots, etc.)
+    is set anew.
+
+    The cached arrays are made read-only, as they are handed out to
+    all callers with the same parameters.
+
+    The cache is least-recently-used and it can be shared by threads.
+    It is emptied when pickled.
+
+    Example
+    -------
+    >>> model = GaussModel( )
+    >>> model.cache = ResultCache( size=8 )
+    >>> fitter = LevenbergMarquardtFitter( x, model )
+    >>> par = fitter.fit( y )
+    >>> print( model.cache.hits, model.cache.misses )
+
+    Attributes
+    ----------
+    size : int (8)
+        maximum number of entries
+    hits : int
+        number of successful lookups
+    misses : int
+        number of failed lookups
+
+    Author       Do Kester.
+
+    """
+    #  *********CONSTRUCTORS***************************************************
+    def __init__( self, size=8 ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        size : int
+            maximum number of entries
+
+        """
+        if size < 1 :
+            raise ValueError( "Cache size must be positive" )
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__( self ):
+        return len( self._entries )
+
+    def __str__( self ):
+        return str( "ResultCache of %d: %d hits %d misses" % ( self.size, self.hits, self.misses ) )
+
+    def __getstate__( self ):
+        return {"size" : self.size, "hits" : self.hits, "misses" : self.misses}
+
+    def __setstate__( self, state ):
+        self.__init__( state["size"] )
+        self.hits = state["hits"]
+        self.misses = state["misses"]
+
+    #  *********LOOKUP***************************************************
+    def get( self, xdata, param ):
+        """
+        Return the entry ( xdata, result, partial ) for xdata and param, or None.
+
+        The partial in the entry is None when it has not been stored.
+        A returned entry counts as a hit, also when its partial is None.
+
+        Parameters
+        ----------
+        xdata : array_like
+            the input of the model
+        param : array_like
+            the parameters of the model
+        """
+        key = self.makeKey( xdata, param )
+        with self._lock :
+            entry = self._entries.get( key )
+            if entry is None or entry[0] is not xdata :
+                self.misses += 1
+                return None
+            self._entries.move_to_end( key )
+            self.hits += 1
+            return entry
+
+    def put( self, xdata, param, result, partial=None ):
+        """
+        Store the result (and partial) of the model for xdata and param.
+
+        Parameters
+        ----------
+        xdata : array_like
+            the input of the model
+        param : array_like
+            the parameters of the model
+        result : array_like
+            the result of the model
+        partial : None or array_like
+            the partials of the model
+
+        Returns
+        -------
+        tuple of the stored ( result, partial ), which are read-only
+        """
+        result = self.freeze( result )
+        if partial is not None :
+            partial = self.freeze( partial )
+        key = self.makeKey( xdata, param )
+        with self._lock :
+            self._entries[key] = ( xdata, result, partial )
+            self._entries.move_to_end( key )
+            while len( self._entries ) > self.size :
+                self._entries.popitem( last=False )
+        return ( result, partial )
+
+    def freeze( self, array ):
+        """ Return the array read-only; a copy when it does not own its data. """
+        if not array.flags.owndata :
+            array = array.copy()
+        array.flags.writeable = False
+        return array
+
+    def makeKey( self, xdata, param ):
+        """ Return the key for xdata and param. """
+        return ( id( xdata ), numpy.asarray( param, dtype=float ).tobytes() )
+
+    def clear( self ):
+        """ Remove all entries. """
+        with self._lock :
+            self._entries.clear()
+
@@ -61,6 +61,9 @@ class Sample( object ):
     hyperpars : array_like (read only)
         list of hyper parameters (of the error distribution)
 
+    A Sample in a SampleList is a view: id, parent, logL, logW and parlist
+    are kept in the columns of the list. A copy of the Sample is not a view.
+
 
     Author       Do Kester
 
@@ -123,6 +126,10 @@ class Sample( object ):
         Return the value of one of `parameters`, `scale`,
 
         """
+        store = self.__dict__.get( "_store" )
+        if store is not None and name in store.COLUMNS :
+            return store.getColumnItem( self.__dict__["_row"], name )
+
         if name == "weight" :
             return math.exp( self.logW )
         elif name == "parameters" :
@@ -142,6 +149,11 @@ class Sample( object ):
         Set attributes.
         """
 
+        store = self.__dict__.get( "_store" )
+        if store is not None and name in store.COLUMNS :
+            store.setColumnItem( self.__dict__["_row"], name, value )
+            return
+
         key1 = {"id" : int, "parent" : int, "model": Model, "logL" : float, "logW" : float }
         key2 = {"parlist" : float, "fitIndex" : int }
         if ( Tools.setSingleAttributes( self, name, value, key1 ) or
@@ -0,0 +1,373 @@
+import numpy as numpy
+import math
+import struct
+
+from Sample import Sample
+from SampleList import SampleList
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+class SampleFile( object ):
+    """
+    SampleFile stores Samples on disk, as they are produced by a sampler.
+
+    The samples are collected in a buffer which is written in bulk to a
+    .npy file, containing a record array with the fields
+    id, parent, logL, logW, npar and parlist.
+    The header of the file is updated at every write, so the file is a
+    valid .npy file at all times.
+
+    The samples in the file are obtained as a MappedSampleList, which keeps
+    them on disk through a memory map.
+
+    Example
+    -------
+    >>> ns = NestedSampler( x, model, y )
+    >>> ns.sampleFile = SampleFile( "mysamples.npy" )
+    >>> ns.sample()
+    >>> sl = ns.samples                     # MappedSampleList on mysamples.npy
+
+    Outside a sampler, the file is closed at the end of a with block
+    >>> with SampleFile( "mysamples.npy" ) as sf :
+    ...     sf.add( samplelist, 0 )
+
+    Attributes
+    ----------
+    filename : str
+        name of the file
+    buffersize : int (1000)
+        number of samples kept before they are written
+    npar : int
+        (maximum) length of the parlists. Default: from the first sample
+
+    Author       Do Kester.
+
+    """
+    HEADERSIZE = 256
+
+    #  *********CONSTRUCTORS***************************************************
+    def __init__( self, filename, buffersize=1000, npar=None ):
+        """
+        Constructor.
+
+        An existing file with the same name is overwritten.
+
+        Parameters
+        ----------
+        filename : str
+            name of the file
+        buffersize : int
+            number of samples kept before they are written
+        npar : None or int
+            (maximum) length of the parlists. Default: from the first sample
+
+        """
+        self.filename = filename
+        self.buffersize = buffersize
+        self.npar = npar
+        self._count = 0
+        self._nbuf = 0
+        self._nfile = 0
+        self._buffer = None
+        self._fp = None
+
+    def __len__( self ) :
+        return self._nfile + self._nbuf
+
+    def __str__( self ) :
+        return str( "SampleFile on %s with %d samples" % ( self.filename, len( self ) ) )
+
+    def __enter__( self ) :
+        return self
+
+    def __exit__( self, *exc ) :
+        self.close()
+
+    def getDtype( self ):
+        """ Return the dtype of the records in the file. """
+        return numpy.dtype( [( "id", "<i8" ), ( "parent", "<i8" ), ( "logL", "<f8" ),
+                             ( "logW", "<f8" ), ( "npar", "<i8" ),
+                             ( "parlist", "<f8", ( self.npar, ) )] )
+
+    #  *********WRITING***************************************************
+    def add( self, samplelist, index ):
+        """
+        Add a copy of a Sample from a SampleList to the file.
+
+        The same signature as SampleList.add
+
+        Parameters
+        ----------
+        samplelist : SampleList
+            the list to take to copy from
+        index : int
+            the item from the list
+
+        Raises
+        ------
+        ValueError when the parlist is longer than npar
+        """
+        sample = samplelist[index]
+        parlist = sample.parlist
+        if self._buffer is None :
+            if self.npar is None :
+                self.npar = len( parlist )
+            self._buffer = numpy.zeros( self.buffersize, dtype=self.getDtype() )
+
+        if len( parlist ) > self.npar :
+            raise ValueError( "Parlist longer than %d in %s" % ( self.npar, self.filename ) )
+
+        record = self._buffer[self._nbuf]
+        record["id"] = self._count
+        record["parent"] = sample.parent
+        record["logL"] = sample.logL
+        record["logW"] = sample.logW
+        record["npar"] = len( parlist )
+        record["parlist"][:len( parlist )] = parlist
+        record["parlist"][len( parlist ):] = 0.0
+        self._count += 1
+        self._nbuf += 1
+
+        if self._nbuf == self.buffersize :
+            self.flush()
+
+    def writeHeader( self ):
+        """
+        Write the .npy header for the present number of records.
+
+        The header has a fixed size, so it can be rewritten in place.
+        """
+        descr = numpy.lib.format.dtype_to_descr( self.getDtype() )
+        header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % ( descr, self._nfile )
+        header = header.ljust( self.HEADERSIZE - 11 ) + "\n"
+        if len( header ) + 10 != self.HEADERSIZE :
+            raise ValueError( "Header too long for %s" % self.filename )
+        self._fp.seek( 0 )
+        self._fp.write( numpy.lib.format.magic( 1, 0 ) + struct.pack( "<H", len( header ) ) +
+                        header.encode( "latin1" ) )
+
+    def flush( self ):
+        """
+        Write the buffered samples to the file.
+        """
+        if self._buffer is None or ( self._fp is None and self._nfile > 0 and self._nbuf == 0 ) :
+            return
+        if self._fp is None :
+            ## reopen a closed file without truncating it
+            self._fp = open( self.filename, "r+b" if self._nfile > 0 else "w+b" )
+            self.writeHeader()
+
+        self._fp.seek( self.HEADERSIZE + self._nfile * self._buffer.itemsize )
+        self._fp.write( self._buffer[:self._nbuf].tobytes() )
+        self._nfile += self._nbuf
+        self._nbuf = 0
+        self.writeHeader()
+        self._fp.flush()
+
+    def close( self ):
+        """ Flush the samples and close the file. """
+        self.flush()
+        if self._fp is not None :
+            self._fp.close()
+            self._fp = None
+
+    #  *********READING***************************************************
+    def getSampleList( self, model, fitIndex=None, ndata=1 ):
+        """
+        Return the samples in the file as a MappedSampleList.
+
+        Parameters
+        ----------
+        model : Model
+            the model used for the samples
+        fitIndex : array_like
+            list of indices in parlist that need fitting
+        ndata : int
+            length of the data vector; to be used in stdev calculations
+        """
+        self.flush()
+        return MappedSampleList( self.filename, model, fitIndex=fitIndex, ndata=ndata )
+
+
+class MappedSampleList( SampleList ):
+    """
+    MappedSampleList is a SampleList with the samples in a .npy file as
+    written by SampleFile. The file is memory mapped; only the parts that are
+    in use are in memory.
+
+    The Samples are made on request; they are views on the file.
+    Only the logWs (by normalize) and the contents of the samples can be
+    changed; samples cannot be added or removed.
+
+    The summaries (normalize, getParameters, getHypars) run over blocks of
+    rows, each of at most MAXBATCH floats, which are plain slices of the file.
+    So the parlists are never copied into memory as a whole.
+
+    Attributes
+    ----------
+    filename : str
+        name of the file
+
+    Author       Do Kester.
+
+    """
+    def __init__( self, filename, model, fitIndex=None, ndata=1 ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        filename : str
+            name of a file as written by SampleFile
+        model : Model
+            the model used for the samples
+        fitIndex : array_like
+            list of indices in parlist that need fitting
+        ndata : int
+            length of the data vector; to be used in stdev calculations
+
+        """
+        list.__init__( self )
+        records = numpy.load( filename, mmap_mode="r+" )
+        self.filename = filename
+        self._heap = None
+        self._reservoir = None
+        self._records = records
+        self._parlist = records["parlist"]
+        self._npar = records["npar"]
+        self._logL = records["logL"]
+        self._logW = records["logW"]
+        self._id = records["id"]
+        self._parent = records["parent"]
+        self._rows = numpy.arange( len( records ) )
+        self._model = model
+        self._fitIndex = fitIndex
+        self._count = len( records )
+        self.iteration = 0
+        self.logZ = 0.0
+        self.info = 0.0
+        self.maxLikelihoodIndex = -1            # always the last one
+        self.normalized = False
+        self.ndata = ndata
+
+    def __len__( self ) :
+        return len( self._rows )
+
+    def __getitem__( self, k ) :
+        """ Return a view on the k-th sample, or a list of views for a slice. """
+        if isinstance( k, slice ) :
+            return [self.getSample( r ) for r in range( *k.indices( len( self ) ) )]
+        if k < 0 :
+            k += len( self )
+        if k < 0 or k >= len( self ) :
+            raise IndexError( "MappedSampleList index out of range" )
+        return self.getSample( k )
+
+    def __iter__( self ) :
+        for k in range( len( self ) ) :
+            yield self.getSample( k )
+
+    def getSample( self, row ):
+        """ Return a Sample that is a view on row in the file. """
+        sample = Sample.__new__( Sample )
+        sample.__dict__.update( {"model" : self._model, "_store" : self, "_row" : row} )
+        if self._fitIndex is not None :
+            sample.__dict__["fitIndex"] = self._fitIndex
+        return sample
+
+    def updateReservoir( self, row ):
+        """ There is no reservoir. """
+        pass
+
+    def notSupported( self, *args, **kwargs ):
+        raise TypeError( "MappedSampleList is read-only" )
+
+    append = extend = __iadd__ = __setitem__ = __delitem__ = notSupported
+    remove = pop = clear = insert = sort = reverse = weed = add = copy = notSupported
+
+    def __reduce__( self ):
+        return ( MappedSampleList, ( self.filename, self._model, self._fitIndex, self.ndata ) )
+
+    def flush( self ):
+        """ Write changes back to the file. """
+        self._records.flush()
+
+    def getNumberOfParametersEvolution( self ):
+        """ Return the evolution of the number of parameters.  """
+        return numpy.full( len( self ), self._model.npchain, dtype=int )
+
+    def getBlocks( self ):
+        """ Return slices of the rows, each of at most MAXBATCH floats of parlists. """
+        nrow = max( 1, self.MAXBATCH // max( 1, self._parlist.shape[1] ) )
+        return [slice( k, min( k + nrow, len( self ) ) ) for k in range( 0, len( self ), nrow )]
+
+    def normalize( self ):
+        """
+        Normalize the samplelist, block by block.
+        make Sum( weight ) = 1
+        """
+        self.normalized = True
+        blocks = self.getBlocks()
+        lmax = max( numpy.max( self._logW[blk] ) for blk in blocks )
+        lswt = math.log( sum( numpy.sum( numpy.exp( self._logW[blk] - lmax ) ) for blk in blocks ) )
+        for blk in blocks :
+            self._logW[blk] -= lmax + lswt
+
+    def getParameters( self ):
+        """
+        Calculate the average of the parameters and the standard deviations,
+        block by block.
+
+        Return
+        ------
+            The average values of the parameters.
+        """
+        param, sumsq = self.sumBlocks( 0, self._model.npchain )
+        self.parameters = param
+        self.stdevs = numpy.sqrt( sumsq - param * param )
+        return self.parameters
+
+    def getHypars( self ) :
+        """
+        Return the super parameters, averaged block by block.
+        """
+        hypar, sumsq = self.sumBlocks( self._model.npchain, int( numpy.max( self._npar ) ) )
+        self.stdevHypars = numpy.sqrt( ( sumsq - hypar * hypar ) / self.ndata )
+        self.hypars = hypar
+        return self.hypars
+
+    def sumBlocks( self, start, stop ):
+        """
+        Return the weighted sums of the parlists[start:stop] and of their squares.
+        """
+        wsum = numpy.zeros( stop - start, dtype=float )
+        sumsq = numpy.zeros( stop - start, dtype=float )
+        for blk in self.getBlocks() :
+            wt = numpy.exp( self._logW[blk] )
+            pars = self._parlist[blk,start:stop]
+            wsum += numpy.dot( wt, pars )
+            sumsq += numpy.dot( wt, pars * pars )
+        return ( wsum, sumsq )
+
@@ -1,5 +1,6 @@
 import numpy as numpy
 from astropy import units
+import heapq
 import math
 import Tools
 from Sample import Sample
@@ -94,10 +95,32 @@ class SampleList( list ):
     normalized : bool
         True when the weights are normalized to SUM( weights ) = 1
 
+    result : numpy.array
+        The average result of the model(s), as calculated by average
+    error : numpy.array
+        The standard deviations of the results of the model(s)
+    bands : numpy.array
+        The quantiles of the results of the model(s), when requested in average
+
+    The id, parent, logL, logW and parlist of the samples are stored in
+    columns: numpy arrays that grow when samples are appended. The Samples
+    in the list are views on a row of the columns. The summaries, like
+    getParameters and normalize, operate on the columns at once.
+    A parlist obtained from a Sample in the list is a view too; it is not
+    valid anymore after the columns have grown.
+
+    The list can keep an index of its samples, ordered by logL, see makeIndex.
+    The index is updated whenever an item is replaced by list[k] = sample,
+    as Engine.setSample and copy() do.
+
 
     Author       Do Kester
 
     """
+    COLUMNS = ["id", "parent", "logL", "logW", "parlist"]
+    MINCAPACITY = 16
+    MAXBATCH = 1048576              # max number of floats in a block of results
+
     def __init__( self, model, nsamples, errdis, fitindex=None, ndata=1 ):
         """
         Default Constructor.
@@ -117,6 +140,8 @@ class SampleList( list ):
 
         """
         super( SampleList, self ).__init__( )
+        self._heap = None
+        self.initColumns( max( nsamples, self.MINCAPACITY ), 0 )
         self._count = 0
         self.iteration = 0
         self.logZ = 0.0
@@ -175,7 +200,368 @@ class SampleList( list ):
 
         return None
 
+    # ===== COLUMNS ===========================================================
+    def initColumns( self, capacity, width ):
+        """
+        Initialize empty columns.
+
+        Parameters
+        ----------
+        capacity : int
+            number of rows
+        width : int
+            length of the parlists
+        """
+        self._parlist = numpy.zeros( ( capacity, width ), dtype=float )
+        self._npar = numpy.zeros( capacity, dtype=int )
+        self._logL = numpy.zeros( capacity, dtype=float )
+        self._logW = numpy.zeros( capacity, dtype=float )
+        self._id = numpy.zeros( capacity, dtype=int )
+        self._parent = numpy.zeros( capacity, dtype=int )
+        self._version = numpy.zeros( capacity, dtype=int )
+        self._owner = [None] * capacity
+        self._free = list( range( capacity - 1, -1, -1 ) )
+        self._rows = None
+        self._reservoir = None
+        self._nversion = 0
+
+    def resizeColumns( self, capacity, width ):
+        """
+        Resize the columns to (at least) capacity rows and width parameters.
+        """
+        cap, wid = self._parlist.shape
+        if capacity <= cap and width <= wid :
+            return
+        if capacity > cap :
+            capacity = max( capacity, 2 * cap )
+        else :
+            capacity = cap
+        width = max( width, wid )
+
+        old = ( self._parlist, self._npar, self._logL, self._logW, self._id, self._parent,
+                self._version )
+        owner = self._owner
+        free = self._free
+        nversion = self._nversion
+        rows = self._rows
+        self.initColumns( capacity, width )
+        self._rows = rows                               # the rows stay the same
+        self._parlist[:cap,:wid] = old[0]
+        for col, oldcol in zip( ( self._npar, self._logL, self._logW, self._id, self._parent,
+                                  self._version ), old[1:] ) :
+            col[:cap] = oldcol
+        self._owner[:cap] = owner
+        self._free = self._free[:capacity-cap] + free
+        self._nversion = nversion
+
+    def getRows( self ):
+        """
+        Return the rows in the columns of the samples, in the order of the list.
+
+        The rows are kept in an array with room to grow; appending and
+        weeding update it in place.
+        """
+        n = len( self )
+        if self._rows is None :
+            self._rows = numpy.fromiter( ( s.__dict__["_row"] for s in list.__iter__( self ) ),
+                                         dtype=int, count=n )
+        return self._rows[:n]
+
+    def getColumnItem( self, row, name ):
+        """
+        Return the item of the named column at row.
+
+        Parameters
+        ----------
+        row : int
+            the row in the columns
+        name : str
+            one of COLUMNS
+        """
+        if name == "parlist" :
+            return self._parlist[row,:self._npar[row]]
+        elif name == "logL" :
+            return float( self._logL[row] )
+        elif name == "logW" :
+            return float( self._logW[row] )
+        elif name == "id" :
+            return int( self._id[row] )
+        else :
+            return int( self._parent[row] )
+
+    def setColumnItem( self, row, name, value ):
+        """
+        Set the item of the named column at row.
+
+        Parameters
+        ----------
+        row : int
+            the row in the columns
+        name : str
+            one of COLUMNS
+        value : float or int or array_like
+            the value to be set
+        """
+        if name == "parlist" :
+            value = numpy.asarray( value, dtype=float ).ravel()
+            npar = len( value )
+            self.resizeColumns( 0, npar )
+            self._parlist[row,:npar] = value
+            self._parlist[row,npar:] = 0.0
+            self._npar[row] = npar
+        elif name == "logL" :
+            self._logL[row] = value
+        elif name == "logW" :
+            self._logW[row] = value
+            self.updateReservoir( row )
+        elif name == "id" :
+            self._id[row] = value
+        else :
+            self._parent[row] = value
+
+    def bindSample( self, sample, row=None ):
+        """
+        Move the values of the sample into a row of the columns and make it a view.
+
+        A sample that is a view of a list already, is copied first.
+
+        Parameters
+        ----------
+        sample : Sample
+            to be bound
+        row : int or None
+            the row to be used. Default: a free row.
+
+        Returns
+        -------
+        the sample (view)
+        """
+        if "_store" in sample.__dict__ :
+            sample = sample.copy()
+        if row is None :
+            if len( self._free ) == 0 :
+                self.resizeColumns( len( self._owner ) + 1, 0 )
+            row = self._free.pop()
+        values = [sample.__dict__.pop( name ) for name in self.COLUMNS]
+        sample.__dict__["_store"] = self
+        sample.__dict__["_row"] = row
+        self._owner[row] = sample
+        for name, value in zip( self.COLUMNS, values ) :
+            self.setColumnItem( row, name, value )
+        return sample
+
+    def unbindSample( self, sample, free=True ):
+        """
+        Give the sample (view) its own values, detached from the columns.
+
+        Parameters
+        ----------
+        sample : Sample
+            to be detached
+        free : bool
+            whether to release its row
+        """
+        values = [getattr( sample, name ) for name in self.COLUMNS]
+        del sample.__dict__["_store"]
+        row = sample.__dict__.pop( "_row" )
+        for name, value in zip( self.COLUMNS, values ) :
+            sample.__dict__[name] = value.copy() if name == "parlist" else value
+        self._owner[row] = None
+        self._version[row] = -1
+        if free :
+            self._free.append( row )
+        return row
+
+    def rebuild( self, operation ):
+        """
+        Perform a list operation that reorders the samples, and rebuild the columns.
+        """
+        for sample in list.__iter__( self ) :
+            self.unbindSample( sample, free=False )
+        operation( self )
+        samples = list( list.__iter__( self ) )
+        self.initColumns( max( len( samples ), self.MINCAPACITY ), self._parlist.shape[1] )
+        for k, sample in enumerate( samples ) :
+            list.__setitem__( self, k, self.bindSample( sample ) )
+        if self._heap is not None :
+            self.makeIndex()
+
+    # ===== LIST OPERATIONS ===================================================
+    def append( self, sample ):
+        """
+        Append a sample. It becomes a view on a row of the columns.
+        """
+        sample = self.bindSample( sample )
+        super( SampleList, self ).append( sample )
+        rows = self._rows
+        if rows is not None :
+            n = len( self )
+            if n > len( rows ) :
+                rows = self._rows = numpy.append( rows, numpy.zeros( n, dtype=int ) )
+            rows[n-1] = sample.__dict__["_row"]
+
+    def extend( self, samples ):
+        """ Append the samples one by one. """
+        for sample in samples :
+            self.append( sample )
+
+    def __iadd__( self, samples ):
+        self.extend( samples )
+        return self
+
+    def __setitem__( self, k, sample ) :
+        """
+        Replace the k-th sample(s) and update the logL index when present.
+
+        The sample becomes the view on the row of the previous one, which is detached.
+        For a slice of another length than the samples, the columns are rebuilt.
+        """
+        if isinstance( k, slice ) :
+            samples = list( sample )
+            indices = range( *k.indices( len( self ) ) )
+            if len( indices ) == len( samples ) :
+                for i, smp in zip( indices, samples ) :
+                    self[i] = smp
+            elif indices.step == 1 :
+                self.rebuild( lambda lst : list.__setitem__( lst, k, samples ) )
+            else :
+                raise ValueError( "attempt to assign sequence of size %d to extended slice of size %d" %
+                                  ( len( samples ), len( indices ) ) )
+            return
+        old = list.__getitem__( self, k )
+        if old is not sample :
+            row = self.unbindSample( old, free=False )
+            super( SampleList, self ).__setitem__( k, self.bindSample( sample, row=row ) )
+        if self._heap is not None :
+            self.updateIndex( k )
+
+    def __delitem__( self, k ):
+        """
+        Remove the k-th sample(s); k can be an int or a slice.
+        """
+        removed = list.__getitem__( self, k )
+        for sample in ( removed if isinstance( k, slice ) else [removed] ) :
+            self.unbindSample( sample )
+        super( SampleList, self ).__delitem__( k )
+        self._rows = None
+        if self._heap is not None :
+            self.makeIndex()
+
+    def remove( self, sample ):
+        """ Remove the sample (the same object) from the list. """
+        for k in range( len( self ) ) :
+            if list.__getitem__( self, k ) is sample :
+                del self[k]
+                return
+        raise ValueError( "Sample not in SampleList" )
+
+    def pop( self, k=-1 ):
+        """ Remove the k-th sample from the list and return it. """
+        sample = self[k]
+        del self[k]
+        return sample
+
+    def clear( self ):
+        del self[:]
+
+    def insert( self, k, sample ):
+        self.rebuild( lambda samples : list.insert( samples, k, sample ) )
+
+    def sort( self, key=None, reverse=False ):
+        self.rebuild( lambda samples : list.sort( samples, key=key, reverse=reverse ) )
+
+    def reverse( self ):
+        self.rebuild( list.reverse )
+
+    def __reduce__( self ):
+        """ Pickle the attributes, including the columns, and the samples. """
+        return ( _newSampleList, (), ( self.__dict__, list( self ) ) )
+
+    def __setstate__( self, state ):
+        self.__dict__.update( state[0] )
+        list.extend( self, state[1] )
+
+    # ===== RESERVOIR =========================================================
+    def updateReservoir( self, row ):
+        """
+        Enter the (new) logW at row into the reservoir heap, when present.
+
+        Every change gets a new version number; entries in the heap
+        with an older version are stale and skipped when found.
+        """
+        self._nversion += 1
+        self._version[row] = self._nversion
+        if self._reservoir is not None :
+            heapq.heappush( self._reservoir, ( self._logW[row], self._nversion, row ) )
+
+    def makeReservoir( self ):
+        """
+        Make the reservoir: a heap of the samples ordered by logW.
+        """
+        rows = self.getRows()
+        self._reservoir = list( zip( self._logW[rows].tolist(), self._version[rows].tolist(),
+                                     rows.tolist() ) )
+        heapq.heapify( self._reservoir )
+
     # ===========================================================================
+    def makeIndex( self ):
+        """
+        Make an index of the samples, ordered by logL, in the form of a heap.
+
+        The index is kept up to date for samples that are replaced by
+        list[k] = sample. Samples that are changed in place need a call to
+        updateIndex( k ). The index is removed by removeIndex().
+        """
+        self._stamp = [0] * len( self )
+        self._heap = [( logL, k, 0 ) for k,logL in enumerate( self._logL[self.getRows()].tolist() )]
+        heapq.heapify( self._heap )
+
+    def removeIndex( self ):
+        """ Remove the index. """
+        self._heap = None
+
+    def updateIndex( self, k ):
+        """
+        Enter the (new) logL of the k-th sample into the index.
+
+        The previous entry of the sample remains in the heap; it is stale and
+        it is skipped when found.
+
+        Parameters
+        ----------
+        k : int
+            the index of the sample
+        """
+        self._stamp[k] += 1
+        heapq.heappush( self._heap, ( self[k].logL, k, self._stamp[k] ) )
+
+    def getWorst( self, nworst ):
+        """
+        Return the indices of the nworst samples with the lowest logL,
+        in order worse to better. Equal logLs are ordered by index.
+
+        The index is made when not present. It is not changed by this method.
+
+        Parameters
+        ----------
+        nworst : int
+            number of indices to return
+        """
+        if self._heap is None :
+            self.makeIndex()
+        elif len( self._heap ) > 4 * len( self ) :
+            self.makeIndex()                      # remove stale entries
+
+        heap = self._heap
+        found = []
+        while len( found ) < nworst :
+            entry = heapq.heappop( heap )
+            if entry[2] == self._stamp[entry[1]] :
+                found += [entry]
+        for entry in found :
+            heapq.heappush( heap, entry )
+        return [entry[1] for entry in found]
+
     def sample( self, k, sample=None ) :
         """
         Set or return the k-th sample from the list.
@@ -207,8 +593,8 @@ class SampleList( list ):
 
         lswt = math.log( numpy.sum( numpy.exp( lwev ) ) )
 
-        for sample in self :
-            sample.logW -= ( lmax + lswt )
+        self._logW[self.getRows()] -= ( lmax + lswt )
+        self._reservoir = None
 
 
 # TBC why is the logZ in this ???
@@ -250,29 +636,86 @@ class SampleList( list ):
         self[des] = self[src].copy()
         self[des].id = id
 
+    def snapshot( self ):
+        """
+        Return a copy of the list, as it is now.
+
+        The columns are copied; the samples of the copy are views on them.
+        They point to the same instances of the models. The copy has no
+        logL index and no reservoir.
+        """
+        snap = _newSampleList()
+        snap.__dict__.update( self.__dict__ )
+        for name in ["_parlist", "_npar", "_logL", "_logW", "_id", "_parent", "_version"] :
+            snap.__dict__[name] = self.__dict__[name].copy()
+        snap._owner = [None] * len( self._owner )
+        snap._free = list( self._free )
+        snap._rows = None
+        snap._reservoir = None
+        snap._heap = None
+        for sample in list.__iter__( self ) :
+            view = Sample.__new__( Sample )
+            view.__dict__.update( sample.__dict__ )
+            view.__dict__["_store"] = snap
+            snap._owner[view.__dict__["_row"]] = view
+            list.append( snap, view )
+        return snap
+
     def weed( self, maxsize=None ):
         """
         Weed superfluous samples.
 
-        If MaxSamples has been set, it is checked whether the size of the
-        SampleList exceeds the maximum. If so the Sample with the smallest
-        log( Weight ) is removed.
-        weed( ) is called recursively until the size has the required length.
+        If maxsize is given, it is checked whether the size of the
+        SampleList exceeds the maximum. If so the Samples with the smallest
+        log( Weight ) are removed until the size is maxsize.
+        Of equal log( Weight )s the oldest one is removed.
+
+        The samples are kept in a reservoir, a heap ordered by logW, which
+        is made at the first call. Finding a sample to remove takes O( log( n ) ).
+        Removing it from the list and from the rows is still O( n ), but only
+        as a memory move; more samples in one call are removed in a single pass.
+
+        Parameters
+        ----------
+        maxsize : None or int
+            maximum size of the list
 
         """
         if maxsize is None or len( self ) <= maxsize :
             return
 
-        minw = self[0].logW
-        mink = 0
-        for k in range( len( self ) ) :
-            if self[k].logW < minw :
-                mink = k
-                minw = self[k].logW
-        self.remove( self[mink] )
-
-        #  continue until size <= max
-        self.weed( maxsize )
+        if self._reservoir is None :
+            self.makeReservoir()
+
+        heap = self._reservoir
+        evict = []
+        while len( evict ) < len( self ) - maxsize :
+            logw, version, row = heapq.heappop( heap )
+            if version != self._version[row] :
+                continue                                # stale entry
+            evict += [row]
+
+        n = len( self )
+        rows = self.getRows()
+        samples = [self._owner[row] for row in evict]
+        if len( evict ) == 1 :
+            k = int( numpy.argmax( rows == evict[0] ) )  # its position in the list
+            list.__delitem__( self, k )
+            rows[k:n-1] = rows[k+1:n].copy()
+        else :
+            dead = numpy.zeros( len( self._owner ), dtype=bool )
+            dead[evict] = True
+            keep = ~dead[rows]
+            list.__setitem__( self, slice( None ), [s for s, kp in zip( list.__iter__( self ), keep )
+                                                   if kp] )
+            self._rows = rows[keep]
+        for sample in samples :
+            self.unbindSample( sample )
+
+        if len( heap ) > 4 * len( self ) :
+            self.makeReservoir()                        # remove stale entries
+        if self._heap is not None :
+            self.makeIndex()
 
     def logPlus( self, x, y ):
         return numpy.logaddexp( x, y )
@@ -294,15 +737,12 @@ class SampleList( list ):
 
         """
         np = self[0].model.npchain
-        param = numpy.zeros( np, dtype=float )
-        stdev = numpy.zeros( np, dtype=float )
-        for sample in self :
-            if sample.model.npchain != np :
-                raise ValueError( "Models with different " + "numbers of parameters: Cannot average" )
-            wt = math.exp( sample.logW )
-            wp = wt * sample.parameters
-            param = param + wp
-            stdev = stdev + wp * sample.parameters
+        if numpy.any( self.getNumberOfParametersEvolution() != np ) :
+            raise ValueError( "Models with different " + "numbers of parameters: Cannot average" )
+        wt = self.getWeightEvolution()
+        pars = self._parlist[self.getRows(),:np]
+        param = numpy.dot( wt, pars )
+        stdev = numpy.dot( wt, pars * pars )
         stdev = numpy.sqrt( stdev - param * param )
         self.parameters = param
         self.stdevs = stdev
@@ -313,29 +753,18 @@ class SampleList( list ):
         """
         Return the super parameters
         """
-        hypar = 0.0
-        hydev = 0.0
-        sw = 0.0
-        for sample in self :
-            wt = math.exp( sample.logW )
-            sw += wt
-            ws = wt * sample.hypars
-            hypar += ws
-            hydev += ws * sample.hypars
+        wt = self.getWeightEvolution()
+        hypars = self.getScaleEvolution()
+        hypar = numpy.dot( wt, hypars )
+        hydev = numpy.dot( wt, hypars * hypars )
         self.stdevHypars = numpy.sqrt( ( hydev - hypar * hypar ) / self.ndata )
         self.hypars = hypar
         return self.hypars
 
     # ===== MEDIAN ===========================================================
     def getMedianIndex( self ) :
-        sum = 0.0
-        k = 0
-        for sample in self :
-            sum += math.exp( sample.logW )
-            if sum < 0.5 :
-                k += 1
-            else :
-                break
+        cumwgt = numpy.cumsum( self.getWeightEvolution() )
+        k = int( numpy.searchsorted( cumwgt, 0.5 ) )
         self.medianIndex = k
         return self.medianIndex
 
@@ -363,13 +792,11 @@ class SampleList( list ):
             the parameter to be selected. Default: all
 
         """
-        pe = []
-        for sample in self :
-            pe += [sample.parameters]
+        pe = self._parlist[self.getRows(),:self.getMaximumNumberOfParameters()]
         if kpar is None :
-            return numpy.asarray( pe )
+            return pe
         else :
-            return numpy.asarray( pe )[:,kpar]
+            return pe[:,kpar]
 
     def getNumberOfParametersEvolution( self ):
         """ Return the evolution of the number of parameters.  """
@@ -378,13 +805,13 @@ class SampleList( list ):
 
     def getScaleEvolution( self ):
         """ Return the evolution of the scale.  """
-        pe = [sample.hypars for sample in self]
-        return numpy.asarray( pe )
+        np = self.getMaximumNumberOfParameters()
+        rows = self.getRows()
+        return self._parlist[rows,np:numpy.max( self._npar[rows] )]
 
     def getLogLikelihoodEvolution( self ):
         """ Return the evolution of the log( Likelihood ).  """
-        pe = [sample.logL for sample in self]
-        return numpy.asarray( pe )
+        return self._logL[self.getRows()]
 
     def getLogWeightEvolution( self ):
         """
@@ -394,8 +821,7 @@ class SampleList( list ):
         @see #getWeightEvolution( ).
 
         """
-        pe = [sample.logW for sample in self]
-        return numpy.asarray( pe )
+        return self._logW[self.getRows()]
 
     def getWeightEvolution( self ):
         """
@@ -408,63 +834,177 @@ class SampleList( list ):
 
     def getParentEvolution( self ):
         """ Return the evolution of the parentage.  """
-        pe = []
-        for sample in self :
-            pe += [sample.parent]
-        return numpy.asarray( pe )
+        return self._parent[self.getRows()]
 
     def getGeneration( self ):
         """ Return the generation number pertaining to the evolution.  """
-        pe = []
-        for sample in self :
-            pe += [sample.id]
-        return numpy.asarray( pe )
+        return self._id[self.getRows()]
 
     def getLowLogL( self ):
         """
         Return the lowest value of logL in the samplelist, plus its index.
         """
-        low = self[0].logL
-        klo = 0
-        k = 0
-        for sample in self :
-            if sample.logL < low :
-                klo = k
-                low = sample.logL
-            k += 1
-        return ( low, klo )
+        logl = self.getLogLikelihoodEvolution()
+        klo = int( numpy.argmin( logl ) )
+        return ( float( logl[klo] ), klo )
+
+    def setEvolution( self, parlists=None, logL=None, logW=None ):
+        """
+        Set the parlists, logLs and/or logWs of all samples at once.
+
+        Parameters
+        ----------
+        parlists : None or array_like of shape (len( self ), npar)
+            the parlists for the samples (all of the same length)
+        logL : None or array_like
+            the log( Likelihood )s for the samples
+        logW : None or array_like
+            the log( weight )s for the samples
+        """
+        rows = self.getRows()
+        if parlists is not None :
+            parlists = numpy.asarray( parlists, dtype=float )
+            npar = parlists.shape[1]
+            self.resizeColumns( 0, npar )
+            self._parlist[rows,:npar] = parlists
+            self._parlist[rows,npar:] = 0.0
+            self._npar[rows] = npar
+        if logL is not None :
+            self._logL[rows] = logL
+        if logW is not None :
+            self._logW[rows] = logW
+            self._reservoir = None
+        if self._heap is not None :
+            self.makeIndex()
 
 
     # ===== AVERAGE RESULTS ===================================================
-    def average( self, xdata ):
+    def average( self, xdata, quantiles=None ):
         """
         Return the (weighted) average result of the model(s) over the samples.
 
+        The results of the samples are calculated in blocks of at most
+        MAXBATCH floats. The weighted mean and variance are accumulated over
+        the blocks with the (numerically stable) pairwise update of Chan et al.
+        The standard deviation is kept in the attribute error.
+
+        When quantiles are given, the weighted quantiles of the results are
+        calculated in the same pass and kept in the attribute bands.
+        When the results of all samples do not fit in MAXBATCH floats,
+        the quantiles are taken from a systematic resample (by weight)
+        of the samples, that does fit.
+
         Parameters
         ----------
         xdata : array_like
             the input
+        quantiles : None or array_like
+            probabilities (between 0 and 1) of the quantile bands
 
         """
-        result = numpy.zeros_like( xdata, dtype=float )
-        error = numpy.zeros_like( xdata, dtype=float )
-        sumwgt = 0
-        for sample in self :
-            yfit = sample.model.result( xdata, sample.parameters )
-            wgt = math.exp( sample.logW )
-            yw = yfit * wgt
-            result += yw
-            error  += yw * yfit
-            sumwgt += wgt
+        nx = Tools.length( xdata )
+        nsamp = len( self )
+        wgt = self.getWeightEvolution()
+        nrow = max( 1, self.MAXBATCH // max( 1, nx ) )
+
+        if quantiles is not None :
+            if nsamp <= nrow :
+                keep = numpy.arange( nsamp )
+                kwgt = wgt
+            else :
+                cumw = numpy.cumsum( wgt )
+                draw = ( numpy.arange( nrow ) + 0.5 ) * ( cumw[-1] / nrow )
+                keep, kwgt = numpy.unique( numpy.minimum( numpy.searchsorted( cumw, draw ),
+                                           nsamp - 1 ), return_counts=True )
+            kept = numpy.zeros( ( len( keep ), nx ), dtype=float )
+
+        sumw = 0.0
+        result = numpy.zeros( nx, dtype=float )
+        m2 = numpy.zeros( nx, dtype=float )
+        for k in range( 0, nsamp, nrow ) :
+            yfit = self.resultBlock( xdata, k, k + nrow )
+            if quantiles is not None :
+                q = ( keep >= k ) & ( keep < k + nrow )
+                kept[q] = yfit[keep[q] - k]
+
+            w = wgt[k:k+nrow]
+            wb = numpy.sum( w )
+            if wb <= 0 :
+                continue
+            mb = numpy.dot( w, yfit ) / wb
+            delta = mb - result
+            wtot = sumw + wb
+            result += delta * ( wb / wtot )
+            yfit -= mb                                  # in place: yfit is not used anymore
+            m2 += numpy.dot( w, numpy.square( yfit, out=yfit ) ) + delta * delta * ( sumw * wb / wtot )
+            sumw = wtot
 
 #        self.error = numpy.sqrt( ( error - result * result ) / self.ndata )
-        self.error = numpy.sqrt( error - result * result )
+        self.error = numpy.sqrt( m2 / sumw ) if sumw > 0 else m2
         self.result = result
+        if quantiles is not None :
+            self.bands = self.weightedQuantiles( kept, kwgt, quantiles )
 
         return self.result
 
+    def resultBlock( self, xdata, start, stop ):
+        """
+        Return the results of the model(s) for the samples in self[start:stop].
+
+        Parameters
+        ----------
+        xdata : array_like
+            the input
+        start, stop : int
+            range of the samples
+
+        Returns
+        -------
+        array_like of shape ( len( self[start:stop] ), len( xdata ) )
+        """
+        rows = self.getRows()[start:stop]
+        model = self[0].model
+        if not model.isDynamic() :
+            return model.resultBatch( xdata, self._parlist[rows,:model.npchain] )
+
+        res = numpy.zeros( ( len( rows ), Tools.length( xdata ) ), dtype=float )
+        for k in range( len( rows ) ) :
+            sample = self[start+k]
+            res[k,:] = sample.model.result( xdata, sample.parameters )
+        return res
+
+    def weightedQuantiles( self, values, weights, quantiles ):
+        """
+        Return the weighted quantiles of the values, per column.
+
+        The quantile q is the smallest value for which the cumulative weight
+        reaches q times the total weight.
+
+        Parameters
+        ----------
+        values : array_like of shape (n, nx)
+            the values
+        weights : array_like of length n
+            the weights of the rows of values
+        quantiles : array_like
+            probabilities (between 0 and 1)
+
+        Returns
+        -------
+        array_like of shape ( len( quantiles ), nx )
+        """
+        quantiles = numpy.asarray( quantiles, dtype=float )
+        order = numpy.argsort( values, axis=0 )
+        cumw = numpy.cumsum( numpy.asarray( weights, dtype=float )[order], axis=0 )
+        bands = numpy.zeros( ( len( quantiles ), values.shape[1] ), dtype=float )
+        for k,q in enumerate( quantiles ) :
+            idx = numpy.sum( cumw < q * cumw[-1], axis=0, keepdims=True )
+            idx = numpy.minimum( idx, len( values ) - 1 )
+            bands[k,:] = numpy.take_along_axis( values, numpy.take_along_axis( order, idx, 0 ), 0 )
+        return bands
+
     # ===== MONTE CARLO ERRORS ===================================================
-    def monteCarloError( self, xdata ):
+    def monteCarloError( self, xdata, quantiles=None ):
         """
         Calculates 1-\sigma-confidence regions on the model given some inputs.
 
@@ -476,6 +1016,9 @@ class SampleList( list ):
         ----------
         xdata : array_like
            the input vectors.
+        quantiles : None or array_like
+            probabilities of quantile bands to be calculated as well.
+            They are kept in the attribute bands.
 
         Returns
         -------
@@ -483,7 +1026,13 @@ class SampleList( list ):
             standard deviations at each input point
 
         """
-        if Tools.length( xdata ) != len( self.result ):
-            self.average( xdata )
+        if ( quantiles is not None or "result" not in self.__dict__ or
+                Tools.length( xdata ) != len( self.result ) ) :
+            self.average( xdata, quantiles=quantiles )
         return self.error
 
+
+def _newSampleList( ):
+    """ Return an empty SampleList, to be filled by unpickling. """
+    return list.__new__( SampleList )
+
@@ -133,7 +133,7 @@ class ScaledErrorDistribution( ErrorDistribution ):
         else :
             return super( ScaledErrorDistribution, self ).__getattr__( name )
 
-    def getResiduals( self, model, param=None ):
+    def getResiduals( self, model, param=None, mock=None ):
         """
         Return the residuals.
         For those distributions r=that need them.
@@ -144,7 +144,28 @@ class ScaledErrorDistribution( ErrorDistribution ):
             model to be fitted
         param : array_like
             parameters of the model
+        mock : None or array_like
+            result of the model for param, when already known
 
         """
-        return self.data - model.result( self.xdata, param )
+        if mock is None :
+            mock = model.result( self.xdata, param )
+        return self.data - mock
+
+    def getResidualsBatch( self, model, params ):
+        """
+        Return the residuals for a set of parameters.
+
+        Parameters
+        ----------
+        model : Model
+            model to be fitted
+        params : array_like of shape (k, npar)
+            k lists of model parameters
+
+        Returns
+        -------
+        array_like of shape (k, ndata)
+        """
+        return self.data - self.getResultBatch( model, params )
 
@@ -85,7 +85,9 @@ class SineAmpModel( LinearModel ):
 
     def __setattr__( self, name, value ) :
         dind = {"frequency": float}
-        if not Tools.setSingleAttributes( self, name, value, dind ) :
+        if Tools.setSingleAttributes( self, name, value, dind ) :
+            self.clearDesign()
+        else :
             super( SineAmpModel, self ).__setattr__( name, value )
 
     def basePartial( self, xdata, params, parlist=None ):
@@ -57,6 +57,8 @@ class SineModel( NonLinearModel ):
 
 
     """
+    ## baseResult broadcasts over a stack of parameters
+    BATCHED = True
     TWOPI = 2 * math.pi
 
     def __init__( self, copy=None, **kwargs ):
@@ -90,8 +90,10 @@ class SineSplineModel( LinearModel ):
     def __setattr__( self, name, value ) :
         dind = {"frequency": float, "order": float, "cm": SplinesModel, "sm": SplinesModel}
         dlst = {"knots": float}
-        if not ( Tools.setListOfAttributes( self, name, value, dlst ) or
-                 Tools.setSingleAttributes( self, name, value, dind ) ) :
+        if ( Tools.setListOfAttributes( self, name, value, dlst ) or
+             Tools.setSingleAttributes( self, name, value, dind ) ) :
+            self.clearDesign()
+        else :
             super( SineSplineModel, self ).__setattr__( name, value )
 
     def basePartial( self, xdata, params, parlist=None ):
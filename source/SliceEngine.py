@@ -0,0 +1,220 @@
+import numpy as numpy
+import math
+
+from Engine import Engine
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+class SliceEngine( Engine ):
+    """
+    Move a walker by slice sampling within the lowLhood contour.
+
+    Along a line through the walker, an interval of width unitRange * size
+    is placed randomly around the walker, in unit space. The interval is
+    stepped out until both ends are outside the contour (or the unit box),
+    at most maxtrials steps at each side. Then points are drawn uniformly
+    from the interval, which is shrunk towards the walker at each point
+    outside the contour, until a point inside is found.
+
+    With direction "axes" the parameters are moved one at a time, in random
+    order; with "random" all parameters are moved along a random direction.
+
+    Attributes
+    ----------
+    direction : "axes" or "random"
+        the lines along which the walker moves
+    maxshrink : int (100)
+        maximum number of shrinkages before the move fails
+
+    Author       Do Kester.
+
+    """
+    #  *********CONSTRUCTORS***************************************************
+    def __init__( self, walkers, errdis, copy=None, seed=4213, direction="axes" ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        walkers : SampleList
+            walkers to be diffused
+        errdis : ErrorDistribution
+            error distribution to be used
+        copy : SliceEngine
+            to be copied
+        seed : int
+            for random number generator
+        direction : "axes" or "random"
+            the lines along which the walker moves
+
+        """
+        super( SliceEngine, self ).__init__( walkers, errdis, copy=copy, seed=seed )
+        if copy is None :
+            if direction not in ["axes", "random"] :
+                raise ValueError( "Unknown direction : %s" % direction )
+            self.direction = direction
+            self.maxshrink = 100
+        else :
+            self.direction = copy.direction
+            self.maxshrink = copy.maxshrink
+
+    def copy( self ):
+        """ Return copy of this.  """
+        return SliceEngine( self.walkers, self.errdis, copy=self )
+
+    def __str__( self ):
+        return str( "SliceEngine" )
+
+    #  *********EXECUTE***************************************************
+    def execute( self, walker, lowLhood, fitIndex=None ):
+        """
+        Execute the engine by diffusing the parameters.
+
+        Parameters
+        ----------
+        walker : Sample
+            walker to diffuse
+        lowLhood : float
+            lower limit in logLikelihood
+        fitIndex : array_like
+            list of the/some parameters indices to be diffused
+
+        Returns
+        -------
+        int : the number of successfull moves
+
+        """
+        if fitIndex is None :
+            fitIndex = walker.fitIndex
+        fitIndex = numpy.asarray( fitIndex, dtype=int )
+        ur = self.unitRange * ( 1 + 2.0 / len( self.walkers ) ) * self.size
+
+        if self.direction == "axes" :
+            t = 0
+            for c in self.rng.permutation( fitIndex ) :
+                t += self.sliceAxis( walker, lowLhood, c, ur[c] if c < len( ur ) else 1.0 )
+            return t
+
+        kpar = fitIndex[fitIndex < len( ur )]
+        return 1 if self.sliceRandom( walker, lowLhood, kpar, ur[kpar] ) else 0
+
+    def sliceAxis( self, walker, lowLhood, c, width ):
+        """
+        Move parameter c of the walker by slice sampling. Return 1 on success.
+
+        The logLikelihood is updated for the one parameter only.
+        """
+        model = walker.model
+        param = walker.parlist.copy()
+        save = param[c]
+        usav = self.domain2Unit( model, save, kpar=c )
+
+        def logL( u ) :
+            param[c] = self.unit2Domain( model, u, kpar=c )
+            return self.errdis.updateLogL( model, param, parval={c : save}, key=walker.id )
+
+        lo, hi = self.stepOut( logL, lowLhood, usav, width, 0.0, 1.0 )
+        return self.shrink( walker, logL, lowLhood, usav, lo, hi, param )
+
+    def sliceRandom( self, walker, lowLhood, kpar, urange ):
+        """
+        Move the parameters kpar of the walker along a random direction.
+        Return True on success.
+        """
+        model = walker.model
+        param = walker.parlist.copy()
+        usav = self.domain2Unit( model, param, kpar=kpar )
+
+        direc = self.rng.randn( len( kpar ) )
+        direc *= urange / math.sqrt( numpy.sum( direc * direc ) )
+
+        ## the line usav + t * direc stays within the unit box for tmin < t < tmax
+        with numpy.errstate( divide="ignore" ) :
+            t0 = -usav / direc
+            t1 = ( 1 - usav ) / direc
+        tmin = numpy.max( numpy.minimum( t0, t1 ) )
+        tmax = numpy.min( numpy.maximum( t0, t1 ) )
+
+        def logL( t ) :
+            param[kpar] = self.unit2Domain( model, usav + t * direc, kpar=kpar )
+            return self.errdis.logLikelihood( model, param )
+
+        lo, hi = self.stepOut( logL, lowLhood, 0.0, 1.0, tmin, tmax )
+        return self.shrink( walker, logL, lowLhood, 0.0, lo, hi, param ) > 0
+
+    def stepOut( self, logL, lowLhood, x0, width, xmin, xmax ):
+        """
+        Return an interval around x0 with both ends outside the contour.
+
+        Parameters
+        ----------
+        logL : callable
+            logL( x ) returns the log likelihood at position x on the line
+        lowLhood : float
+            lower limit in logLikelihood
+        x0 : float
+            present position
+        width : float
+            initial width of the interval
+        xmin, xmax : float
+            limits of the line (within the unit box)
+        """
+        lo = x0 - width * self.rng.rand()
+        hi = lo + width
+        k = 0
+        while lo > xmin and k < self.maxtrials :
+            self.reportReject()
+            if logL( lo ) < lowLhood :
+                break
+            lo -= width
+            k += 1
+        k = 0
+        while hi < xmax and k < self.maxtrials :
+            self.reportReject()
+            if logL( hi ) < lowLhood :
+                break
+            hi += width
+            k += 1
+        return ( max( lo, xmin ), min( hi, xmax ) )
+
+    def shrink( self, walker, logL, lowLhood, x0, lo, hi, param ):
+        """
+        Draw points in [lo,hi] until one is inside the contour; shrink the
+        interval at each point outside. Return 1 on success, 0 on failure.
+        """
+        for k in range( self.maxshrink ) :
+            x = lo + ( hi - lo ) * self.rng.rand()
+            Ltry = logL( x )
+            if Ltry >= lowLhood :
+                self.reportSuccess()
+                self.setSample( walker, walker.model, param, Ltry )
+                return 1
+            self.reportReject()
+            if x < x0 :
+                lo = x
+            else :
+                hi = x
+        self.reportFailed()
+        return 0
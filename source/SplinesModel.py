@@ -147,7 +147,7 @@ class SplinesModel( LinearModel ):
         dind = {'order': int }
         if ( Tools.setListOfAttributes( self, name, value, dlst ) or
              Tools.setSingleAttributes( self, name, value, dind ) ):
-            pass
+            self.clearDesign()
         else :
             super( SplinesModel, self ).__setattr__( name, value )
 
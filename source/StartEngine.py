@@ -93,3 +93,42 @@ class StartEngine( Engine ):
         return len( fitIndex )
 
 
+
+    def executeAll( self, lowLhood, fitIndex=None ):
+        """
+        Execute the engine on all walkers at once.
+
+        The unit values of all walkers are drawn as one (nwalkers, nfit)
+        matrix, converted to the domain in one call, and the logLikelihoods
+        are calculated in batches. The results are written into the walkers
+        in bulk. Walkers with different models (dynamic models) are done one
+        by one.
+
+        Parameters
+        ----------
+        lowLhood : float
+            lower limit in logLikelihood
+        fitIndex : array_like
+            list of parameter indices
+        Returns
+        -------
+        int : the number of successfull moves
+
+        """
+        walkers = self.walkers
+        model = walkers[0].model
+        if fitIndex is None :
+            fitIndex = walkers[0].fitIndex
+        if model.isDynamic() or any( w.model is not model for w in walkers ) :
+            return sum( self.execute( w, lowLhood, fitIndex=fitIndex ) for w in walkers )
+
+        fitIndex = numpy.asarray( fitIndex, dtype=int )
+        parlists = numpy.asarray( [w.parlist for w in walkers], dtype=float )
+        uval = self.rng.rand( len( walkers ), len( fitIndex ) )
+        parlists[:,fitIndex] = self.unit2Domain( model, uval, kpar=fitIndex )
+
+        logL = self.errdis.logLikelihoodBatch( model, parlists )
+        walkers.setEvolution( parlists=parlists, logL=logL,
+                              logW=numpy.full( len( walkers ), -math.inf ) )
+
+        return len( walkers ) * len( fitIndex )
@@ -36,7 +36,10 @@ class StepEngine( Engine ):
     Move a a walker in a random direction.
 
     The StepEngine tries to move a selection of the parameters
-    in a random order.
+    in a random order. The steps are scaled with the size, which can be
+    adapted to a target acceptance rate. See Engine.adaptSize.
+    By default there is no adaptation: as the engine makes only one move per
+    call, small steps decorrelate the walkers too little.
 
     Author       Do Kester.
 
@@ -97,6 +100,7 @@ class StepEngine( Engine ):
         urange = self.unitRange[fitIndex]
         dur = urange / nm
         urange += 2 * dur
+        urange *= self.size
 
         param = walker.parlist
         usav = self.domain2Unit( model, param, kpar=fitIndex )
@@ -122,7 +126,7 @@ class StepEngine( Engine ):
                 else :
                     break
 
-            ptry[fitIndex] = self.unit2Domain( model, utry,  )
+            ptry[fitIndex] = self.unit2Domain( model, utry, kpar=fitIndex )
 
             Ltry = self.errdis.logLikelihood( model, ptry )
             if Ltry >= lowLhood:
@@ -0,0 +1,252 @@
+import numpy as numpy
+import os
+
+from Sample import Sample
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *    2017        Do Kester
+
+class StopStart( object ):
+    """
+    StopStart saves the state of a NestedSampler at regular intervals,
+    such that an interrupted run can be restarted from the last save.
+
+    The state consists of the walkers, the samples, logZ, info, the iteration,
+    the states of the engines and of the allocation of the engines by the
+    Explorer, and the states of the random number generators.
+    It is written to a (numpy .npz) binary file. A new save is first written
+    to a temporary file which then replaces the old one, so that a crash
+    during the save never destroys the previous one.
+
+    A restarted run continues exactly where the saved run left off.
+
+    Example
+    -------
+    >>> ns = NestedSampler( x, model, y )
+    >>> ns.restart = StopStart( "mysampler.npz", interval=500 )
+    >>> ns.sample()                 # restarts from mysampler.npz when present
+
+    Attributes
+    ----------
+    filename : str
+        name of the file to save to and restore from
+    interval : int (100)
+        number of iterations between saves
+    save : bool (True)
+        whether to save at all
+    restore : bool (True)
+        whether to restore when the file is present
+
+    Author       Do Kester.
+
+    """
+    #  *********CONSTRUCTORS***************************************************
+    def __init__( self, filename, interval=100, save=True, restore=True ):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        filename : str
+            name of the file to save to and restore from
+        interval : int
+            number of iterations between saves
+        save : bool
+            whether to save
+        restore : bool
+            whether to restore from a file, if present
+
+        """
+        if interval < 1 :
+            raise ValueError( "Save interval must be positive" )
+        self.filename = filename
+        self.interval = interval
+        self.doSave = save
+        self.doRestore = restore
+        self.explorerState = {}
+
+    def __str__( self ) :
+        return str( "StopStart on %s every %d iterations" % ( self.filename, self.interval ) )
+
+    #  *********SAVE***************************************************
+    def wantSave( self, iteration ):
+        """
+        Return True when a save is due at this iteration.
+
+        Parameters
+        ----------
+        iteration : int
+            the present iteration of the sampler
+        """
+        return self.doSave and iteration % self.interval == 0
+
+    def save( self, sampler ):
+        """
+        Save the state of the sampler.
+
+        Parameters
+        ----------
+        sampler : NestedSampler
+            the sampler to be saved
+        """
+        state = {"iteration" : numpy.asarray( sampler.iteration ),
+                 "logZ" : numpy.asarray( sampler.logZ ),
+                 "info" : numpy.asarray( sampler.info ),
+                 "ncalls" : numpy.asarray( sampler.distribution.ncalls ),
+                 "nparts" : numpy.asarray( sampler.distribution.nparts ),
+                 "nengines" : numpy.asarray( len( sampler.engines ) ) }
+
+        self.getSamples( state, "walkers", sampler.walkers )
+        self.getSamples( state, "samples", sampler.samples )
+        self.getRng( state, "rng", sampler.rng )
+        for k,engine in enumerate( sampler.engines ) :
+            self.getRng( state, "engine%d_rng" % k, engine.rng )
+            for key,value in engine.getState().items() :
+                state["engine%d_%s" % ( k, key )] = value
+        if sampler.explorer is not None :
+            for key,value in sampler.explorer.getState().items() :
+                state["explorer_%s" % key] = value
+
+        tmpname = self.filename + ".tmp"
+        with open( tmpname, "wb" ) as fp :
+            numpy.savez( fp, **state )
+            fp.flush()
+            os.fsync( fp.fileno() )
+        os.replace( tmpname, self.filename )
+
+    #  *********RESTORE***************************************************
+    def wantRestore( self ):
+        """ Return True when there is a file to restore from. """
+        return self.doRestore and os.path.isfile( self.filename )
+
+    def restore( self, sampler ):
+        """
+        Restore the state of the sampler from the file.
+
+        The walkers are updated in place; the samples are replaced.
+
+        Parameters
+        ----------
+        sampler : NestedSampler
+            the sampler to be restored
+
+        Raises
+        ------
+        ValueError when the saved state does not fit the sampler.
+        """
+        with numpy.load( self.filename, allow_pickle=False ) as fp :
+            state = {key : fp[key] for key in fp.files}
+
+        if ( len( state["walkers_logL"] ) != len( sampler.walkers ) or
+             int( state["nengines"] ) != len( sampler.engines ) ) :
+            raise ValueError( "Saved state in %s does not fit the sampler" % self.filename )
+
+        sampler.iteration = int( state["iteration"] )
+        sampler.logZ = float( state["logZ"] )
+        sampler.info = float( state["info"] )
+        sampler.distribution.ncalls = int( state["ncalls"] )
+        sampler.distribution.nparts = int( state["nparts"] )
+
+        template = sampler.walkers[0]
+        self.putSamples( state, "walkers", sampler.walkers, template )
+        self.putSamples( state, "samples", sampler.samples, template )
+        self.putRng( state, "rng", sampler.rng )
+        for k,engine in enumerate( sampler.engines ) :
+            self.putRng( state, "engine%d_rng" % k, engine.rng )
+            prefix = "engine%d_" % k
+            engine.setState( {key[len( prefix ):] : value for key,value in state.items()
+                              if key.startswith( prefix ) and "_rng_" not in key} )
+        self.explorerState = {key[9:] : value for key,value in state.items()
+                              if key.startswith( "explorer_" )}
+
+    def restoreExplorer( self, explorer ):
+        """
+        Restore the allocation of the engines into the Explorer of a restored sampler.
+
+        The Explorer is made after the restore, so its state is kept until now.
+
+        Parameters
+        ----------
+        explorer : Explorer
+            the explorer of the restored sampler
+        """
+        if len( self.explorerState ) > 0 :
+            explorer.setState( self.explorerState )
+
+    #  *********HELPERS***************************************************
+    def getSamples( self, state, name, samples ):
+        """
+        Store the contents of a SampleList into the state.
+
+        The values are taken from the columns of the SampleList at once.
+        """
+        rows = samples.getRows()
+        npar = samples._npar[rows]
+        state[name + "_parlist"] = samples._parlist[rows,:numpy.max( npar, initial=0 )]
+        state[name + "_npar"] = npar
+        state[name + "_logL"] = samples._logL[rows]
+        state[name + "_logW"] = samples._logW[rows]
+        state[name + "_id"] = samples._id[rows]
+        state[name + "_parent"] = samples._parent[rows]
+        state[name + "_count"] = numpy.asarray( samples._count )
+
+    def putSamples( self, state, name, samples, template ):
+        """
+        Put the samples from the state into the SampleList.
+
+        Existing samples are updated in place; missing ones are appended as
+        copies of the template and superfluous ones are removed.
+        """
+        parlist = state[name + "_parlist"]
+        nsamp = len( state[name + "_logL"] )
+        npar = state.get( name + "_npar", numpy.full( nsamp, parlist.shape[-1] ) )
+        del samples[nsamp:]
+        while len( samples ) < nsamp :
+            samples.append( template.copy() )
+
+        for k,sample in enumerate( samples ) :
+            sample.parlist = parlist[k,:npar[k]].copy()
+            sample.logL = float( state[name + "_logL"][k] )
+            sample.logW = float( state[name + "_logW"][k] )
+            sample.id = int( state[name + "_id"][k] )
+            sample.parent = int( state[name + "_parent"][k] )
+        samples._count = int( state[name + "_count"] )
+
+    def getRng( self, state, name, rng ):
+        """
+        Store the state of a numpy.random.RandomState into the state.
+        """
+        kind, keys, pos, hasGauss, cached = rng.get_state()
+        state[name + "_keys"] = keys
+        state[name + "_pos"] = numpy.asarray( pos )
+        state[name + "_gauss"] = numpy.asarray( [hasGauss, cached], dtype=float )
+
+    def putRng( self, state, name, rng ):
+        """
+        Restore (in place) a numpy.random.RandomState from the state.
+        """
+        gauss = state[name + "_gauss"]
+        rng.set_state( ( "MT19937", state[name + "_keys"], int( state[name + "_pos"] ),
+                         int( gauss[0] ), float( gauss[1] ) ) )
+
@@ -123,7 +123,7 @@ class SurfaceSplinesModel( LinearModel ):
         done = {'knots': list }
         if ( Tools.setListOfAttributes( self, name, value, dlst ) or
              Tools.setSingleAttributes( self, name, value, done ) ) :
-            pass
+            self.clearDesign()
         else :
             super( SurfaceSplinesModel, self ).__setattr__( name, value )
 
@@ -178,6 +178,12 @@ def isList( item, cls ) :
     """
 #    print( item, cls, item.__class__ )
     if isInstance( item, cls ) : return (True,False)
+    if isinstance( item, numpy.ndarray ) and item.dtype.kind != "O" :
+        ## all elements have the type of the array: check it once
+        dtype = item.dtype.type
+        islst = ( item.size == 0 or issubclass( dtype, cls ) or
+                  ( ( cls is int or cls is float ) and issubclass( dtype, numpy.integer ) ) )
+        return (islst,islst)
     islst = isinstance( item, list ) or isinstance( item, numpy.ndarray )
     if islst :
         for i in numpy.asarray( item ).flat :
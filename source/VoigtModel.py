@@ -1,5 +1,8 @@
 import numpy as numpy
 import math
+from scipy import special
+
+import Tools
 from NonLinearModel import NonLinearModel
 from LorentzModel import LorentzModel
 
@@ -43,6 +46,14 @@ class VoigtModel( NonLinearModel ):
     These are initialised to [1, 0, 1, 1].
     Parameters 2 & 3 ( widths ) is always kept positive ( >=0 ).
 
+    The result is calculated from the real part of the Faddeeva function,
+    w( z ) = exp( -z^2 ) erfc( -iz ), with z = x + iy, as in
+
+        f( x:p ) = p_0 * Re( w( z ) ) / Re( w( iy ) )
+
+    where x = ( x - p_1 ) * sqrt( ln 2 ) / p_2 and y = p_3 * sqrt( ln 2 ) / p_2.
+    The partials follow from the derivative w'( z ) = 2i / sqrt( pi ) - 2z w( z ).
+
     Examples
     --------
     >>> voigt = VoigtModel( )
@@ -62,6 +73,7 @@ class VoigtModel( NonLinearModel ):
     T = [0.31424038, 0.94778839, 1.5976826, 2.2795071, 3.0206370, 3.8897249]
     LN2 = math.log( 2.0 )
     SRLN2 = math.sqrt( LN2 )
+    TRTPI = 2.0 / math.sqrt( math.pi )
 
     def __init__( self, copy=None, **kwargs ):
         """
@@ -107,6 +119,95 @@ class VoigtModel( NonLinearModel ):
             p = params[[0,1,3]]
             return LorentzModel( ).result( xdata, p )
 
+        s = self.SRLN2 / params[2]
+        x = ( xdata - params[1] ) * s
+        y = params[3] * s
+
+        return params[0] * special.wofz( x + 1j * y ).real / special.erfcx( y )
+
+    def basePartial( self, xdata, params, parlist=None ):
+        """
+        Returns the partials at the input value.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the partials
+        params : array_like
+            values for the parameters.
+        parlist : array_like
+            list of indices active parameters (or None for all)
+
+        """
+        partial = numpy.ndarray( ( Tools.length( xdata ), self.npbase ) )
+        if parlist is None :
+            parlist = range( self.npmax )
+
+        if params[2] == 0 :
+            ## Lorentz; its dependence on the gauss width is quadratic.
+            lpart = LorentzModel( ).basePartial( xdata, params[[0,1,3]] )
+            for k,kp in enumerate( parlist ) :
+                partial[:,k] = 0.0 if kp == 2 else lpart[:,min( kp, 2 )]
+            return partial
+
+        a = params[0]
+        s = self.SRLN2 / params[2]
+        x = ( xdata - params[1] ) * s
+        y = params[3] * s
+        z = x + 1j * y
+        w = special.wofz( z )
+        dw = self.TRTPI * 1j - 2 * z * w            # derivative of w( z )
+
+        r0 = special.erfcx( y )                     # Re( w( iy ) )
+        dr0 = 2 * y * r0 - self.TRTPI               # its derivative to y
+        v = w.real / r0
+        vx = dw.real / r0                           # d v / d x
+        vy = -dw.imag / r0 - v * dr0 / r0           # d v / d y
+
+        parts = { 0 : ( lambda: v ),
+                  1 : ( lambda: -a * s * vx ),
+                  2 : ( lambda: -a * ( x * vx + y * vy ) / params[2] ),
+                  3 : ( lambda: a * s * vy ) }
+
+        for k,kp in enumerate( parlist ) :
+            partial[:,k] = parts[kp]()
+
+        return partial
+
+    def baseDerivative( self, xdata, params ) :
+        """
+        Return the derivative df/dx at each xdata (=x).
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like
+            values for the parameters.
+
+        """
+        if params[2] == 0:
+            return LorentzModel( ).baseDerivative( xdata, params[[0,1,3]] )
+
+        s = self.SRLN2 / params[2]
+        z = ( xdata - params[1] ) * s + 1j * params[3] * s
+        dw = self.TRTPI * 1j - 2 * z * special.wofz( z )
+
+        return params[0] * s * dw.real / special.erfcx( params[3] * s )
+
+    def legacyResult( self, xdata, params ):
+        """
+        Returns the result of the model function, point by point with the
+        legacy code in calculate. It is kept as a reference for baseResult.
+
+        Parameters
+        ----------
+        xdata : array_like
+            values at which to calculate the result
+        params : array_like
+            values for the parameters.
+
+        """
         rtn = numpy.zeros_like( xdata )
         x = ( xdata - params[1] ) * self.SRLN2 / params[2]
         y = self.SRLN2 * params[3] / params[2]
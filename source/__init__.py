@@ -31,6 +31,7 @@ from ConstantModel import ConstantModel
 from ConvergenceError import ConvergenceError
 from CrossEngine import CrossEngine
 from CurveFitter import CurveFitter
+from EllipsoidEngine import EllipsoidEngine
 from Engine import Engine
 from ErrorDistribution import ErrorDistribution
 from EtalonDriftModel import EtalonDriftModel
@@ -71,6 +72,7 @@ from NoiseScale import NoiseScale
 from NonLinearModel import NonLinearModel
 #from OrderEngine import OrderEngine
 from PadeModel import PadeModel
+from ParallelNestedSampler import ParallelNestedSampler
 from PoissonErrorDistribution import PoissonErrorDistribution
 from PolySineAmpModel import PolySineAmpModel
 from PolySurfaceModel import PolySurfaceModel
@@ -78,11 +80,16 @@ from PolynomialModel import PolynomialModel
 from PowerLawModel import PowerLawModel
 from PowerModel import PowerModel
 from Prior import Prior
+from PriorBank import PriorBank
 from ProductModel import ProductModel
+from ProgressMonitor import ProgressMonitor
 from QRFitter import QRFitter
 from RandomEngine import RandomEngine
+from ResultCache import ResultCache
 from RobustShell import RobustShell
 from Sample import Sample
+from SampleFile import SampleFile
+from SampleFile import MappedSampleList
 from SampleList import SampleList
 from ScaledErrorDistribution import ScaledErrorDistribution
 from ScipyFitter import ScipyFitter
@@ -103,9 +110,11 @@ from SineDriftModel import SineDriftModel
 from SineModel import SineModel
 from SineSplineDriftModel import SineSplineDriftModel
 from SineSplineModel import SineSplineModel
+from SliceEngine import SliceEngine
 from SplinesModel import SplinesModel
 from StartEngine import StartEngine
 from StepEngine import StepEngine
+from StopStart import StopStart
 from SurfaceSplinesModel import SurfaceSplinesModel
 from UniformPrior import UniformPrior
 from VoigtModel import VoigtModel
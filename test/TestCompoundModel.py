@@ -275,6 +275,86 @@ class TestCompoundModel( unittest.TestCase ):
 
         numpy.testing.assert_array_equal( m.result( x ), mc.result( x ) )
 
+    def testResultAndPartial( self ):
+        print( "  Test result and partial in one go" )
+        m = GaussModel( )
+        m.multiplyModel( PolynomialModel( 1 ) )
+        m.subtractModel( VoigtModel( ) )
+        m.divideModel( PolynomialModel( 0 ) )
+        m.addModel( GaussModel( ) )
+        p = numpy.asarray( [1,-0.2,0.3, 1.1,0.2, 0.5,0.1,0.2,0.3, 1.5, 0.3,0.4,0.5] )
+        x = numpy.linspace( -1, 1, 21 )
+
+        res, part = m.resultAndPartial( x, p )
+        self.assertTrue( part.shape == ( 21, 13 ) )
+        numpy.testing.assert_array_equal( res, m.result( x, p ) )
+        numpy.testing.assert_array_equal( part, m.partial( x, p ) )
+        numpy.testing.assert_array_almost_equal( part, m.numPartial( x, p ), 4 )
+
+        m.parameters = p
+        res, part = m.resultAndPartial( x, useNum=True )
+        numpy.testing.assert_array_equal( part, m.numPartial( x, p ) )
+
+    def testCompileChain( self ):
+        print( "  Test the evaluation plan of a chain" )
+        m = PolynomialModel( 1 )
+        m.addModel( GaussModel( ) )
+        m.subtractModel( GaussModel( ) )
+        plan = m.compileChain()
+        self.assertTrue( plan is m.compileChain() )
+        self.assertTrue( [step[1:] for step in plan] ==
+                         [( 0, 2, m.NOP ), ( 2, 5, m.ADD ), ( 5, 8, m.SUB )] )
+        self.assertTrue( m._next.compileChain()[0] == ( m._next, 0, 3, m.ADD ) )
+
+        m.multiplyModel( PolynomialModel( 0 ) )
+        self.assertFalse( plan is m.compileChain() )
+        self.assertTrue( len( m.compileChain() ) == 4 )
+        self.assertTrue( len( m._next.compileChain() ) == 3 )
+
+        p = numpy.asarray( [0.1,0.2, 1.0,0.3,0.5, 0.4,-0.3,0.2, 1.3] )
+        x = numpy.linspace( -1, 1, 21 )
+        parts = m.resultParts( x, p )
+        keep = [pt.copy() for pt in parts]
+        res = ( parts[0] + parts[1] - parts[2] ) * parts[3]
+        numpy.testing.assert_array_almost_equal( m.result( x, p ), res, 14 )
+        numpy.testing.assert_array_almost_equal( m.combineParts( parts ), res, 14 )
+        ## the results of the components are not overwritten
+        for pt, kp in zip( parts, keep ) :
+            numpy.testing.assert_array_equal( pt, kp )
+
+    def testBatch( self ):
+        print( "  Test results and partials for a stack of parameters" )
+        m = PolynomialModel( 1 )
+        m.addModel( GaussModel( ) )
+        m.multiplyModel( VoigtModel( ) )
+        m.divideModel( GaussModel( fixed={1:0.0} ) )
+        self.assertTrue( GaussModel.BATCHED and PolynomialModel.BATCHED )
+        self.assertFalse( VoigtModel.BATCHED )
+
+        x = numpy.linspace( -1, 1, 21 )
+        numpy.random.seed( 5 )
+        pp = 0.5 + numpy.random.rand( 4, m.npchain )
+        res = m.resultBatch( x, pp )
+        part = m.partialBatch( x, pp )
+        self.assertTrue( res.shape == ( 4, 21 ) )
+        self.assertTrue( part.shape == ( 4, 21, m.npchain ) )
+        for k,p in enumerate( pp ) :
+            numpy.testing.assert_array_almost_equal( res[k], m.result( x, p ), 14 )
+            numpy.testing.assert_array_almost_equal( part[k], m.partial( x, p ), 14 )
+
+        ## more than fit in one chunk
+        Model.BATCHSIZE = 50
+        try :
+            numpy.testing.assert_array_equal( m.resultBatch( x, pp ), res )
+        finally :
+            Model.BATCHSIZE = 65536
+
+        g = GaussModel( )
+        pp = numpy.asarray( [[1.0, 0.0, -0.5], [1.0, 0.0, 0.5]] )
+        res = g.resultBatch( x, pp )
+        self.assertTrue( pp[0,2] == 0.5 )
+        numpy.testing.assert_array_equal( res[0], res[1] )
+
     def suite( cls ):
         return unittest.TestCase.suite( CompoundModelTest.__class__ )
 
@@ -5,6 +5,7 @@ import numpy as numpy
 from astropy import units
 import math
 import Tools
+from numpy.testing import assert_array_almost_equal as assertAAE
 import matplotlib.pyplot as plt
 
 from PolynomialModel import PolynomialModel
@@ -15,6 +16,9 @@ from GibbsEngine import GibbsEngine
 from StepEngine import StepEngine
 #from CrossEngine import CrossEngine
 from GalileanEngine import GalileanEngine
+from EllipsoidEngine import EllipsoidEngine
+from EllipsoidEngine import Ellipsoid
+from SliceEngine import SliceEngine
 from GaussErrorDistribution import GaussErrorDistribution
 from SampleList import SampleList
 from UniformPrior import UniformPrior
@@ -113,6 +117,120 @@ class TestEngine2( unittest.TestCase ):
         print( "\n   Galilean Engine Test\n" )
         self.stdenginetest( GalileanEngine, iter=400, nsamp=10, plot=plot )
 
+    def testEllipsoidEngine( self, plot=False ):
+        print( "\n   Ellipsoid Engine Test\n" )
+        self.stdenginetest( EllipsoidEngine, iter=200, nsamp=10, plot=plot )
+
+    def testSliceEngine( self, plot=False ):
+        print( "\n   Slice Engine Test\n" )
+        self.stdenginetest( SliceEngine, iter=200, nsamp=10, plot=plot )
+
+    def testSliceRandom( self ):
+        print( "\n   Slice Engine random direction Test\n" )
+
+        class RandomSliceEngine( SliceEngine ):
+            def __init__( self, walkers, errdis, copy=None, seed=4213 ):
+                super( RandomSliceEngine, self ).__init__( walkers, errdis, copy=copy,
+                            seed=seed, direction="random" )
+
+        self.stdenginetest( RandomSliceEngine, iter=200, nsamp=10 )
+
+        m, xdata, data = self.initEngine()
+        errdis = GaussErrorDistribution( xdata, data, scale=0.5 )
+        sl = SampleList( m, 10, errdis )
+        with self.assertRaises( ValueError ) :
+            SliceEngine( sl, errdis, direction="diagonal" )
+        self.assertEqual( RandomSliceEngine( sl, errdis ).copy().direction, "random" )
+
+    def testEllipsoids( self ):
+        print( "\n   Ellipsoids Test\n" )
+        m, xdata, data = self.initEngine()
+        errdis = GaussErrorDistribution( xdata, data, scale=0.5 )
+        sl = SampleList( m, 10, errdis )
+        engine = EllipsoidEngine( sl, errdis )
+
+        rng = numpy.random.RandomState( 5 )
+        pts = numpy.append( 0.2 + 0.05 * rng.rand( 50, 2 ), 0.7 + 0.05 * rng.rand( 50, 2 ), axis=0 )
+        ell = Ellipsoid( pts )
+        self.assertTrue( numpy.all( ell.distance( pts ) <= 1.0 + 1e-10 ) )
+
+        ellipsoids = engine.decompose( pts )
+        print( [e.center for e in ellipsoids] )
+        self.assertTrue( 2 <= len( ellipsoids ) <= engine.maxellipsoids )
+        for p in pts :
+            self.assertTrue( any( [e.contains( p ) for e in ellipsoids] ) )
+
+        draws = numpy.asarray( [engine.drawUnion( ellipsoids ) for k in range( 1000 )] )
+        self.assertFalse( numpy.any( ( draws > 0.3 ) & ( draws < 0.6 ) ) )
+        assertAAE( numpy.mean( draws, axis=0 ), [0.475, 0.475], 1 )
+
+        ## refit keeps the decomposition
+        engine.bound["ellipsoids"] = ellipsoids
+        upd = engine.update( ellipsoids, pts + 0.01 )
+        self.assertEqual( len( upd ), len( ellipsoids ) )
+
+        ## points of an ellipsoid with too few of them, move to another one
+        few = pts[:52]
+        upd = engine.update( ellipsoids, few )
+        self.assertEqual( len( upd ), 1 )
+        for p in few :
+            self.assertTrue( any( [e.contains( p ) for e in upd] ) )
+
+        ## the shared ellipsoids are part of the state
+        engine.bound["explores"] = 7
+        state = engine.getState()
+        eng2 = EllipsoidEngine( sl, errdis )
+        cp2 = eng2.copy()
+        eng2.setState( state )
+        self.assertTrue( cp2.bound["explores"] == 7 and cp2.bound is eng2.bound )
+        for e1, e2 in zip( ellipsoids, eng2.bound["ellipsoids"] ) :
+            self.assertTrue( numpy.array_equal( e1.inverse, e2.inverse ) )
+            self.assertTrue( numpy.array_equal( e1.chol, e2.chol ) )
+            self.assertEqual( e1.logVolume, e2.logVolume )
+        eng2.setState( EllipsoidEngine( sl, errdis ).getState() )
+        self.assertIsNone( eng2.bound["ellipsoids"] )
+
+        cp = engine.copy()
+        self.assertTrue( cp.bound is engine.bound )
+
+    def testAdaptSize( self ):
+        print( "\n   Adapt Size Test\n" )
+        m, xdata, data = self.initEngine()
+        errdis = GaussErrorDistribution( xdata, data, scale=0.5 )
+        sl = SampleList( m, 10, errdis )
+
+        engine = StepEngine( sl, errdis )
+        self.assertTrue( engine.target is None )
+        engine.adaptSize( 1, 10 )
+        self.assertTrue( engine.size == 1.0 )
+
+        engine = GalileanEngine( sl, errdis )
+        self.assertTrue( engine.target == 0.5 and engine.size == 0.5 )
+        engine.window = 10
+        for k in range( 20 ) :
+            engine.adaptSize( 9, 10 )                   # acceptance above target
+        print( engine.size )
+        self.assertTrue( 0.5 < engine.size < 0.5 * math.exp( 2 * engine.ADAPTRATE ) )
+
+        size = engine.size
+        for k in range( 5 ) :
+            engine.adaptSize( 0, 10 )                   # window still above target
+        self.assertTrue( engine.size > size )
+        for k in range( 1000 ) :
+            engine.adaptSize( 0, 10 )
+        self.assertTrue( engine.size == engine.MINSIZE )
+
+        engine.adaptSize( 10, 10 )
+        state = engine.getState()
+        cp = GalileanEngine( sl, errdis )
+        cp.window = 10
+        cp.setState( state )
+        self.assertTrue( cp.size == engine.size )
+        engine.adaptSize( 3, 10 )
+        cp.adaptSize( 3, 10 )
+        self.assertTrue( cp.size == engine.size )
+        self.assertTrue( engine.copy().size == engine.size )
+
     def stdenginetest( self, myengine, nsamp=4, iter=100, plot=False ) :
         m, xdata, data = self.initEngine()
         errdis = GaussErrorDistribution( xdata, data, scale=0.5 )
@@ -1,6 +1,7 @@
 ## run as : python3 -m unittest TestErrorDistribution
 
 import numpy as numpy
+import pickle
 from numpy.testing import assert_array_almost_equal as assertAAE
 import unittest
 from astropy import units
@@ -647,6 +648,114 @@ class TestErrorDistribution( unittest.TestCase ):
             print( "" )
 
 
+    def testLogLikelihoodBatch( self ):
+        print( "====testLogLikelihoodBatch=================" )
+        model = PolynomialModel( 1 )
+        numpy.random.seed( 2345 )
+        plist = numpy.random.rand( 20, 4 ) * [4, 20, 2, 3] + [-2, 0, 0.1, 0.5]
+        pdata = numpy.arange( 11, dtype=float )
+
+        for errdis in [GaussErrorDistribution( self.x, self.data, weights=self.wgt ),
+                       LaplaceErrorDistribution( self.x, self.data ),
+                       CauchyErrorDistribution( self.x, self.data ),
+                       GenGaussErrorDistribution( self.x, self.data, weights=self.wgt ),
+                       PoissonErrorDistribution( self.x, pdata )] :
+            print( errdis )
+            npl = model.npchain + errdis.nphypar
+            parlists = plist[:,:npl]
+            logL = [errdis.logLikelihood( model, pl ) for pl in parlists]
+            errdis.ncalls = 0
+            batch = errdis.logLikelihoodBatch( model, parlists )
+            print( fmt( batch, max=None ) )
+            assertAAE( batch, logL )
+            self.assertTrue( errdis.ncalls == 20 )
+
+            # in chunks of 3 parlists
+            type( errdis ).MAXBATCH = 3 * errdis.ndata
+            assertAAE( errdis.logLikelihoodBatch( model, parlists ), logL )
+            del type( errdis ).MAXBATCH
+
+    def testNumPartialLogL( self ):
+        print( "====testNumPartialLogL=================" )
+        model = GaussModel( )
+        param = numpy.asarray( [1.0, 0.2, 1.5, 0.8, 1.7] )
+        fitIndex = [0, 1, 2, 3, 4]
+        errdis = GenGaussErrorDistribution( self.x, self.data )
+        dL = errdis.partialLogL( model, param, fitIndex )
+
+        errdis.ncalls = 0
+        errdis.nparts = 0
+        nL = errdis.numPartialLogL( model, param, fitIndex )
+        print( fmt( dL, max=None ) )
+        print( fmt( nL, max=None ) )
+        assertAAE( nL, dL, 4 )
+        self.assertTrue( errdis.ncalls == 10 )
+        self.assertTrue( errdis.nparts == 1 )
+
+        nL = errdis.numPartialLogL( model, param, fitIndex, onesided=True )
+        print( fmt( nL, max=None ) )
+        assertAAE( nL, dL, 2 )
+        self.assertTrue( errdis.ncalls == 16 )
+
+    def testUpdateLogL( self ):
+        print( "====testUpdateLogL=================" )
+        model = GaussModel( )
+        model.addModel( PolynomialModel( 1 ) )
+        model.addModel( GaussModel( ) )
+        x = numpy.linspace( -3, 3, 21 )
+        errdis = GaussErrorDistribution( x, numpy.cos( x ) )
+
+        parts = model.resultParts( x, [1, 0, 1, 0.5, 0.1, 2, 1, 0.5] )
+        self.assertTrue( len( parts ) == 3 )
+        assertAAE( model.combineParts( parts ), model.result( x, [1, 0, 1, 0.5, 0.1, 2, 1, 0.5] ) )
+
+        numpy.random.seed( 2345 )
+        param = numpy.asarray( [1, 0, 1, 0.5, 0.1, 2, 1, 0.5, 0.3] )
+        current = param.copy()
+        for k in range( 50 ) :
+            c = numpy.random.randint( len( param ) )
+            param = current.copy()
+            param[c] += numpy.random.rand() - 0.5
+            if c == 8 :                                 # noise scale
+                param[c] = 0.1 + numpy.random.rand()
+            logL = errdis.updateLogL( model, param, parval={c : current[c]}, key=3 )
+            self.assertTrue( logL == errdis.logLikelihood( model, param ) )
+            ## one state per walker: the one the change started from
+            assertAAE( errdis.partcache[3][1], current[:model.npchain] )
+            if k % 3 :                                  # accept
+                current = param
+        self.assertTrue( len( errdis.partcache ) == 1 )
+
+        # unknown start point: full calculation
+        param[0] += 1
+        self.assertTrue( errdis.updateLogL( model, param, parval={1 : 0.0}, key=3 ) ==
+                         errdis.logLikelihood( model, param ) )
+        self.assertTrue( errdis.partcache[3][1][1] == 0.0 )
+
+        ## the states are not pickled
+        self.assertTrue( len( pickle.loads( pickle.dumps( errdis ) ).partcache ) == 0 )
+
+    def testSetattr( self ):
+        print( "====testSetattr=================" )
+        x = numpy.linspace( -3, 3, 21 )
+        errdis = GaussErrorDistribution( x, numpy.cos( x ) )
+        errdis.ncalls += 1
+        self.assertTrue( errdis.ncalls == 1 )
+        self.assertRaises( AttributeError, errdis.__setattr__, 'ncalls', 1.5 )
+        self.assertRaises( AttributeError, errdis.__setattr__, 'xdata', "abc" )
+
+        model = GaussModel( )
+        model.addModel( PolynomialModel( 1 ) )
+        par = numpy.asarray( [1, 0, 1, 0.5, 0.1] )
+        model.parameters = par
+        self.assertTrue( model.parameters is par )
+        model.stdevs = par
+        self.assertTrue( model.stdevs is par )
+        model.parameters = [1, 0, 1, 0.6, 0.1]
+        assertAAE( model.parameters, [1, 0, 1, 0.6, 0.1] )
+        self.assertRaises( AttributeError, model.__setattr__, 'parameters', numpy.asarray( ["a"] ) )
+        self.assertRaises( AttributeError, model.__setattr__, 'npbase', 1.5 )
+
     @classmethod
     def suite( cls ):
         return unittest.TestCase.suite( ErrorDistributionTest.__class__ )
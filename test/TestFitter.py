@@ -7,6 +7,7 @@ import unittest
 import FitPlot
 
 from PolynomialModel import PolynomialModel
+from SplinesModel import SplinesModel
 from PowerModel import PowerModel
 from SineAmpModel import SineAmpModel
 from Fitter import Fitter
@@ -169,6 +170,44 @@ class TestFitter( unittest.TestCase ):
 
 #        assertAAE( std, ast )
 
+    #  **************************************************************
+    def testDesignMatrix( self ):
+        """
+        test the design matrix kept by linear models.
+
+        """
+        print( "\n   Fitter Test 3 Design matrix  \n" )
+        x = numpy.linspace( 0.0, 10.0, 1001 )
+        y = numpy.sin( x ) + numpy.random.randn( 1001 ) * 0.1
+        model = SplinesModel( nrknots=101, min=0.0, max=10.0 )
+        fitter = Fitter( x, model )
+        par = fitter.fit( y )
+
+        design = model.designMatrix( x, par )
+        self.assertTrue( design is model.designMatrix( x, par ) )
+        self.assertFalse( design.flags.writeable )
+        assertAAE( model.partial( x, par ), design )
+        assertAAE( model.result( x, par ), numpy.dot( design, par ) )
+
+        ## same values, other array: the design is reused
+        self.assertTrue( model.designMatrix( x.copy(), par ) is design )
+        ## other values: a new design
+        self.assertFalse( model.designMatrix( x + 0.1, par ) is design )
+
+        ## changing the knots makes a new design
+        fit1 = model.result( x, par )
+        model.knots = numpy.linspace( 0.0, 10.5, 101 )
+        assertAAE( model.result( x, par ),
+                   SplinesModel( knots=model.knots ).result( x, par ) )
+        self.assertFalse( numpy.allclose( model.result( x, par ), fit1 ) )
+
+        ## fixed parameters
+        pm = PolynomialModel( 2, fixed={1:0.5} )
+        fitter = Fitter( x, pm )
+        yp = 1.0 + 0.5 * x - 0.2 * x * x
+        assertAAE( fitter.fit( yp ), [1.0, -0.2] )
+        assertAAE( pm.partial( x, [1.0, -0.2] ), numpy.asarray( [x * 0 + 1, x * x] ).T )
+
 if __name__ == '__main__':
     unittest.main( )
 
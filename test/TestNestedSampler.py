@@ -2,6 +2,10 @@
 # or :       python3 -m unittest TestNestedSampler.Test.test1
 
 import unittest
+import os
+import json
+import tempfile
+import multiprocessing
 import numpy as numpy
 from astropy import units
 import math
@@ -11,6 +15,13 @@ from FitPlot import plotFit
 from Formatter import formatter as fmt
 
 from NestedSampler import NestedSampler
+from Explorer import Explorer
+from StopStart import StopStart
+from SampleFile import SampleFile
+from SampleFile import MappedSampleList
+from SampleList import SampleList
+from ProgressMonitor import ProgressMonitor
+from ParallelNestedSampler import ParallelNestedSampler
 from GaussModel import GaussModel
 from PolynomialModel import PolynomialModel
 from SineModel import SineModel
@@ -179,6 +190,349 @@ class TestNestedSampler( unittest.TestCase ):
         if plot :
             plotFit( x, y, gm, ftr=ns.samples )
 
+    def testProcessBackend( self ):
+        print( "=========== Nested Sampler process backend ==============" )
+
+        pp, y0, x, y, w = self.makeData( n=1 )
+
+        logZ = []
+        parlist = []
+        for backend in ["thread", "process"] :
+            gm = GaussModel( )
+            gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+
+            ns = NestedSampler( x, gm, y, w, ensemble=20, verbose=0,
+                        backend=backend, workers=2 )
+            ns.sample( )
+            ns.report()
+            logZ += [ns.logZ]
+            parlist += [ns.samples.getParameterEvolution()]
+
+        print( "logZ   ", logZ )
+        self.assertEqual( logZ[0], logZ[1] )
+        assertAAE( parlist[0], parlist[1] )
+
+        with self.assertRaises( ValueError ) :
+            NestedSampler( x, gm, y, w, backend="spark" )
+
+        ## the worker processes are stopped when the sampling is interrupted
+        class Interrupt( Exception ) :
+            pass
+
+        class StopAt( StopStart ) :
+            def save( self, sampler ) :
+                raise Interrupt()
+
+        closed = []
+        close = Explorer.close
+
+        def countClose( explorer ) :
+            closed.append( explorer.pool is not None )
+            close( explorer )
+
+        Explorer.close = countClose
+        try :
+            with tempfile.TemporaryDirectory() as tmpdir :
+                ns = NestedSampler( x, gm, y, w, ensemble=20, verbose=0,
+                            backend="process", workers=2 )
+                ns.restart = StopAt( os.path.join( tmpdir, "restart.npz" ), interval=10 )
+                with self.assertRaises( Interrupt ) :
+                    ns.sample()
+        finally :
+            Explorer.close = close
+        self.assertEqual( closed, [True] )
+        self.assertEqual( len( multiprocessing.active_children() ), 0 )
+
+    def testBackendDiscard( self ):
+        print( "=========== Nested Sampler backends with discard =======" )
+
+        pp, y0, x, y, w = self.makeData( n=1 )
+
+        ## all walkers of an iteration are explored from the same snapshot,
+        ## so threads and processes yield the same, reproducible, samples
+        logZ = []
+        parlist = []
+        for backend in ["thread", "thread", "process"] :
+            gm = GaussModel( )
+            gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+            ns = NestedSampler( x, gm, y, w, ensemble=20, discard=4, seed=7, verbose=0,
+                        backend=backend, workers=2, engines=["galilean", "ellipsoid"] )
+            ns.minimumIterations = 200
+            ns.sample( )
+            logZ += [ns.logZ]
+            parlist += [ns.samples.getParameterEvolution()]
+            self.assertTrue( ns.engines[1].bound["explores"] > 0 )
+
+        print( "logZ   ", logZ )
+        for k in [1, 2] :
+            self.assertEqual( logZ[0], logZ[k] )
+            self.assertTrue( numpy.array_equal( parlist[0], parlist[k] ) )
+
+    def testSchedule( self ):
+        print( "=========== Nested Sampler adaptive schedule ===========" )
+
+        pp, y0, x, y, w = self.makeData( n=1 )
+
+        logZ = []
+        for backend in ["thread", "process"] :
+            gm = GaussModel( )
+            gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+            ns = NestedSampler( x, gm, y, w, ensemble=20, verbose=0, backend=backend,
+                        workers=2, engines=["galilean", "gibbs", "step"], schedule="calls" )
+            ns.sample( )
+            ns.report()
+            logZ += [ns.logZ]
+
+            print( "allocation ", ns.allocation )
+            self.assertEqual( len( ns.distribution.partcache ), 0 )
+            self.assertAlmostEqual( numpy.sum( ns.allocation ), 1.0 )
+            self.assertTrue( numpy.all( ns.allocation >= 0.2 / 3 ) )
+
+        self.assertEqual( logZ[0], logZ[1] )
+
+        ns.schedule = "random"
+        with self.assertRaises( ValueError ) :
+            ns.sample( )
+        with self.assertRaises( ValueError ) :
+            NestedSampler( x, gm, y, w, schedule="call" )
+
+    def testStopStart( self ):
+        print( "=========== Nested Sampler stop and restart ============" )
+
+        pp, y0, x, y, w = self.makeData( n=1 )
+
+        class Interrupt( Exception ) :
+            pass
+
+        class StopAt( StopStart ) :
+            def save( self, sampler ) :
+                super( StopAt, self ).save( sampler )
+                if sampler.iteration == 300 :
+                    raise Interrupt()
+
+        def sampler( ensemble=20, engines=None, schedule="fixed" ) :
+            gm = GaussModel( )
+            gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+            return NestedSampler( x, gm, y, w, ensemble=ensemble, engines=engines, verbose=0,
+                                  schedule=schedule )
+
+        ## the allocation of the engines is part of the state for schedule "calls"
+        ## and the shared ellipsoids that of the ellipsoid engine
+        for engines, schedule in [( None, "fixed" ),
+                                  ( ["galilean", "gibbs", "step"], "calls" ),
+                                  ( ["ellipsoid", "gibbs"], "fixed" )] :
+            ns = sampler( engines=engines, schedule=schedule )
+            ns.sample()
+
+            with tempfile.TemporaryDirectory() as tmpdir :
+                filename = os.path.join( tmpdir, "restart.npz" )
+
+                ns1 = sampler( engines=engines, schedule=schedule )
+                ns1.restart = StopAt( filename, interval=50 )
+                print( ns1.restart )
+                with self.assertRaises( Interrupt ) :
+                    ns1.sample()
+                self.assertFalse( os.path.isfile( filename + ".tmp" ) )
+
+                ns2 = sampler( engines=engines, schedule=schedule )
+                ns2.restart = StopStart( filename, interval=50, save=False )
+                ns2.sample()
+
+                ns3 = sampler( ensemble=10, engines=engines, schedule=schedule )
+                ns3.restart = StopStart( filename )
+                with self.assertRaises( ValueError ) :
+                    ns3.sample()
+
+            print( schedule, "logZ   ", ns.logZ, ns2.logZ )
+            self.assertAlmostEqual( ns.logZ, ns2.logZ, 8 )
+            self.assertAlmostEqual( ns.info, ns2.info, 8 )
+            self.assertEqual( ns.iteration, ns2.iteration )
+            self.assertEqual( ns.distribution.ncalls, ns2.distribution.ncalls )
+            assertAAE( ns.allocation, ns2.allocation )
+            assertAAE( ns.samples.getParameterEvolution(), ns2.samples.getParameterEvolution() )
+            assertAAE( ns.samples.getLogWeightEvolution(), ns2.samples.getLogWeightEvolution() )
+
+        ## the state is taken from the columns; the parlists may differ in length
+        sl = ns.samples
+        sl[1].parlist = numpy.asarray( [1.0, 2.0] )
+        state = {}
+        stst = StopStart( "restart.npz" )
+        stst.getSamples( state, "samples", sl )
+        stst.putSamples( state, "samples", ns.walkers, ns.walkers[0] )
+        self.assertEqual( len( ns.walkers ), len( sl ) )
+        for s1, s2 in zip( sl, ns.walkers ) :
+            self.assertTrue( numpy.array_equal( s1.parlist, s2.parlist ) )
+            self.assertTrue( s1.logW == s2.logW and s1.id == s2.id and s1.parent == s2.parent )
+
+    def testSampleFile( self ):
+        print( "=========== Nested Sampler samples on disk =============" )
+
+        pp, y0, x, y, w = self.makeData( n=1 )
+
+        def sampler( ) :
+            gm = GaussModel( )
+            gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+            return NestedSampler( x, gm, y, w, ensemble=20, verbose=0 )
+
+        ns = sampler()
+        yfit = ns.sample()
+
+        with tempfile.TemporaryDirectory() as tmpdir :
+            filename = os.path.join( tmpdir, "samples.npy" )
+            ns1 = sampler()
+            ns1.sampleFile = SampleFile( filename, buffersize=64 )
+            yfit1 = ns1.sample()
+            print( ns1.sampleFile )
+
+            sl = ns1.samples
+            self.assertEqual( len( sl ), len( ns.samples ) )
+            self.assertEqual( ns.logZ, ns1.logZ )
+            assertAAE( ns.samples.getLogWeightEvolution(), sl.getLogWeightEvolution() )
+            assertAAE( ns.samples.getParameterEvolution(), sl.getParameterEvolution() )
+            assertAAE( ns.samples.getGeneration(), sl.getGeneration() )
+            assertAAE( ns.samples.parameters, sl.parameters )
+            assertAAE( ns.samples.stdevs, sl.stdevs )
+            assertAAE( ns.samples.scale, sl.scale )
+            assertAAE( yfit, yfit1 )
+            self.assertEqual( ns.samples[-1].logL, sl[-1].logL )
+            assertAAE( ns.samples[10].parlist, sl[10].parlist )
+
+            saved = numpy.load( filename )
+            assertAAE( saved["logW"], sl.getLogWeightEvolution() )
+            with self.assertRaises( TypeError ) :
+                sl.append( sl[0] )
+            ## the sampler closes the file when done
+            self.assertIsNone( ns1.sampleFile._fp )
+
+            filename2 = os.path.join( tmpdir, "samples2.npy" )
+            with SampleFile( filename2, buffersize=8 ) as sf :
+                for k in range( 20 ) :
+                    sf.add( ns.samples, k )
+            self.assertIsNone( sf._fp )
+            ## a closed file is appended to, not overwritten
+            sf.add( ns.samples, 20 )
+            sf.close()
+            assertAAE( numpy.load( filename2 )["logL"],
+                       ns.samples.getLogLikelihoodEvolution()[:21] )
+
+            ## the summaries of the file go block by block
+            MappedSampleList.MAXBATCH = 40
+            try :
+                sl.normalize()
+                assertAAE( sl.getLogWeightEvolution(), ns.samples.getLogWeightEvolution() )
+                assertAAE( sl.parameters, ns.samples.parameters )
+                assertAAE( sl.stdevs, ns.samples.stdevs )
+                assertAAE( sl.scale, ns.samples.scale )
+                self.assertEqual( len( sl.getBlocks() ), ( len( sl ) + 9 ) // 10 )
+            finally :
+                MappedSampleList.MAXBATCH = SampleList.MAXBATCH
+
+            ## an interrupted run writes its buffered samples
+            class Interrupt( Exception ) :
+                pass
+
+            def interrupt( record ) :
+                if record["iteration"] == 200 and not record["final"] :
+                    raise Interrupt()
+
+            filename3 = os.path.join( tmpdir, "samples3.npy" )
+            ns3 = sampler()
+            ns3.sampleFile = SampleFile( filename3, buffersize=64 )
+            ns3.monitor = ProgressMonitor( interval=100, callback=interrupt )
+            with self.assertRaises( Interrupt ) :
+                ns3.sample()
+            self.assertIsNone( ns3.sampleFile._fp )
+            self.assertEqual( len( numpy.load( filename3 ) ), 200 )
+            del sl, saved
+
+    def testProgressMonitor( self ):
+        print( "=========== Nested Sampler progress monitor ============" )
+
+        pp, y0, x, y, w = self.makeData( n=1 )
+        gm = GaussModel( )
+        gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+        ns = NestedSampler( x, gm, y, w, ensemble=20, verbose=0 )
+
+        records = []
+        with tempfile.TemporaryDirectory() as tmpdir :
+            filename = os.path.join( tmpdir, "progress.jsonl" )
+            ns.monitor = ProgressMonitor( interval=200, callback=records.append,
+                                          filename=filename )
+            print( ns.monitor )
+            ns.sample()
+
+            with open( filename ) as fp :
+                lines = [json.loads( line ) for line in fp]
+
+        print( records[-1] )
+        self.assertEqual( lines, records )
+        self.assertEqual( len( records ), ns.iteration // 200 + 1 )
+        self.assertTrue( records[-1]["final"] )
+        self.assertEqual( records[-1]["logZ"], ns.logZ )
+        self.assertEqual( records[1]["iteration"], 400 )
+        self.assertEqual( records[-1]["ncalls"], ns.distribution.ncalls )
+        rep = numpy.sum( [r["engines"]["GalileanEngine"] for r in records], axis=0 )
+        assertAAE( rep, ns.engines[0].report[:3] )
+
+        ## an interrupted run stops the monitor and completes its file
+        class Interrupt( Exception ) :
+            pass
+
+        class StopAt( StopStart ) :
+            def save( self, sampler ) :
+                raise Interrupt()
+
+        ns = NestedSampler( x, gm, y, w, ensemble=20, verbose=0 )
+        with tempfile.TemporaryDirectory() as tmpdir :
+            filename = os.path.join( tmpdir, "progress.jsonl" )
+            ns.monitor = ProgressMonitor( interval=5, filename=filename )
+            ns.restart = StopAt( os.path.join( tmpdir, "restart.npz" ), interval=12 )
+            with self.assertRaises( Interrupt ) :
+                ns.sample()
+            self.assertIsNone( ns.monitor._writer )
+            with open( filename ) as fp :
+                lines = [json.loads( line ) for line in fp]
+        self.assertEqual( [r["iteration"] for r in lines], [5, 10, 12] )
+        self.assertTrue( lines[-1]["final"] )
+
+    def testParallel( self ):
+        print( "=========== Parallel Nested Sampler ====================" )
+
+        pp, y0, x, y, w = self.makeData( n=1 )
+
+        gm = GaussModel( )
+        gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+        ns = NestedSampler( x, gm, y, w, ensemble=20, verbose=0 )
+        ns.sample( )
+
+        ## one run merged equals the run itself, apart from the final walkers
+        gm = GaussModel( )
+        gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+        pns = ParallelNestedSampler( x, gm, y, w, nruns=1, workers=1, ensemble=20 )
+        pns.sample( )
+        print( "logZ   ", ns.logZ, pns.logZ )
+        self.assertAlmostEqual( ns.logZ, pns.logZ, 2 )
+        self.assertAlmostEqual( ns.info, pns.info, 2 )
+        self.assertEqual( len( ns.samples ), len( pns.samples ) )
+
+        gm = GaussModel( )
+        gm.setLimits( [-10,-10,  0], [10, 10, 10] )
+        pns = ParallelNestedSampler( x, gm, y, w, nruns=3, workers=3, ensemble=20 )
+        pns.sample( )
+        logZs = [run["logZ"] for run in pns.runs]
+        print( "logZ   ", logZs, pns.logZ, pns.logZprecision, pns.logZspread )
+        self.assertEqual( logZs[0], ns.logZ )
+        self.assertEqual( pns.ensemble, 60 )
+        self.assertEqual( len( pns.samples ), sum( [len( ns.samples )] +
+                          [run["iteration"] + 20 for run in pns.runs[1:]] ) )
+        self.assertTrue( min( logZs ) <= pns.logZ <= max( logZs ) )
+        self.assertTrue( pns.logZprecision < ns.logZprecision )
+        self.assertAlmostEqual( numpy.sum( pns.samples.getWeightEvolution() ), 1.0 )
+        assertAAE( pns.parameters, ns.parameters, 1 )
+
+        with self.assertRaises( ValueError ) :
+            ParallelNestedSampler( x, gm, y, w, nruns=0 )
+
     def nytest( self ) :
         print( "=========== Nested Sampler test 2 ======================" )
 
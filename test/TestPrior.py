@@ -13,6 +13,8 @@ from ExponentialPrior import ExponentialPrior
 from LaplacePrior import LaplacePrior
 from CauchyPrior import CauchyPrior
 from GaussPrior import GaussPrior
+from PriorBank import PriorBank
+from PolynomialModel import PolynomialModel
 
 __author__ = "Do Kester"
 __year__ = 2017
@@ -465,6 +467,44 @@ class TestPrior( unittest.TestCase ) :
         self.assertAlmostEqual( prior.partialDomain2Unit(9 ), prior.numPartialDomain2Unit( 9 ), 4 )
         self.assertAlmostEqual( prior.partialDomain2Unit(1 ), prior.numPartialDomain2Unit( 1 ), 4 )
 
+    def testPriorBank( self ):
+        print( "===== Prior Bank Tests ===========================\n" )
+
+        ep = ExponentialPrior( scale=2.0 )
+        ep.zeroFraction = 0.1
+        priors = [UniformPrior( limits=[-2,3] ), JeffreysPrior( limits=[0.1,10] ),
+                  GaussPrior( scale=2.0 ), LaplacePrior( scale=0.5 ), CauchyPrior( scale=3.0 ),
+                  ExponentialPrior( scale=2.0 ), ep]
+        bank = PriorBank( priors )
+        print( bank.group )
+        self.assertTrue( bank.group[-1] == PriorBank.OTHER )
+
+        uval = numpy.linspace( 0.05, 0.95, 5 * len( priors ) ).reshape( 5, len( priors ) )
+        dval = bank.unit2Domain( uval )
+        self.assertTrue( dval.shape == uval.shape )
+        for u, d in zip( uval, dval ) :
+            dv = [p.unit2Domain( v ) for p, v in zip( priors, u )]
+            print( d )
+            self.assertTrue( numpy.allclose( d, dv, rtol=1e-12 ) )
+            self.assertTrue( numpy.allclose( bank.unit2Domain( u ), dv, rtol=1e-12 ) )
+        self.assertTrue( numpy.allclose( bank.domain2Unit( dval ), uval, rtol=1e-10 ) )
+
+        kpar = [4, 1, 9]                    # last prior for all further parameters
+        self.assertTrue( numpy.allclose( bank.unit2Domain( uval[:,:3], kpar=kpar )[:,2],
+                                         [ep.unit2Domain( u ) for u in uval[:,2]] ) )
+
+        model = PolynomialModel( 2 )
+        model.priors = [UniformPrior( limits=[-1,1] )]
+        self.assertAlmostEqual( model.unit2Domain( [0.25, 0.25, 0.25] )[0], -0.5 )
+        model.priors[0].highLimit = 3
+        self.assertAlmostEqual( model.unit2Domain( [0.25, 0.25, 0.25] )[0], 0.0 )
+        self.assertAlmostEqual( model.unit2Domain( 0.25, kpar=0 ), 0.0 )
+
+        bank = PriorBank( [UniformPrior(), JeffreysPrior()] )
+        self.assertRaises( AttributeError, bank.unit2Domain, [0.5, 0.5], kpar=[0] )
+        self.assertRaises( AttributeError, bank.domain2Unit, [0.5, 0.5], kpar=[0] )
+        self.assertRaises( AttributeError, bank.unit2Domain, [0.5, 0.5], kpar=[1] )
+
     @classmethod
     def suite( cls ):
         return ConfiguredTestCase.suite( PriorTest.__class__ )
@@ -0,0 +1,183 @@
+# run with : python3 -m unittest TestResultCache
+
+import unittest
+import numpy as numpy
+from numpy.testing import assert_array_almost_equal as assertAAE
+import pickle
+import threading
+
+from LevenbergMarquardtFitter import LevenbergMarquardtFitter
+from GaussModel import GaussModel
+from PolynomialModel import PolynomialModel
+from HarmonicModel import HarmonicModel
+from ResultCache import ResultCache
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *  2017        Do Kester
+
+class CountingGauss( GaussModel ):
+    """ GaussModel that counts the calls to baseResult. """
+    NCALLS = 0
+
+    def baseResult( self, xdata, params ):
+        CountingGauss.NCALLS += 1
+        return super( CountingGauss, self ).baseResult( xdata, params )
+
+
+class TestResultCache( unittest.TestCase ):
+    """
+    Test harness for ResultCache class.
+
+    Author:      Do Kester
+
+    """
+    def makeModel( self ):
+        gm = CountingGauss( )
+        gm += PolynomialModel( 1 )
+        return gm
+
+    def testResultCache( self ):
+        print( "=========  ResultCache  ==========================" )
+        gm = self.makeModel()
+        gm.cache = ResultCache( size=2 )
+        x = numpy.linspace( -2, 2, 21 )
+        p = numpy.asarray( [1.0, 0.1, 0.5, 0.2, 0.1] )
+
+        r1 = gm.result( x, p )
+        r2 = gm.result( x, p.copy() )
+        self.assertTrue( r1 is r2 )
+        self.assertFalse( r1.flags.writeable )
+        self.assertTrue( gm.cache.hits == 1 and gm.cache.misses == 1 )
+
+        ## an equal but different xdata array is not the same input
+        gm.result( x.copy(), p )
+        self.assertTrue( gm.cache.misses == 2 )
+
+        ## the result is reused; only the partial is calculated
+        res, part = gm.resultAndPartial( x, p )
+        assertAAE( res, r1 )
+        self.assertTrue( gm.cache.hits == 2 and gm.cache.misses == 2 )
+        self.assertTrue( gm.partial( x, p ) is part )
+        self.assertTrue( gm.result( x, p ) is res )
+        self.assertTrue( len( gm.cache ) == 2 )
+
+        ## least recently used is removed
+        gm.result( x, p + 1 )
+        gm.result( x, p + 2 )
+        self.assertTrue( len( gm.cache ) == 2 )
+        gm.result( x, p )
+        self.assertTrue( gm.cache.misses == 5 )
+
+        gm.addModel( PolynomialModel( 0 ) )
+        self.assertTrue( len( gm.cache ) == 0 )
+
+        gm.cache = None
+        self.assertTrue( gm.result( x, numpy.append( p, 1.0 ) ).flags.writeable )
+
+        self.assertRaises( ValueError, ResultCache, 0 )
+
+    def testFit( self ):
+        print( "=========  ResultCache in a fit  =================" )
+        x = numpy.linspace( -2, 2, 101 )
+        numpy.random.seed( 3 )
+        y = self.makeModel().result( x, [1.0, 0.1, 0.5, 0.2, 0.1] ) + 0.05 * numpy.random.randn( 101 )
+
+        gm = self.makeModel()
+        CountingGauss.NCALLS = 0
+        fitter = LevenbergMarquardtFitter( x, gm )
+        par = fitter.fit( y )
+        chisq = fitter.chiSquared( y )
+        ncalls = CountingGauss.NCALLS
+
+        gc = self.makeModel()
+        gc.cache = ResultCache()
+        CountingGauss.NCALLS = 0
+        fitter = LevenbergMarquardtFitter( x, gc )
+        parc = fitter.fit( y )
+        self.assertTrue( fitter.chiSquared( y ) == chisq )
+        print( gc.cache, "  calls ", CountingGauss.NCALLS, "without cache ", ncalls )
+        assertAAE( parc, par )
+        self.assertTrue( gc.cache.hits > 0 )
+        self.assertTrue( CountingGauss.NCALLS < ncalls )
+
+        gc.cache.clear()
+        self.assertTrue( len( gc.cache ) == 0 )
+
+        gp = pickle.loads( pickle.dumps( gc ) )
+        self.assertTrue( len( gp.cache ) == 0 and gp.cache.hits == gc.cache.hits )
+
+    def testStructure( self ):
+        print( "=========  ResultCache on structure changes  =====" )
+        x = numpy.linspace( -2, 2, 21 )
+        p = numpy.asarray( [1.0, 0.5] )
+        hm = HarmonicModel( 1, period=4 )
+        hm.cache = ResultCache()
+        hm.result( x, p )
+        hm.period = 2
+        assertAAE( hm.result( x, p ), HarmonicModel( 1, period=2 ).result( x, p ) )
+
+        ## also the cache of the chain the model is part of
+        gm = self.makeModel()
+        hm = HarmonicModel( 1, period=4 )
+        gm.addModel( hm )
+        gm.cache = ResultCache()
+        q = numpy.append( [1.0, 0.1, 0.5, 0.2, 0.1], p )
+        res, part = gm.resultAndPartial( x, q )
+        hm.period = 2
+        self.assertTrue( len( gm.cache ) == 0 )
+        assertAAE( gm.result( x, q ) - res,
+                   HarmonicModel( 1, period=2 ).result( x, p ) - HarmonicModel( 1, period=4 ).result( x, p ) )
+
+    def testThreads( self ):
+        print( "=========  ResultCache in threads  ===============" )
+        gm = self.makeModel()
+        gm.cache = ResultCache( size=4 )
+        x = numpy.linspace( -2, 2, 101 )
+        pars = [numpy.asarray( [1.0, 0.1, 0.5, 0.2, 0.1 * k] ) for k in range( 6 )]
+        expect = [gm.result( x, p ).copy() for p in pars]
+        errors = []
+
+        def work( seed ) :
+            rng = numpy.random.RandomState( seed )
+            for i in range( 200 ) :
+                k = rng.randint( len( pars ) )
+                if not numpy.array_equal( gm.result( x, pars[k] ), expect[k] ) :
+                    errors.append( k )
+
+        threads = [threading.Thread( target=work, args=( s, ) ) for s in range( 4 )]
+        for t in threads :
+            t.start()
+        for t in threads :
+            t.join()
+        self.assertTrue( len( errors ) == 0 )
+        self.assertTrue( gm.cache.hits + gm.cache.misses == 806 )
+        self.assertTrue( len( gm.cache ) <= 4 )
+
+    @classmethod
+    def suite( cls ):
+        return unittest.TestCase.suite( TestResultCache.__class__ )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 
 import unittest
 import numpy as numpy
+import pickle
 import sys
 from numpy.testing import assert_array_almost_equal as assertAAE
 from astropy import units
@@ -206,6 +207,214 @@ class TestSampleList( unittest.TestCase ):
         zz = numpy.arange( 20, dtype=float ) * 0.2
         assertAAE( sl.monteCarloError( zz ), numpy.zeros( 20, dtype=float ), 2 )
 
+    def testColumns( self ):
+        print( "=========  SampleList columns  ===================" )
+        gm = GaussModel( )
+        errdis = GaussErrorDistribution( self.x, self.noise )
+        sl = SampleList( gm, 30, errdis )
+
+        rng = numpy.random.RandomState( 5 )
+        for s in sl :
+            s.parlist = rng.rand( 4 ) + [1, 0, 0.5, 0.2]
+            s.logL = rng.rand()
+            s.logW = -rng.rand() * 3
+            s.parent = s.id - 1
+        sl.normalize()
+
+        wgt = numpy.asarray( [s.weight for s in sl] )
+        pars = numpy.asarray( [s.parameters for s in sl] )
+        self.assertAlmostEqual( numpy.sum( wgt ), 1.0 )
+        assertAAE( sl.getWeightEvolution(), wgt )
+        assertAAE( sl.getParameterEvolution(), pars )
+        assertAAE( sl.getParameterEvolution( kpar=1 ), pars[:,1] )
+        assertAAE( sl.getScaleEvolution(), [s.hypars for s in sl] )
+        assertAAE( sl.parameters, numpy.dot( wgt, pars ) )
+        assertAAE( sl.getGeneration(), numpy.arange( 30 ) )
+        assertAAE( sl.getParentEvolution(), numpy.arange( 30 ) - 1 )
+        low, klo = sl.getLowLogL()
+        self.assertTrue( low == min( [s.logL for s in sl] ) and sl[klo].logL == low )
+        self.assertTrue( sl.medianIndex == numpy.where( numpy.cumsum( wgt ) >= 0.5 )[0][0] )
+
+        # samples are views; parlists too
+        s5 = sl[5]
+        s5.parlist[0] = 7.0
+        self.assertTrue( sl.getParameterEvolution( kpar=0 )[5] == 7.0 )
+
+        # detached on removal or replacement
+        s6 = sl[6]
+        logL6 = s6.logL
+        sl.copy( 8, 6 )
+        self.assertTrue( s6.logL == logL6 and sl[6].logL == sl[8].logL )
+        self.assertTrue( sl[6].id == 6 )
+        popped = sl.pop( 5 )
+        self.assertTrue( popped.parlist[0] == 7.0 and popped.id == 5 )
+        del sl[10:20]
+        sl.remove( sl[0] )
+        self.assertTrue( len( sl ) == 18 )
+        ids = [s.id for s in sl]
+        assertAAE( sl.getGeneration(), ids )
+        self.assertTrue( ids == [1, 2, 3, 4, 6, 7, 8, 9, 10] + list( range( 21, 30 ) ) )
+
+        sl.insert( 1, popped )
+        sl.append( sl[2] )
+        self.assertTrue( sl[-1] is not sl[2] and sl[-1].id == sl[2].id )
+        sl.sort( key=lambda s : s.logL )
+        assertAAE( sl.getLogLikelihoodEvolution(), sorted( [s.logL for s in sl] ) )
+        self.assertTrue( all( s is sl[k] for k,s in enumerate( sl ) ) )
+
+        # slice assignment: per row or rebuilding the columns
+        old = sl[0:2]
+        oldL = [s.logL for s in old]
+        new = [s.copy() for s in sl[4:6]]
+        sl[0:2] = new
+        self.assertTrue( sl[0] is new[0] and sl[1] is new[1] )
+        self.assertTrue( "_store" not in old[0].__dict__ and old[1].logL == oldL[1] )
+        sl[::4] = [s.copy() for s in sl[1::4]]
+        assertAAE( sl.getLogLikelihoodEvolution()[::4], sl.getLogLikelihoodEvolution()[1::4] )
+        sl[2:5] = [sl[0]]
+        self.assertTrue( len( sl ) == 18 and sl[2].id == sl[0].id )
+        assertAAE( sl.getGeneration(), [s.id for s in sl] )
+        with self.assertRaises( ValueError ) :
+            sl[::2] = [sl[0]]
+
+        sl1 = pickle.loads( pickle.dumps( sl ) )
+        assertAAE( sl1.getParameterEvolution(), sl.getParameterEvolution() )
+        sl1[0].logL = 100.0
+        self.assertTrue( sl1.getLowLogL()[1] != 0 and sl[0].logL != 100.0 )
+
+    def testWeed( self ):
+        print( "=========  SampleList weed  ======================" )
+        gm = GaussModel( )
+        errdis = GaussErrorDistribution( self.x, self.noise )
+        sl = SampleList( gm, 0, errdis )
+        walkers = SampleList( gm, 1, errdis )
+
+        rng = numpy.random.RandomState( 6 )
+        reference = []
+        for k in range( 300 ) :
+            walkers[0].logW = float( rng.randint( 50 ) )      # with ties
+            sl.add( walkers, 0 )
+            sl.weed( 40 )
+            reference += [( walkers[0].logW, k )]
+            while len( reference ) > 40 :
+                reference.remove( min( reference ) )
+            if k == 150 :
+                sl[3].logW = 100.0
+                reference[3] = ( 100.0, reference[3][1] )
+
+        self.assertTrue( len( sl ) == 40 )
+        self.assertTrue( [s.id for s in sl] == [r[1] for r in reference] )
+        assertAAE( sl.getLogWeightEvolution(), [r[0] for r in reference] )
+        ## the rows are kept up to date in place
+        self.assertTrue( list( sl.getRows() ) == [s.__dict__["_row"] for s in sl] )
+
+        sl.weed( 3000 )
+        self.assertTrue( len( sl ) == 40 )
+        sl.weed( 2 )                                    # no recursion
+        while len( reference ) > 2 :
+            reference.remove( min( reference ) )
+        self.assertTrue( [s.id for s in sl] == [r[1] for r in reference] )
+        self.assertTrue( len( sl ) == 2 )
+        self.assertTrue( len( sl._parlist ) <= 64 )
+        self.assertTrue( list( sl.getRows() ) == [s.__dict__["_row"] for s in sl] )
+
+    def testWorstIndex( self ):
+        print( "=========  SampleList logL index  ================" )
+        gm = GaussModel( )
+        errdis = GaussErrorDistribution( self.x, self.noise )
+        sl = SampleList( gm, 20, errdis )
+
+        rng = numpy.random.RandomState( 4 )
+        for s in sl :
+            s.logL = float( rng.randint( 10 ) )         # with ties
+
+        def scan( nw ) :
+            logl = [s.logL for s in sl]
+            return sorted( range( len( sl ) ), key=lambda k : ( logl[k], k ) )[:nw]
+
+        self.assertTrue( sl.getWorst( 3 ) == scan( 3 ) )
+        self.assertTrue( sl.getWorst( 20 ) == scan( 20 ) )
+
+        for i in range( 100 ) :
+            worst = sl.getWorst( 2 )
+            self.assertTrue( worst == scan( 2 ) )
+            sl.copy( int( rng.randint( 20 ) ), worst[0] )
+            sample = sl[worst[1]]
+            sample.logL += rng.rand() * 5
+            sl[worst[1]] = sample
+        print( sl.getWorst( 5 ), len( sl._heap ) )
+        self.assertTrue( sl.getWorst( 20 ) == scan( 20 ) )
+
+        sl.removeIndex()
+        sl[0] = sl[0].copy()
+        self.assertTrue( sl._heap is None )
+
+    def testSnapshot( self ):
+        print( "=========  SampleList snapshot  ==================" )
+        gm = GaussModel( )
+        errdis = GaussErrorDistribution( self.x, self.noise )
+        sl = SampleList( gm, 10, errdis )
+        for k,s in enumerate( sl ) :
+            s.logL = float( k )
+            s.parlist = [k, 1.0, 2.0]
+        sl.makeIndex()
+
+        snap = sl.snapshot()
+        self.assertTrue( snap._heap is None and sl._heap is not None )
+        self.assertTrue( [s.id for s in snap] == [s.id for s in sl] )
+        self.assertTrue( snap[3].model is sl[3].model )
+
+        ## changes in the snapshot do not reach the list, nor vice versa
+        sample = snap[3]
+        sample.parlist = [7.0, 8.0, 9.0]
+        sample.logL = -1.0
+        snap[3] = sample
+        sl[4].logL = 40.0
+        assertAAE( sl[3].parlist, [3, 1, 2] )
+        self.assertTrue( sl[3].logL == 3.0 and snap[4].logL == 4.0 )
+        assertAAE( snap[3].parlist, [7, 8, 9] )
+        self.assertTrue( snap[3] is sample and sample.__dict__["_store"] is snap )
+
+        snap.append( sl[0].copy() )
+        self.assertTrue( len( snap ) == 11 and len( sl ) == 10 )
+        self.assertTrue( list( snap.getRows() ) == [s.__dict__["_row"] for s in snap] )
+
+    def testAverage( self ):
+        print( "=========  SampleList average  ===================" )
+        gm = GaussModel( )
+        errdis = GaussErrorDistribution( self.x, self.noise )
+        sl = SampleList( gm, 50, errdis )
+
+        rng = numpy.random.RandomState( 7 )
+        pars = numpy.asarray( [3.0, 0.0, 1.0] ) + 0.1 * rng.randn( 50, 3 )
+        wgt = rng.rand( 50 )
+        sl.setEvolution( parlists=pars, logW=numpy.log( wgt / numpy.sum( wgt ) ) )
+
+        xx = numpy.linspace( -2, 2, 10 )
+        yy = numpy.asarray( [gm.result( xx, p ) for p in pars] )
+        ww = wgt / numpy.sum( wgt )
+        ya = numpy.dot( ww, yy )
+        ye = numpy.sqrt( numpy.dot( ww, numpy.square( yy - ya ) ) )
+
+        qq = [0.1, 0.5, 0.9]
+        assertAAE( sl.average( xx, quantiles=qq ), ya )
+        assertAAE( sl.error, ye )
+        for i in range( 10 ) :
+            srt = numpy.argsort( yy[:,i] )
+            cw = numpy.cumsum( ww[srt] )
+            for k,q in enumerate( qq ) :
+                self.assertTrue( sl.bands[k,i] == yy[srt[numpy.searchsorted( cw, q )],i] )
+
+        ## in blocks of 10 samples; quantiles from a resample
+        sl.MAXBATCH = 100
+        assertAAE( sl.average( xx, quantiles=qq ), ya )
+        assertAAE( sl.monteCarloError( xx ), ye )
+        self.assertTrue( sl.bands.shape == ( 3, 10 ) )
+        self.assertTrue( numpy.all( sl.bands[0] <= sl.bands[1] ) )
+        self.assertTrue( numpy.all( sl.bands[1] <= sl.bands[2] ) )
+        self.assertTrue( numpy.all( sl.bands >= numpy.min( yy, axis=0 ) ) )
+        self.assertTrue( numpy.all( sl.bands <= numpy.max( yy, axis=0 ) ) )
+
     @classmethod
     def suite( cls ):
         return unittest.TestCase.suite( TestSampleList.__class__ )
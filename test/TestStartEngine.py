@@ -5,6 +5,7 @@ import numpy as numpy
 from astropy import units
 import math
 import Tools
+from numpy.testing import assert_array_almost_equal as assertAAE
 import matplotlib.pyplot as plt
 
 from TestEngine import TestEngine
@@ -85,6 +86,36 @@ class TestStartEngine( TestEngine ):
             plt.plot( parevo[:,0], sclevo, 'k.' )
             plt.show()
 
+    def testExecuteAll( self ):
+        print( "\n   Start Engine Test executeAll\n" )
+        m, xdata, data = self.initEngine()
+
+        errdis = GaussErrorDistribution( xdata, data )
+        errdis.setLimits( [0.1, 10.0] )
+        fitIndex = [0, 1, 2, 3]
+
+        sl1 = SampleList( m, 50, errdis, fitindex=fitIndex )
+        engine = StartEngine( sl1, errdis, seed=1234 )
+        for samp in sl1 :
+            engine.execute( samp, -math.inf, fitIndex=fitIndex )
+
+        sl2 = SampleList( m, 50, errdis, fitindex=fitIndex )
+        sl2.makeIndex()
+        engine = StartEngine( sl2, errdis, seed=1234 )
+        ncalls = errdis.ncalls
+        engine.executeAll( -math.inf, fitIndex=fitIndex )
+        print( sl2[0].parlist, sl2[0].logL )
+
+        self.assertEqual( errdis.ncalls - ncalls, 50 )
+        assertAAE( sl1.getParameterEvolution(), sl2.getParameterEvolution() )
+        assertAAE( sl1.getScaleEvolution(), sl2.getScaleEvolution() )
+        assertAAE( sl1.getLogLikelihoodEvolution(), sl2.getLogLikelihoodEvolution() )
+        self.assertTrue( numpy.all( sl2.getLogWeightEvolution() == -math.inf ) )
+        for samp in sl2 :
+            self.assertEqual( samp.logL, errdis.logLikelihood( m, samp.parlist ) )
+        klo = sl2.getWorst( 1 )[0]
+        self.assertEqual( sl2[klo].logL, sl2.getLowLogL()[0] )
+
     def startenginetest( self, engine ) :
         print( engine )
         minv = [ math.inf] * len( engine.walkers[0].parlist )
@@ -109,6 +109,19 @@ class TestTools( unittest.TestCase ) :
         print( x, x.shape, x.__class__ )
         self.assertTrue( isinstance( x, numpy.ndarray ) and x.ndim == 2 )
 
+    def testIsList( self ) :
+        print( "===== isList ================================" )
+        x = numpy.linspace( 0, 1, 5 )
+        self.assertTrue( Tools.isList( x, float ) == (True,True) )
+        self.assertTrue( Tools.isList( numpy.arange( 5 ), float ) == (True,True) )
+        self.assertTrue( Tools.isList( numpy.arange( 5 ), int ) == (True,True) )
+        self.assertFalse( Tools.isList( x, int )[0] )
+        self.assertFalse( Tools.isList( x.astype( numpy.float32 ), float )[0] )
+        self.assertTrue( Tools.isList( numpy.asarray( ["a", "b"] ), str )[0] )
+        self.assertFalse( Tools.isList( numpy.asarray( ["a", "b"] ), float )[0] )
+        self.assertTrue( Tools.isList( [1.0, 2.0], float ) == (True,True) )
+        self.assertTrue( Tools.isList( 1.0, float ) == (True,False) )
+
     @classmethod
     def suite( cls ):
         return ConfiguredTestCase.suite( PriorTest.__class__ )
@@ -0,0 +1,81 @@
+# run with : python3 -m unittest TestVoigtModel
+
+import unittest
+import numpy as numpy
+from numpy.testing import assert_array_almost_equal as assertAAE
+import time
+
+from VoigtModel import VoigtModel
+
+__author__ = "Do Kester"
+__year__ = 2017
+__license__ = "GPL3"
+__version__ = "0.9"
+__maintainer__ = "Do"
+__status__ = "Development"
+
+#  *
+#  * This file is part of the BayesicFitting package.
+#  *
+#  * BayesicFitting is free software: you can redistribute it and/or modify
+#  * it under the terms of the GNU Lesser General Public License as
+#  * published by the Free Software Foundation, either version 3 of
+#  * the License, or ( at your option ) any later version.
+#  *
+#  * BayesicFitting is distributed in the hope that it will be useful,
+#  * but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  * GNU Lesser General Public License for more details.
+#  *
+#  * The GPL3 license can be found at <http://www.gnu.org/licenses/>.
+#  *
+#  *  2017        Do Kester
+
+class TestVoigtModel( unittest.TestCase ):
+    """
+    Test harness for VoigtModel, against its legacy code and numeric partials.
+
+    Author:      Do Kester
+
+    """
+    PARS = [[1.2, 0.2, 0.3, 0.4], [1.0, 0.0, 1.0, 0.01], [2.0, 1.0, 0.1, 3.0]]
+
+    def testVoigtLegacy( self ):
+        print( "******VOIGT LEGACY*****************" )
+        m = VoigtModel( )
+        x = numpy.linspace( -5, 5, 10001 )
+        for p in self.PARS :
+            p = numpy.asarray( p, dtype=float )
+            t0 = time.time()
+            leg = m.legacyResult( x, p )
+            t1 = time.time()
+            res = m.result( x, p )
+            t2 = time.time()
+            print( p, "legacy %8.4f s  wofz %8.4f s" % ( t1 - t0, t2 - t1 ) )
+            assertAAE( res / p[0], leg / p[0], 5 )
+            assertAAE( m.result( p[1:2], p ), p[0:1] )          # amplitude at the center
+
+    def testVoigtPartial( self ):
+        print( "******VOIGT PARTIAL****************" )
+        m = VoigtModel( )
+        x = numpy.linspace( -5, 5, 41 )
+        ## the last one is the Lorentz branch
+        for p in self.PARS + [[1.2, 0.2, 0.0, 0.4]] :
+            p = numpy.asarray( p, dtype=float )
+            part = m.partial( x, p )
+            print( p, numpy.max( numpy.abs( part - m.numPartial( x, p ) ) ) )
+            assertAAE( part, m.numPartial( x, p ), 7 )
+            assertAAE( m.derivative( x, p ), m.numDerivative( x, p ), 7 )
+            assertAAE( m.basePartial( x, p, parlist=[3, 1] )[:,:2], part[:,[3, 1]] )
+            self.assertTrue( m.testPartial( x, p ) == 0 )
+
+        p = numpy.asarray( [1.2, 0.2, 0.0, 0.4] )
+        self.assertTrue( numpy.all( m.partial( x, p )[:,2] == 0 ) )
+
+    @classmethod
+    def suite( cls ):
+        return unittest.TestCase.suite( TestVoigtModel.__class__ )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,6 +40,7 @@ from TestRobustShell import TestRobustShell
 from TestSampleList import TestSampleList
 from TestStartEngine import TestStartEngine
 from TestTools import TestTools
+from TestVoigtModel import TestVoigtModel
 from TestWeights import TestWeights
 
 print( "__init__  done" )